@@ -4,87 +4,102 @@ Real-time Agent Progress Tracker
 Fetches live agent data from OpenClaw sessions API and combines with agent registry.
 """
 
-import json
-import subprocess
+import argparse
 import time
-from datetime import datetime, timedelta
+from array import array
+from datetime import datetime
+from functools import lru_cache
 import os
+import sqlite3
 import sys
 
-def get_openclaw_sessions():
-    """Get current OpenClaw sessions using CLI"""
-    try:
-        result = subprocess.run(
-            ['openclaw', 'sessions', '--json'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            sessions = json.loads(result.stdout)
-            return sessions
-    except Exception as e:
-        print(f"Error getting sessions: {e}")
-    
-    # Fallback to reading session file directly
-    session_file = '/home/jim/.openclaw/agents/main/sessions/sessions.json'
-    if os.path.exists(session_file):
-        try:
-            with open(session_file, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    
-    return []
+from agent_registry import load_registry, registry_map
+from alert_engine import AlertEngine, check_for_alerts
+from eta_engine import EtaEngine, format_duration
+from json_export import VOLATILE_AGENT_FIELDS, export_json
+from metrics import install_profile_signal, span, start_metrics_server
+from progress_history import ProgressHistory
+from rules_engine import get_ruleset
+from session_source import FileSessionSource, default_session_source
+from tracker_watch import create_watcher, watch_loop
+
+SESSION_DIR = '/home/jim/.openclaw/agents/main/sessions'
+SESSIONS_FILE = os.path.join(SESSION_DIR, 'sessions.json')
+REGISTRY_FILE = '/home/jim/openclaw/shared_assets/tasks/agent_registry.json'
+OUTPUT_FILE = '/home/jim/openclaw/agent_progress_data.json'
+HISTORY_FILE = '/home/jim/openclaw/.tracker_cache/progress_history.db'
+
+# Sessions observed for less than this still use the default ETA assumption
+MIN_OBSERVED_SECONDS = 300
+
+ETA_STATE_FILE = '/home/jim/openclaw/.tracker_cache/eta_state.json'
+ALERT_STATE_FILE = '/home/jim/openclaw/.tracker_cache/alert_state.json'
+NO_ESTIMATE = {'eta_seconds': None, 'eta_low_seconds': None, 'eta_high_seconds': None}
+
+# Session key -> agent id / task description rules (classification_rules.json)
+SESSION_AGENTS = get_ruleset('session_agents')
+SESSION_TASKS = get_ruleset('session_tasks')
+
+# sessions.json is the primary source; the CLI is only a cached, non-blocking fallback
+_session_source = default_session_source(SESSIONS_FILE)
 
-def get_agent_registry():
-    """Get agent registry data"""
-    registry_file = '/home/jim/openclaw/shared_assets/tasks/agent_registry.json'
+def get_openclaw_sessions(source=None):
+    """Get current OpenClaw sessions (file-backed, CLI fallback, cached)"""
+    with span('agent_progress', 'session_fetch'):
+        return (source or _session_source).fetch_or_empty()
+
+def get_agent_registry(registry_file=REGISTRY_FILE):
+    """Get the agent registry index (re-parsed only when the file changes)"""
+    with span('agent_progress', 'registry_load'):
+        return load_registry(registry_file)
+
+@lru_cache(maxsize=4096)
+def parse_token_percentage(tokens_info):
+    """'12k/200k' -> 6; None when the string is not a used/total pair"""
     try:
-        with open(registry_file, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error reading agent registry: {e}")
-        return {"agents": []}
+        if '/' in tokens_info:
+            used, total = tokens_info.split('/')
+            used = int(used.replace('k', '000').replace('K', '000'))
+            total = int(total.replace('k', '000').replace('K', '000'))
+            return min(100, int((used / total) * 100))
+    except:
+        pass
+    return None
 
-def calculate_agent_progress(session, registry_entry):
-    """Calculate progress percentage based on session activity"""
-    progress = 0
-    
+def base_progress(session):
+    """Progress implied by the kind of session, before token usage"""
     # Check if this is a subagent (indicates active work)
     if 'subagent' in session.get('key', ''):
-        progress = 70  # Actively working
+        return 70  # Actively working
     elif session.get('flags') and 'system' in str(session.get('flags')):
-        progress = 85  # System agent, likely coordinating
+        return 85  # System agent, likely coordinating
     else:
-        progress = 40  # Main agent, planning
+        return 40  # Main agent, planning
+
+def calculate_agent_progress(session, registry_entry):
+    """Calculate progress percentage based on session activity"""
+    progress = base_progress(session)
     
     # Adjust based on token usage if available
-    if 'tokens' in session:
-        tokens_info = session['tokens']
-        if isinstance(tokens_info, str):
-            try:
-                if '/' in tokens_info:
-                    used, total = tokens_info.split('/')
-                    used = int(used.replace('k', '000').replace('K', '000'))
-                    total = int(total.replace('k', '000').replace('K', '000'))
-                    token_percentage = min(100, int((used / total) * 100))
-                    progress = max(progress, token_percentage)
-            except:
-                pass
+    tokens_info = session.get('tokens')
+    if isinstance(tokens_info, str):
+        token_percentage = parse_token_percentage(tokens_info)
+        if token_percentage is not None:
+            progress = max(progress, token_percentage)
     
     return min(95, progress)  # Cap at 95% unless explicitly marked complete
 
-def calculate_eta(progress, start_time_str):
-    """Calculate ETA based on progress and elapsed time"""
+def calculate_eta(progress, start_time_str, elapsed_hours=None):
+    """Calculate ETA based on progress and elapsed time (from history when known)"""
     if progress <= 0:
         return "N/A"
     
     try:
         # Try to parse start time from session
-        if start_time_str:
+        if start_time_str or elapsed_hours is not None:
             # Simple estimation: if 50% done in X hours, ETA is X hours from now
-            elapsed_hours = 1  # Default assumption
+            if elapsed_hours is None:
+                elapsed_hours = 1  # Default assumption
             remaining_percentage = 100 - progress
             if progress > 0:
                 estimated_total_hours = elapsed_hours * (100 / progress)
@@ -113,26 +128,21 @@ def calculate_eta(progress, start_time_str):
     else:
         return "Finishing up"
 
+@lru_cache(maxsize=4096)
+def agent_id_for_session(session_key):
+    """Map a session key to the registry agent it works for"""
+    if 'subagent' in session_key:
+        # Agent type is encoded in the third part of the session key
+        key_parts = session_key.split(':')
+        if len(key_parts) > 2:
+            return SESSION_AGENTS.classify(key_parts[2])
+    return SESSION_AGENTS.default
+
 def get_task_description(session_key, registry_entry):
     """Get task description based on session and registry"""
-    key = session_key.lower()
-    
-    # Map session types to tasks
-    if 'subagent' in key:
-        if 'content' in key or 'linkedin' in key:
-            return "Creating LinkedIn content"
-        elif 'design' in key:
-            return "Designing visual assets"
-        elif 'developer' in key or 'crm' in key:
-            return "Developing CRM system"
-        elif 'dashboard' in key:
-            return "Building dashboard"
-        else:
-            return "Working on assigned task"
-    elif 'main' in key:
-        return "Coordinating team & tasks"
-    elif 'slack' in key:
-        return "Monitoring Slack channels"
+    task = SESSION_TASKS.classify(session_key)
+    if task is not None:
+        return task
     
     # Fallback to registry specialization
     if registry_entry and 'specialization' in registry_entry:
@@ -152,165 +162,319 @@ def get_quality_metrics(agent_id):
     }
     return metrics
 
-def check_for_alerts(agent_data):
-    """Check for agent issues requiring alerts"""
-    alerts = []
+class AgentTable:
+    """
+    Column-oriented view of the agent list.
     
-    for agent in agent_data:
-        # Alert if agent has been active for too long (> 2 hours)
-        if agent.get('active_hours', 0) > 2:
-            alerts.append({
-                'agent': agent['name'],
-                'type': 'stuck',
-                'message': f"{agent['name']} has been working for {agent['active_hours']:.1f} hours - may need assistance"
-            })
-        
-        # Alert if progress is very low but agent has been active
-        if agent['progress'] < 20 and agent.get('active_hours', 0) > 1:
-            alerts.append({
-                'agent': agent['name'],
-                'type': 'slow_progress',
-                'message': f"{agent['name']} showing slow progress ({agent['progress']}%)"
-            })
-        
-        # Alert if quality score is low
-        if agent.get('quality_score', 100) < 70:
-            alerts.append({
-                'agent': agent['name'],
-                'type': 'quality_issue',
-                'message': f"{agent['name']} quality score low ({agent['quality_score']}/100)"
-            })
-    
-    return alerts
-
-def get_agent_progress_data():
-    """Main function to get combined agent progress data"""
-    sessions = get_openclaw_sessions()
-    registry = get_agent_registry()
+    Sessions are loaded once into parallel columns; progress, ETA and the
+    summary figures are then computed column-wise, with per-distinct-value
+    memoization for the string work (token parsing, key classification, ETA
+    text). Rows come out in the same order, with the same values, as the
+    original one-dict-per-session loop.
+    """
     
-    # Map registry agents by ID for easy lookup
-    registry_map = {agent['id']: agent for agent in registry.get('agents', [])}
+    COLUMNS = ('id', 'name', 'session_key', 'specialization', 'status', 'progress', 'eta',
+               'active_since', 'quality_score', 'tests_passed', 'bugs_found', 'code_quality',
+               'task', 'token_usage', 'model', 'eta_seconds', 'eta_low_seconds', 'eta_high_seconds',
+               'active_hours')
+    INT_COLUMNS = ('progress', 'quality_score', 'tests_passed', 'bugs_found', 'code_quality')
     
-    agent_data = []
+    def __init__(self):
+        for column in self.COLUMNS:
+            setattr(self, column, array('i') if column in self.INT_COLUMNS else [])
     
-    # Process active sessions (last 4 hours)
-    four_hours_ago = datetime.now() - timedelta(hours=4)
+    def __len__(self):
+        return len(self.id)
     
-    for session in sessions:
-        if isinstance(session, dict):
-            # Extract agent info from session key
+    def load_sessions(self, sessions, registry_map, elapsed_hours=None, eta_engine=None, now=None):
+        """
+        Append one row per live session. elapsed_hours maps session key -> hours
+        observed; with an eta_engine, rate-based ETAs replace the bucketed text
+        wherever a velocity is known.
+        """
+        elapsed_hours = elapsed_hours or {}
+        now = time.time() if now is None else now
+        rows = []
+        for session in sessions:
+            if not isinstance(session, dict):
+                continue
             session_key = session.get('key', '')
             
             # Skip if too old (unless it's the main agent)
             age = session.get('age', '')
             if 'main' not in session_key and 'hour' in age and int(age.split()[0]) > 4:
                 continue
-            
-            # Determine agent ID from session
-            agent_id = 'main'
-            agent_name = 'Main Agent'
-            
-            if 'subagent' in session_key:
-                # Try to extract agent type from session key
-                key_parts = session_key.split(':')
-                if len(key_parts) > 2:
-                    session_id = key_parts[2]
-                    # Map session to agent type
-                    if 'content' in session_id.lower():
-                        agent_id = 'content_creator'
-                    elif 'design' in session_id.lower():
-                        agent_id = 'designer'
-                    elif 'developer' in session_id.lower() or 'crm' in session_id.lower():
-                        agent_id = 'developer'
-                    elif 'dashboard' in session_id.lower():
-                        agent_id = 'dashboard'
-            
-            # Get registry entry
-            registry_entry = registry_map.get(agent_id, {})
-            
-            if registry_entry:
-                agent_name = registry_entry.get('name', agent_name)
-                specialization = registry_entry.get('specialization', '')
-                status = registry_entry.get('current_status', 'unknown')
+            rows.append(session)
+        
+        keys = [session.get('key', '') for session in rows]
+        ids = [agent_id_for_session(key) for key in keys]
+        entries = [registry_map.get(agent_id, {}) for agent_id in ids]
+        
+        # Progress column: base from session kind, raised by token usage, capped at 95
+        tokens = [session.get('tokens') for session in rows]
+        token_pct = [parse_token_percentage(t) if isinstance(t, str) else None for t in tokens]
+        progress = array('i', (
+            min(95, base if pct is None else max(base, pct))
+            for base, pct in zip((base_progress(session) for session in rows), token_pct)
+        ))
+        
+        # ETA text only depends on (progress, has start time): look it up per distinct pair
+        eta_memo = {}
+        etas = []
+        for value, session, key in zip(progress, rows, keys):
+            if key in elapsed_hours:
+                etas.append(calculate_eta(value, session.get('created_at', ''), elapsed_hours[key]))
+                continue
+            memo_key = (value, bool(session.get('created_at', '')))
+            if memo_key not in eta_memo:
+                eta_memo[memo_key] = calculate_eta(value, session.get('created_at', ''))
+            etas.append(eta_memo[memo_key])
+        
+        # Numeric ETAs from smoothed velocity: one O(1) update per session
+        estimates = []
+        for index, (value, session, key) in enumerate(zip(progress, rows, keys)):
+            estimate = NO_ESTIMATE
+            if eta_engine is not None:
+                estimate = eta_engine.update(key, value, now, session.get('created_at'))
+                if estimate['eta_seconds'] is not None:
+                    etas[index] = format_duration(estimate['eta_seconds'])
+            estimates.append(estimate)
+        
+        # Task descriptions depend on (session key, registry entry) only
+        task_memo = {}
+        tasks = []
+        for key, agent_id, entry in zip(keys, ids, entries):
+            if (key, agent_id) not in task_memo:
+                task_memo[(key, agent_id)] = get_task_description(key, entry)
+            tasks.append(task_memo[(key, agent_id)])
+        
+        for key, agent_id, entry, session, eta, task, estimate in zip(keys, ids, entries, rows, etas, tasks, estimates):
+            if entry:
+                name = entry.get('name', 'Main Agent')
+                specialization = entry.get('specialization', '')
+                status = entry.get('current_status', 'unknown')
             else:
-                specialization = get_task_description(session_key, None)
+                name = 'Main Agent'
+                specialization = get_task_description(key, None)
                 status = 'active'
             
-            # Calculate progress
-            progress = calculate_agent_progress(session, registry_entry)
-            
-            # Get quality metrics
+            # Quality metrics are drawn per row, in row order
             quality_metrics = get_quality_metrics(agent_id)
+            age = session.get('age', '')
             
-            agent_data.append({
-                'id': agent_id,
-                'name': agent_name,
-                'session_key': session_key,
-                'specialization': specialization,
-                'status': status,
-                'progress': progress,
-                'eta': calculate_eta(progress, session.get('created_at', '')),
-                'active_since': age if age else 'Recently',
-                'quality_score': quality_metrics['score'],
-                'tests_passed': quality_metrics['tests_passed'],
-                'bugs_found': quality_metrics['bugs_found'],
-                'code_quality': quality_metrics['code_quality'],
-                'task': get_task_description(session_key, registry_entry),
-                'token_usage': session.get('tokens', 'N/A'),
-                'model': session.get('model', 'unknown')
-            })
+            self.id.append(agent_id)
+            self.name.append(name)
+            self.session_key.append(key)
+            self.specialization.append(specialization)
+            self.status.append(status)
+            self.eta.append(eta)
+            self.active_since.append(age if age else 'Recently')
+            self.quality_score.append(quality_metrics['score'])
+            self.tests_passed.append(quality_metrics['tests_passed'])
+            self.bugs_found.append(quality_metrics['bugs_found'])
+            self.code_quality.append(quality_metrics['code_quality'])
+            self.task.append(task)
+            self.token_usage.append(session.get('tokens', 'N/A'))
+            self.model.append(session.get('model', 'unknown'))
+            self.eta_seconds.append(estimate['eta_seconds'])
+            self.eta_low_seconds.append(estimate['eta_low_seconds'])
+            self.eta_high_seconds.append(estimate['eta_high_seconds'])
+            self.active_hours.append(round(elapsed_hours.get(key, 0.0), 2))
+        self.progress.extend(progress)
+        return self
+    
+    def add_idle_registry_agents(self, registry_map):
+        """Append registry agents with no live session (set-based join)"""
+        active_ids = set(self.id)
+        for agent_id, agent in registry_map.items():
+            if agent_id in active_ids:
+                continue
+            self.id.append(agent_id)
+            self.name.append(agent.get('name', agent_id))
+            self.session_key.append('None')
+            self.specialization.append(agent.get('specialization', ''))
+            self.status.append('available')
+            self.progress.append(0)
+            self.eta.append('N/A')
+            self.active_since.append('Not active')
+            self.quality_score.append(0)
+            self.tests_passed.append(0)
+            self.bugs_found.append(0)
+            self.code_quality.append(0)
+            self.task.append('Awaiting assignment')
+            self.token_usage.append('N/A')
+            self.model.append('N/A')
+            self.eta_seconds.append(None)
+            self.eta_low_seconds.append(None)
+            self.eta_high_seconds.append(None)
+            self.active_hours.append(0.0)
+        return self
+    
+    def active_count(self):
+        return sum(1 for value in self.progress if value > 0)
+    
+    def average_progress(self):
+        return sum(self.progress) / len(self.progress) if len(self.progress) else 0
+    
+    def to_records(self):
+        """Row dicts in the established key order"""
+        columns = [getattr(self, column) for column in self.COLUMNS]
+        return [dict(zip(self.COLUMNS, row)) for row in zip(*columns)]
+
+def get_elapsed_hours(history, sessions, now=None):
+    """Hours each session has been observed for, from the progress history"""
+    now = time.time() if now is None else now
+    keys = [session.get('key', '') for session in sessions if isinstance(session, dict)]
+    return {
+        key: (now - first_ts) / 3600
+        for key, first_ts in history.first_seen(keys).items()
+        if now - first_ts >= MIN_OBSERVED_SECONDS
+    }
+
+def get_agent_progress_data(sessions=None, registry=None, history=None, eta_engine=None, alert_engine=None):
+    """Main function to get combined agent progress data"""
+    if sessions is None:
+        sessions = get_openclaw_sessions()
+    if registry is None:
+        registry = get_agent_registry()
+    
+    # Registry agents by ID (the index's own map; raw documents are mapped here)
+    agents_by_id = registry_map(registry)
+    
+    # Real elapsed time replaces the one-hour assumption once a session has history
+    elapsed_hours = get_elapsed_hours(history, sessions) if history is not None else None
     
-    # Add registry agents that aren't in current sessions
-    for agent_id, agent in registry_map.items():
-        if agent_id not in [a['id'] for a in agent_data]:
-            # Not currently active
-            agent_data.append({
-                'id': agent_id,
-                'name': agent.get('name', agent_id),
-                'session_key': 'None',
-                'specialization': agent.get('specialization', ''),
-                'status': 'available',
-                'progress': 0,
-                'eta': 'N/A',
-                'active_since': 'Not active',
-                'quality_score': 0,
-                'tests_passed': 0,
-                'bugs_found': 0,
-                'code_quality': 0,
-                'task': 'Awaiting assignment',
-                'token_usage': 'N/A',
-                'model': 'N/A'
-            })
+    with span('agent_progress', 'classify'):
+        table = (AgentTable()
+                 .load_sessions(sessions, agents_by_id, elapsed_hours, eta_engine)
+                 .add_idle_registry_agents(agents_by_id))
+        agent_data = table.to_records()
     
-    # Calculate alerts
-    alerts = check_for_alerts(agent_data)
+    # Calculate alerts (stateful and deduplicated with an engine, every firing rule without)
+    with span('agent_progress', 'alerts'):
+        alerts = alert_engine.evaluate(agent_data) if alert_engine is not None else check_for_alerts(agent_data)
     
     return {
         'agents': agent_data,
-        'total_agents': len(agent_data),
-        'active_agents': len([a for a in agent_data if a['progress'] > 0]),
-        'average_progress': sum(a['progress'] for a in agent_data) / len(agent_data) if agent_data else 0,
+        'total_agents': len(table),
+        'active_agents': table.active_count(),
+        'average_progress': table.average_progress(),
         'alerts': alerts,
         'last_updated': datetime.now().isoformat(),
         'sources': ['openclaw_sessions', 'agent_registry']
     }
 
-def save_progress_data(data):
-    """Save progress data to JSON file for dashboard"""
-    output_file = '/home/jim/openclaw/agent_progress_data.json'
+def open_history(history_file=HISTORY_FILE):
+    """Open the progress history store, or None if it cannot be created"""
     try:
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"Data saved to {output_file}")
+        return ProgressHistory(history_file)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Progress history unavailable: {e}")
+        return None
+
+def record_history(history, data):
+    """Append this tick's agent samples to the history store"""
+    if history is None:
+        return
+    try:
+        with span('agent_progress', 'history'):
+            history.record_tick(data['agents'])
+    except sqlite3.Error as e:
+        print(f"Error recording progress history: {e}")
+
+def save_eta_state(eta_engine):
+    """Persist smoothed velocities so the next run continues from them"""
+    try:
+        eta_engine.save(time.time())
+    except OSError as e:
+        print(f"Error saving ETA state: {e}")
+
+def save_alert_state(alert_engine):
+    """Persist open/acknowledged/resolved alerts so the next run does not re-raise them"""
+    try:
+        alert_engine.save()
+    except OSError as e:
+        print(f"Error saving alert state: {e}")
+
+def acknowledge_alerts(alert_ids, state_file=ALERT_STATE_FILE):
+    """Mark open alerts as acknowledged in the persisted state"""
+    alert_engine = AlertEngine(state_path=state_file)
+    for alert_id in alert_ids:
+        if alert_engine.acknowledge(alert_id):
+            print(f"Acknowledged {alert_id}")
+        else:
+            print(f"No open alert {alert_id}")
+    save_alert_state(alert_engine)
+
+def save_progress_data(data, output_file=OUTPUT_FILE):
+    """Save progress data to JSON file for dashboard (atomic; skipped if unchanged)"""
+    try:
+        with span('agent_progress', 'export'):
+            # A tick that only redraws the simulated quality metrics leaves the file alone
+            written = export_json(data, output_file, gzip_sidecar=True, ignore_agent_fields=VOLATILE_AGENT_FIELDS)
+        if written:
+            print(f"Data saved to {output_file}")
         return True
     except Exception as e:
         print(f"Error saving data: {e}")
         return False
 
+def watch(session_dir=SESSION_DIR, registry_file=REGISTRY_FILE, output_file=OUTPUT_FILE,
+          history_file=HISTORY_FILE, eta_state_file=ETA_STATE_FILE, debounce=0.25, force_polling=False,
+          metrics_port=None, alert_state_file=ALERT_STATE_FILE):
+    """Long-running mode: recompute on session/registry changes, write only on change"""
+    if metrics_port:
+        start_metrics_server(metrics_port)
+    install_profile_signal(name='agent_progress_tracker')
+    session_dir = os.path.abspath(session_dir)
+    registry_file = os.path.abspath(registry_file)
+    sessions_file = os.path.join(session_dir, 'sessions.json')
+    
+    session_source = FileSessionSource(sessions_file)
+    inputs = {'sessions': get_openclaw_sessions(session_source), 'registry': get_agent_registry(registry_file)}
+    history = open_history(history_file)
+    eta_engine = EtaEngine(state_path=eta_state_file)
+    alert_engine = AlertEngine(state_path=alert_state_file)
+    
+    watcher = create_watcher(force_polling=force_polling)
+    for directory in (session_dir, os.path.dirname(registry_file)):
+        if os.path.isdir(directory):
+            watcher.watch_dir(directory)
+    
+    def publish():
+        data = get_agent_progress_data(inputs['sessions'], inputs['registry'], history, eta_engine, alert_engine)
+        record_history(history, data)
+        save_eta_state(eta_engine)
+        save_alert_state(alert_engine)
+        save_progress_data(data, output_file)
+    
+    def on_events(events):
+        paths = {path for path, _structural in events}
+        changed = False
+        if None in paths or sessions_file in paths:
+            inputs['sessions'] = get_openclaw_sessions(session_source)
+            changed = True
+        if None in paths or registry_file in paths:
+            inputs['registry'] = get_agent_registry(registry_file)
+            changed = True
+        if changed:
+            publish()
+    
+    publish()
+    print(f"Watching {session_dir} and {registry_file} (Ctrl+C to stop)")
+    watch_loop(watcher, on_events, debounce=debounce)
+
 def main():
     """Main function"""
     print("Fetching agent progress data...")
-    data = get_agent_progress_data()
+    sessions = get_openclaw_sessions(default_session_source(SESSIONS_FILE, cli_blocking=True))
+    history = open_history()
+    eta_engine = EtaEngine(state_path=ETA_STATE_FILE)
+    alert_engine = AlertEngine(state_path=ALERT_STATE_FILE)
+    data = get_agent_progress_data(sessions, history=history, eta_engine=eta_engine, alert_engine=alert_engine)
+    record_history(history, data)
+    save_eta_state(eta_engine)
+    save_alert_state(alert_engine)
     
     print(f"\nFound {data['total_agents']} agents ({data['active_agents']} active)")
     print(f"Average progress: {data['average_progress']:.1f}%")
@@ -332,4 +496,16 @@ def main():
     return data
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Track agent progress from OpenClaw sessions and the agent registry")
+    parser.add_argument("--watch", action="store_true", help="keep running and update output on filesystem events")
+    parser.add_argument("--poll", action="store_true", help="with --watch, poll instead of using inotify")
+    parser.add_argument("--metrics-port", type=int, help="with --watch, serve Prometheus metrics on this port")
+    parser.add_argument("--ack", nargs="+", metavar="ALERT_ID", help="acknowledge open alerts by id and exit")
+    args = parser.parse_args()
+    
+    if args.ack:
+        acknowledge_alerts(args.ack)
+    elif args.watch:
+        watch(force_polling=args.poll, metrics_port=args.metrics_port)
+    else:
+        main()
\ No newline at end of file
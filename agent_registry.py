@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Agent Registry Index
+Parsed, validated view of shared_assets/tasks/agent_registry.json kept in
+memory between ticks. The file is re-read only when its inode, mtime or size
+changes; each agent becomes a compact `__slots__` record with its repeated
+strings (status, availability, capability and task-type names) interned,
+and the registry is indexed by id, capability and preferred task type.
+
+Records answer `.get(key, default)` and `key in record` like the dicts they
+replace, so code written against the raw JSON keeps working. A record that
+fails validation is skipped with a message; a file that fails to parse
+(e.g. caught mid-write) leaves the last good index in place, while a
+missing file empties it.
+"""
+
+import json
+import os
+import sys
+import threading
+
+DEFAULT_REGISTRY_FILE = '/home/jim/openclaw/shared_assets/tasks/agent_registry.json'
+
+# String field -> whether to intern it; anything else an agent carries is kept in `extra`
+STRING_FIELDS = {
+    'name': False,
+    'specialization': False,
+    'current_status': True,
+    'contact_method': False,
+    'last_active': False,
+    'availability': True,
+}
+INT_FIELDS = ('tasks_completed', 'tasks_pending', 'success_rate')
+LIST_FIELDS = ('capabilities', 'preferred_task_types')
+
+
+class RegistryError(ValueError):
+    """Raised for an agent entry that does not match the registry schema"""
+
+
+class AgentRecord:
+    """One registry agent; dict-compatible reads via get() / `in`"""
+
+    __slots__ = ('id', 'name', 'specialization', 'current_status', 'contact_method', 'last_active',
+                 'availability', 'capabilities', 'preferred_task_types', 'tasks_completed', 'tasks_pending',
+                 'success_rate', 'extra')
+
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, raw):
+        if not isinstance(raw, dict):
+            raise RegistryError(f"agent entry must be an object, got {type(raw).__name__}")
+        agent_id = raw.get('id')
+        if not isinstance(agent_id, str) or not agent_id:
+            raise RegistryError(f"agent entry without a string id: {raw!r:.80}")
+        self.id = sys.intern(agent_id)
+
+        for field, interned in STRING_FIELDS.items():
+            value = raw.get(field)
+            if value is not None and not isinstance(value, str):
+                raise RegistryError(f"{agent_id}: {field} must be a string")
+            setattr(self, field, sys.intern(value) if interned and value is not None else value)
+        for field in INT_FIELDS:
+            value = raw.get(field)
+            if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0):
+                raise RegistryError(f"{agent_id}: {field} must be a non-negative number")
+            setattr(self, field, value)
+        for field in LIST_FIELDS:
+            value = raw.get(field)
+            if value is not None and (not isinstance(value, list) or not all(isinstance(v, str) for v in value)):
+                raise RegistryError(f"{agent_id}: {field} must be a list of strings")
+            setattr(self, field, tuple(sys.intern(v) for v in value) if value is not None else None)
+
+        extra = {key: value for key, value in raw.items() if key != 'id' and key not in self.FIELDS}
+        self.extra = extra or None
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def to_dict(self):
+        """The entry as it appears in the JSON file (lists restored, absent fields omitted)"""
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = list(value) if field in LIST_FIELDS else value
+        data.update(self.extra or {})
+        return data
+
+    def __repr__(self):
+        return f"AgentRecord({self.id!r})"
+
+
+class AgentRegistry:
+    """
+    id -> AgentRecord index over the registry file, plus capability and
+    task-type indexes; call reload_if_changed() (or lookup through
+    get_agent_registry) to pick up edits.
+    """
+
+    def __init__(self, path=DEFAULT_REGISTRY_FILE):
+        self.path = str(path)
+        self.agents = {}
+        self.by_capability = {}
+        self.by_task_type = {}
+        self._signature = None
+        self._missing = False
+        self._lock = threading.Lock()
+        self.reload_if_changed()
+
+    def reload_if_changed(self):
+        """Re-read the file if it changed on disk; True if the index was rebuilt"""
+        try:
+            st = os.stat(self.path)
+        except OSError as e:
+            if not self._missing:
+                print(f"Error reading agent registry: {e}")
+            self._missing = True
+            self._build([])
+            self._signature = None
+            return False
+        self._missing = False
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return False
+        with self._lock:
+            if signature == self._signature:
+                return False
+            try:
+                with open(self.path, 'rb') as f:
+                    raw = json.loads(f.read())
+                entries = raw.get('agents', [])
+                if not isinstance(entries, list):
+                    raise RegistryError("'agents' must be a list")
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Error reading agent registry: {e}")
+                # Keep the last good index; retry once the file changes again
+                self._signature = signature
+                return False
+            self._build(entries)
+            self._signature = signature
+            return True
+
+    def _build(self, entries):
+        agents, by_capability, by_task_type = {}, {}, {}
+        for entry in entries:
+            try:
+                record = AgentRecord(entry)
+            except RegistryError as e:
+                print(f"Skipping registry agent: {e}")
+                continue
+            if record.id in agents:
+                print(f"Skipping registry agent: duplicate id {record.id}")
+                continue
+            agents[record.id] = record
+            for capability in record.capabilities or ():
+                by_capability.setdefault(capability, []).append(record)
+            for task_type in record.preferred_task_types or ():
+                by_task_type.setdefault(task_type, []).append(record)
+        # Swap whole dicts so readers never see a half-built index
+        self.agents = agents
+        self.by_capability = {key: tuple(records) for key, records in by_capability.items()}
+        self.by_task_type = {key: tuple(records) for key, records in by_task_type.items()}
+
+    def get(self, agent_id, default=None):
+        return self.agents.get(agent_id, default)
+
+    def with_capability(self, capability):
+        """Agents listing `capability`, in registry order"""
+        return self.by_capability.get(capability, ())
+
+    def for_task_type(self, task_type):
+        """Agents that prefer `task_type`, in registry order"""
+        return self.by_task_type.get(task_type, ())
+
+    def __len__(self):
+        return len(self.agents)
+
+    def __iter__(self):
+        return iter(self.agents.values())
+
+    def to_dict(self):
+        """{'agents': [...]} in the registry file's layout"""
+        return {'agents': [record.to_dict() for record in self.agents.values()]}
+
+
+def registry_map(registry):
+    """id -> agent mapping from an AgentRegistry or a raw {'agents': [...]} document"""
+    if isinstance(registry, AgentRegistry):
+        return registry.agents
+    return {agent['id']: agent for agent in registry.get('agents', [])}
+
+
+_registries = {}
+
+
+def load_registry(path=DEFAULT_REGISTRY_FILE):
+    """Shared AgentRegistry for `path`, refreshed if the file changed"""
+    path = os.path.abspath(str(path))
+    registry = _registries.get(path)
+    if registry is None:
+        registry = _registries[path] = AgentRegistry(path)
+    else:
+        registry.reload_if_changed()
+    return registry
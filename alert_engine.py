@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Stateful Alert Engine
+Turns per-tick agent rows into alerts that open once, stay open (or
+acknowledged) while their condition holds, and resolve when it clears.
+
+Each rule fires and clears at different thresholds (hysteresis), so a value
+hovering around the limit does not flap, and a resolved alert cannot reopen
+for the same agent session until its cooldown has passed. Rules are only
+re-evaluated for rows whose inputs changed since the previous tick; alerts
+for sessions that disappeared are resolved. The state is a small JSON map
+persisted between runs, so a restart does not re-raise everything.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+STATE_VERSION = 1
+
+OPEN = 'open'
+ACKNOWLEDGED = 'acknowledged'
+RESOLVED = 'resolved'
+# Stored as one-letter codes
+STATUS_NAMES = {'o': OPEN, 'a': ACKNOWLEDGED, 'r': RESOLVED}
+
+# A resolved alert cannot reopen for the same session within this many seconds
+DEFAULT_COOLDOWN = 1800.0
+
+# Resolved alerts are kept this long (for cooldowns and the dashboard), then dropped
+RESOLVED_RETENTION = 86400.0
+
+
+class AlertRule:
+    """Fire/clear predicates over one agent row, plus its message"""
+
+    __slots__ = ('type', 'fires', 'clears', 'message')
+
+    def __init__(self, alert_type, fires, clears, message):
+        self.type = alert_type
+        self.fires = fires
+        self.clears = clears
+        self.message = message
+
+
+ALERT_RULES = (
+    # Working for a long time; clears only once the session is fresh again
+    AlertRule('stuck',
+              lambda a: a['active_hours'] > 2,
+              lambda a: a['active_hours'] <= 1.5,
+              lambda a: f"{a['name']} has been working for {a['active_hours']:.1f} hours - may need assistance"),
+    # Little progress despite being active; clears a few points above the trigger
+    AlertRule('slow_progress',
+              lambda a: a['progress'] < 20 and a['active_hours'] > 1,
+              lambda a: a['progress'] >= 25 or a['active_hours'] <= 0.75,
+              lambda a: f"{a['name']} showing slow progress ({a['progress']}%)"),
+    AlertRule('quality_issue',
+              lambda a: a['quality_score'] < 70,
+              lambda a: a['quality_score'] >= 75,
+              lambda a: f"{a['name']} quality score low ({a['quality_score']}/100)"),
+)
+
+
+def alert_subject(agent):
+    """Agent session an alert belongs to (registry id + session key)"""
+    return f"{agent['id']}@{agent['session_key']}"
+
+
+def has_session(agent):
+    # Idle registry agents have no live session and placeholder metrics (quality 0)
+    return agent.get('session_key', 'None') != 'None'
+
+
+def rule_inputs(agent):
+    return (agent['progress'], agent.get('active_hours', 0), agent.get('quality_score', 100), agent['name'])
+
+
+def _normalized(agent):
+    return dict(agent, active_hours=agent.get('active_hours', 0), quality_score=agent.get('quality_score', 100))
+
+
+class AlertEngine:
+    """Open/acknowledged/resolved alerts per (rule, agent session), with hysteresis and cooldowns"""
+
+    def __init__(self, state_path=None, rules=ALERT_RULES, cooldown=DEFAULT_COOLDOWN):
+        self.state_path = str(state_path) if state_path else None
+        self.rules = rules
+        self.cooldown = cooldown
+        # alert id -> [status code, opened_at, updated_at, resolved_at, agent name, message]
+        self.alerts = {}
+        # subject -> ids of its open/acknowledged alerts
+        self.by_subject = {}
+        # subject -> (rule inputs at the last evaluation, end of a cooldown that held an alert back or None)
+        self.inputs = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable alert state: {e}")
+            return
+        if saved.get('version') != STATE_VERSION:
+            return
+        self.alerts = saved.get('alerts', {})
+        for alert_id, record in self.alerts.items():
+            if record[0] != 'r':
+                self.by_subject.setdefault(alert_id.split(':', 1)[1], set()).add(alert_id)
+
+    def save(self, now=None):
+        """Drop long-resolved alerts and persist (temp file + rename) if anything changed"""
+        now = time.time() if now is None else now
+        expired = [alert_id for alert_id, record in self.alerts.items()
+                   if record[0] == 'r' and now - record[3] > RESOLVED_RETENTION]
+        for alert_id in expired:
+            del self.alerts[alert_id]
+        if not self.state_path or not (self.dirty or expired):
+            return False
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': STATE_VERSION, 'alerts': self.alerts}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.state_path)
+        self.dirty = False
+        return True
+
+    def evaluate(self, agents, now=None):
+        """Fold one tick of agent rows in; returns the open and acknowledged alerts"""
+        now = time.time() if now is None else now
+        seen = set()
+        for agent in agents:
+            if not has_session(agent):
+                continue
+            subject = alert_subject(agent)
+            seen.add(subject)
+            inputs = rule_inputs(agent)
+            previous = self.inputs.get(subject)
+            if previous is not None and previous[0] == inputs and (previous[1] is None or now < previous[1]):
+                continue
+            agent = _normalized(agent)
+            # Unchanged inputs are evaluated again once a cooldown that suppressed an alert ends
+            recheck_at = None
+            for rule in self.rules:
+                cooldown_end = self._apply(rule, subject, agent, now)
+                if cooldown_end is not None:
+                    recheck_at = cooldown_end if recheck_at is None else min(recheck_at, cooldown_end)
+            self.inputs[subject] = (inputs, recheck_at)
+
+        # Sessions that ended take their alerts with them
+        for subject in [s for s in self.by_subject if s not in seen]:
+            for alert_id in list(self.by_subject[subject]):
+                self._resolve(alert_id, now)
+        for subject in [s for s in self.inputs if s not in seen]:
+            del self.inputs[subject]
+        return self.active_alerts()
+
+    def _apply(self, rule, subject, agent, now):
+        """Open, update or resolve one rule's alert; returns the cooldown end if it held the alert back"""
+        alert_id = f"{rule.type}:{subject}"
+        record = self.alerts.get(alert_id)
+        if record is not None and record[0] != 'r':
+            if rule.clears(agent):
+                self._resolve(alert_id, now)
+                return
+            message = rule.message(agent)
+            if message != record[5] or agent['name'] != record[4]:
+                record[2], record[4], record[5] = now, agent['name'], message
+                self.dirty = True
+            return
+        if not rule.fires(agent):
+            return
+        if record is not None and now - record[3] < self.cooldown:
+            return record[3] + self.cooldown
+        self.alerts[alert_id] = ['o', now, now, None, agent['name'], rule.message(agent)]
+        self.by_subject.setdefault(subject, set()).add(alert_id)
+        self.dirty = True
+
+    def _resolve(self, alert_id, now):
+        record = self.alerts[alert_id]
+        record[0], record[2], record[3] = 'r', now, now
+        subject = alert_id.split(':', 1)[1]
+        ids = self.by_subject.get(subject)
+        if ids is not None:
+            ids.discard(alert_id)
+            if not ids:
+                del self.by_subject[subject]
+        self.dirty = True
+
+    def acknowledge(self, alert_id, now=None):
+        """Mark an open alert as seen; it stays listed until its condition clears"""
+        record = self.alerts.get(alert_id)
+        if record is None or record[0] != 'o':
+            return False
+        record[0], record[2] = 'a', time.time() if now is None else now
+        self.dirty = True
+        return True
+
+    def active_alerts(self):
+        """Open and acknowledged alerts, oldest first, in the dashboard's alert shape"""
+        alerts = []
+        for ids in self.by_subject.values():
+            for alert_id in ids:
+                status, opened_at, _updated, _resolved, name, message = self.alerts[alert_id]
+                alerts.append({
+                    'id': alert_id,
+                    'agent': name,
+                    'type': alert_id.split(':', 1)[0],
+                    'message': message,
+                    'status': STATUS_NAMES[status],
+                    'opened_at': datetime.fromtimestamp(opened_at).isoformat(timespec='seconds'),
+                })
+        alerts.sort(key=lambda alert: (alert['opened_at'], alert['id']))
+        return alerts
+
+    def counts(self):
+        counts = {OPEN: 0, ACKNOWLEDGED: 0, RESOLVED: 0}
+        for record in self.alerts.values():
+            counts[STATUS_NAMES[record[0]]] += 1
+        return counts
+
+
+def check_for_alerts(agent_data):
+    """Stateless evaluation: every firing rule for every live agent session"""
+    alerts = []
+    for agent in agent_data:
+        if not has_session(agent):
+            continue
+        normalized = _normalized(agent)
+        for rule in ALERT_RULES:
+            if rule.fires(normalized):
+                alerts.append({'agent': agent['name'], 'type': rule.type, 'message': rule.message(normalized)})
+    return alerts
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Tracker Benchmarks
+Generates synthetic workloads (workspace trees with ignored-directory bloat,
+sessions.json, large JSONL transcripts, an agent registry and a fake
+`openclaw` CLI with configurable latency) and times each stage of
+real_agent_tracker and agent_progress_tracker against them. Reports wall
+time per stage, the process's peak RSS, and fails when a stage exceeds its
+threshold or regresses against a saved baseline.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import agent_progress_tracker
+import real_agent_tracker
+from content_index import ContentIndex
+from eta_engine import EtaEngine
+from json_export import JsonExporter
+from progress_history import ProgressHistory
+from session_reader import SessionReader
+from session_source import CliSessionSource, FileSessionSource
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_thresholds.json')
+
+# Allowed slowdown against a baseline before a stage counts as a regression
+DEFAULT_TOLERANCE = 0.5
+
+# Slowdowns smaller than this (seconds) are timer noise, whatever the ratio
+MIN_REGRESSION = 0.01
+
+AREA_WORDS = ['dashboard', 'crm', 'linkedin', 'marketing', 'sales', 'deploy', 'docker', 'qa', 'test',
+              'notes', 'assets', 'docs', 'proposal', 'research']
+EXTENSIONS = ['.md', '.html', '.js', '.json', '.py', '.css', '.png']
+AGENT_KINDS = ['content', 'design', 'developer', 'crm', 'dashboard', 'research']
+MODELS = ['claude-sonnet', 'claude-haiku', 'gpt-4o']
+
+
+def peak_rss_mb():
+    """High-water resident set size of this process, in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def generate_workspace(root, files=5000, depth=4, ignored_files=5000, seed=0):
+    """Tree of `files` files up to `depth` levels deep, plus `ignored_files` under ignored dirs"""
+    rng = random.Random(seed)
+    dirs = ['']
+    for _ in range(max(1, files // 25)):
+        parent = rng.choice(dirs)
+        if parent.count('/') + 1 < depth:
+            dirs.append(f"{parent}/{rng.choice(AREA_WORDS)}_{len(dirs)}".lstrip('/'))
+    for rel_dir in dirs:
+        os.makedirs(os.path.join(root, rel_dir), exist_ok=True)
+    for i in range(files):
+        name = f"{rng.choice(AREA_WORDS)}_{i}{rng.choice(EXTENSIONS)}"
+        with open(os.path.join(root, rng.choice(dirs), name), 'w') as f:
+            f.write('x' * rng.randint(0, 256))
+
+    for ignored in ('node_modules', '.git', 'archive'):
+        for i in range(ignored_files // 3):
+            rel_dir = os.path.join(ignored, f"pkg{i // 50}")
+            os.makedirs(os.path.join(root, rel_dir), exist_ok=True)
+            with open(os.path.join(root, rel_dir, f"file{i}.js"), 'w') as f:
+                f.write('y')
+    with open(os.path.join(root, 'index.html'), 'w') as f:
+        f.write('<html></html>')
+
+    # Backdate directories past the scanner's racy-mtime window so the
+    # incremental scan measures the steady state, not a rescan of everything
+    past = time.time() - 60
+    for dirpath, _dirnames, _filenames in os.walk(root):
+        os.utime(dirpath, (past, past))
+    return root
+
+
+def generate_sessions(session_dir, sessions=200, transcript_lines=2000, transcripts=20, seed=0):
+    """sessions.json with `sessions` entries and `transcripts` JSONL files of `transcript_lines` records"""
+    rng = random.Random(seed)
+    os.makedirs(session_dir, exist_ok=True)
+    now = time.time()
+    entries = {}
+    for i in range(sessions):
+        kind = rng.choice(AGENT_KINDS)
+        key = f"agent:main:subagent:{kind}-{i}" if i else "agent:main:main"
+        entries[key] = {
+            'sessionId': f"s{i:06d}",
+            'updatedAt': int((now - rng.randint(0, 7200)) * 1000),
+            'totalTokens': rng.randint(1000, 190000),
+            'contextTokens': 200000,
+            'model': rng.choice(MODELS)
+        }
+    sessions_file = os.path.join(session_dir, 'sessions.json')
+    with open(sessions_file, 'w') as f:
+        json.dump(entries, f)
+
+    for t in range(transcripts):
+        with open(os.path.join(session_dir, f"s{t:06d}.jsonl"), 'w') as f:
+            for line in range(transcript_lines):
+                role = 'user' if line % 2 == 0 else 'assistant'
+                record = {'type': 'message', 'timestamp': now - (transcript_lines - line),
+                          'message': {'role': role, 'content': 'lorem ipsum ' * rng.randint(1, 40)}}
+                if role == 'assistant':
+                    record['message']['model'] = rng.choice(MODELS)
+                    record['message']['usage'] = {'input_tokens': rng.randint(100, 5000),
+                                                  'output_tokens': rng.randint(10, 2000)}
+                f.write(json.dumps(record) + '\n')
+    return sessions_file
+
+
+def generate_registry(path, agents=50):
+    """agent_registry.json with `agents` agents (a few matching the session kinds)"""
+    registry = {'agents': [{'id': kind, 'name': kind.title(), 'specialization': f"{kind} work"}
+                           for kind in ['main', 'content_creator', 'designer', 'developer', 'dashboard']]}
+    registry['agents'] += [{'id': f"agent{i}", 'name': f"Agent {i}", 'specialization': 'general'}
+                           for i in range(max(0, agents - len(registry['agents'])))]
+    with open(path, 'w') as f:
+        json.dump(registry, f)
+    return path
+
+
+def write_fake_cli(path, sessions_file, latency=0.5):
+    """Executable that behaves like `openclaw sessions --json` after `latency` seconds"""
+    with open(path, 'w') as f:
+        f.write(f"""#!{sys.executable}
+import sys, time
+time.sleep({latency!r})
+with open({sessions_file!r}) as f:
+    sys.stdout.write(f.read())
+""")
+    os.chmod(path, 0o755)
+    return path
+
+
+class Bench:
+    """Runs named stages, keeping per-stage timings and the RSS high-water mark"""
+
+    def __init__(self, repeat=5):
+        self.repeat = repeat
+        self.results = {}
+
+    def stage(self, name, fn, setup=None, repeat=None):
+        times = []
+        result = None
+        for _ in range(repeat or self.repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        self.results[name] = {
+            'min_seconds': min(times),
+            'median_seconds': statistics.median(times),
+            'peak_rss_mb': round(peak_rss_mb(), 1)
+        }
+        print(f"  {name:32} {min(times) * 1000:9.1f} ms (median {statistics.median(times) * 1000:.1f} ms)"
+              f"  rss {peak_rss_mb():.0f} MB")
+        return result
+
+
+def run_benchmarks(workspace, session_dir, registry_file, cache_dir, cli_command=None, repeat=5):
+    """Time every tracker stage against the given roots; returns {stage: timings}"""
+    bench = Bench(repeat)
+    index_path = os.path.join(cache_dir, 'scan_index.json')
+    checkpoint_path = os.path.join(cache_dir, 'session_checkpoints.json')
+    content_path = str(real_agent_tracker.content_index_path(index_path))
+    sessions_file = os.path.join(session_dir, 'sessions.json')
+
+    def drop_index():
+        for path in (index_path, checkpoint_path, content_path):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    print("real_agent_tracker")
+    scanner = real_agent_tracker.make_scanner(workspace, index_path)
+    bench.stage('scan_full', lambda: scanner.scan(full=True))
+    scanner.save_index()
+    bench.stage('scan_incremental', lambda: real_agent_tracker.make_scanner(workspace, index_path).scan())
+    entries = scanner.files
+    bench.stage('categorize_and_count', lambda: real_agent_tracker.CompletedWork().load(entries))
+    bench.stage('content_hash_cold', lambda: ContentIndex(workspace).sync(entries))
+    content = ContentIndex(workspace)
+    content.sync(entries)
+    bench.stage('content_sync_warm', lambda: content.sync(entries))
+    bench.stage('transcripts_cold', lambda: SessionReader(session_dir).read_all())
+    reader = SessionReader(session_dir, checkpoint_path)
+    reader.read_all()
+    reader.save_checkpoints()
+    bench.stage('transcripts_checkpointed', lambda: SessionReader(session_dir, checkpoint_path).read_all())
+    bench.stage('get_real_agent_data_cold', lambda: real_agent_tracker.get_real_agent_data(
+        workspace, session_dir, index_path, checkpoint_path=checkpoint_path), setup=drop_index)
+    real_data = bench.stage('get_real_agent_data_warm', lambda: real_agent_tracker.get_real_agent_data(
+        workspace, session_dir, index_path, checkpoint_path=checkpoint_path))
+
+    print("agent_progress_tracker")
+    sessions = bench.stage('sessions_file_parse', lambda: FileSessionSource(sessions_file).fetch())
+    if cli_command:
+        bench.stage('sessions_cli', lambda: CliSessionSource(cli_command, timeout=30).fetch(), repeat=1)
+    registry = agent_progress_tracker.get_agent_registry(registry_file)
+    bench.stage('get_agent_progress_data', lambda: agent_progress_tracker.get_agent_progress_data(sessions, registry))
+    history = ProgressHistory(os.path.join(cache_dir, 'progress_history.db'))
+    eta_engine = EtaEngine(state_path=os.path.join(cache_dir, 'eta_state.json'))
+    data = bench.stage('get_agent_progress_data_full', lambda: agent_progress_tracker.get_agent_progress_data(
+        sessions, registry, history, eta_engine))
+    bench.stage('record_history', lambda: history.record_tick(data['agents']))
+    history.close()
+
+    print("export")
+    exporter = JsonExporter(os.path.join(cache_dir, 'export.json'), gzip_sidecar=True)
+    bench.stage('export_changed', lambda: exporter.export(dict(data, average_progress=random.random())))
+    bench.stage('export_unchanged', lambda: exporter.export(data))
+    bench.stage('export_real_progress', lambda: JsonExporter(os.path.join(cache_dir, 'real.json')).export(real_data),
+                repeat=1)
+    return bench.results
+
+
+def check_results(results, thresholds=None, baseline=None, tolerance=DEFAULT_TOLERANCE):
+    """List of human-readable failures: absolute thresholds first, then baseline regressions"""
+    failures = []
+    for stage, limit in (thresholds or {}).items():
+        if stage in results and results[stage]['min_seconds'] > limit:
+            failures.append(f"{stage}: {results[stage]['min_seconds']:.3f}s over the {limit:.3f}s threshold")
+    for stage, previous in (baseline or {}).items():
+        if stage not in results:
+            continue
+        current = results[stage]['min_seconds']
+        if current > previous['min_seconds'] * (1 + tolerance) and current - previous['min_seconds'] > MIN_REGRESSION:
+            failures.append(f"{stage}: {current:.3f}s vs baseline "
+                            f"{previous['min_seconds']:.3f}s (+{tolerance:.0%} allowed)")
+    return failures
+
+
+def load_json(path, key=None):
+    if not path:
+        return None
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return data.get(key, data) if key else data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Python trackers on synthetic or real data")
+    parser.add_argument('--root', help="directory for generated data (default: a temp dir, removed afterwards)")
+    parser.add_argument('--workspace', help="benchmark an existing workspace instead of generating one")
+    parser.add_argument('--session-dir', help="benchmark an existing sessions directory instead of generating one")
+    parser.add_argument('--registry', help="existing agent_registry.json")
+    parser.add_argument('--files', type=int, default=5000)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--ignored-files', type=int, default=5000, help="files under node_modules/.git/archive")
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--transcripts', type=int, default=20)
+    parser.add_argument('--transcript-lines', type=int, default=2000)
+    parser.add_argument('--agents', type=int, default=50)
+    parser.add_argument('--cli-latency', type=float, default=0.5, help="fake openclaw CLI delay (negative: skip)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS if os.path.exists(DEFAULT_THRESHOLDS) else None)
+    parser.add_argument('--baseline', help="results JSON from an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--output', help="write results JSON here (usable as a later --baseline)")
+    args = parser.parse_args()
+
+    root = args.root or tempfile.mkdtemp(prefix='tracker-bench-')
+    try:
+        cache_dir = os.path.join(root, 'cache')
+        os.makedirs(cache_dir, exist_ok=True)
+        started = time.perf_counter()
+        workspace = args.workspace or generate_workspace(os.path.join(root, 'workspace'), args.files, args.depth,
+                                                         args.ignored_files)
+        session_dir = args.session_dir or os.path.join(root, 'sessions')
+        if not args.session_dir:
+            generate_sessions(session_dir, args.sessions, args.transcript_lines, args.transcripts)
+        registry_file = args.registry or generate_registry(os.path.join(root, 'agent_registry.json'), args.agents)
+        cli_command = None
+        if args.cli_latency >= 0:
+            cli_command = [write_fake_cli(os.path.join(root, 'openclaw'), os.path.join(session_dir, 'sessions.json'),
+                                          args.cli_latency)]
+        print(f"Workload ready in {time.perf_counter() - started:.1f}s under {root}")
+
+        results = run_benchmarks(workspace, session_dir, registry_file, cache_dir, cli_command, args.repeat)
+    finally:
+        if not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        'workload': {key: getattr(args, key) for key in ('files', 'depth', 'ignored_files', 'sessions',
+                                                         'transcripts', 'transcript_lines', 'agents', 'cli_latency')},
+        'python': sys.version.split()[0],
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'stages': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline = load_json(args.baseline)
+    if baseline and baseline.get('workload') != report['workload']:
+        print(f"Note: baseline was measured on a different workload: {baseline.get('workload')}")
+    failures = check_results(results, load_json(args.thresholds, 'stages'),
+                             baseline.get('stages') if baseline else None, args.tolerance)
+    print(f"\nPeak RSS: {report['peak_rss_mb']:.0f} MB")
+    if failures:
+        print("REGRESSIONS:")
+        for failure in failures:
+            print(f"  • {failure}")
+        return 1
+    print("All stages within thresholds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Content Change Index
+Persisted path -> (size, mtime, fast hash, full hash, changed at) record for
+a workspace, so "completed work" means the content changed rather than the
+mtime moved. The fast hash is blake2b over the size plus the first and last
+HASH_BLOCK bytes (the whole file when it is smaller than two blocks); the
+full-file hash is computed on demand and only kept until the file changes.
+
+A file is re-hashed only when its (size, mtime) stat tuple differs from the
+index, i.e. the same entries the incremental scanner already produces. A
+touch or an identical rewrite leaves `changed_at` alone; a real edit sets it
+to the new mtime. For files larger than two blocks an equal fast hash counts
+as unchanged unless a full hash was taken (full_hash()), in which case the
+full hash decides. Changes can then be listed for any window (last N hours,
+since a named checkpoint) without reading unchanged files.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+INDEX_VERSION = 2
+HASH_NAME = 'blake2b-128'
+HASH_BLOCK = 64 * 1024
+
+# Removed paths are remembered this long so windows can report deletions
+REMOVED_RETENTION = 7 * 86400
+
+
+def fast_hash(path, size):
+    """Hex digest of size + head block + tail block; (digest, covers whole file)"""
+    h = hashlib.blake2b(size.to_bytes(8, 'little'), digest_size=16)
+    with open(path, 'rb') as f:
+        if size <= 2 * HASH_BLOCK:
+            h.update(f.read())
+            return h.hexdigest(), True
+        h.update(f.read(HASH_BLOCK))
+        f.seek(-HASH_BLOCK, os.SEEK_END)
+        h.update(f.read(HASH_BLOCK))
+    return h.hexdigest(), False
+
+
+def full_hash(path):
+    """Hex digest of size + the whole file, streamed (equal to fast_hash for files it covers whole)"""
+    with open(path, 'rb') as f:
+        h = hashlib.blake2b(os.fstat(f.fileno()).st_size.to_bytes(8, 'little'), digest_size=16)
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ContentIndex:
+    """
+    Content-change tracking over scanner entries. `files` maps rel_path to
+    [size, mtime, fast hash, full hash or None, changed_at].
+    """
+
+    def __init__(self, root, index_path=None):
+        self.root = os.path.abspath(str(root))
+        self.index_path = str(index_path) if index_path else None
+        self.files = {}
+        self.removed = {}
+        self.checkpoints = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable content index: {e}")
+            return
+        if (index.get('version') != INDEX_VERSION or index.get('root') != self.root
+                or index.get('hash') != HASH_NAME or index.get('block') != HASH_BLOCK):
+            return
+        self.files = index.get('files', {})
+        self.removed = index.get('removed', {})
+        self.checkpoints = index.get('checkpoints', {})
+
+    def save(self):
+        """Persist the index (temp file + rename) if it changed"""
+        if not self.index_path or not self.dirty:
+            return False
+        cutoff = time.time() - REMOVED_RETENTION
+        self.removed = {path: ts for path, ts in self.removed.items() if ts >= cutoff}
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'root': self.root,
+                'hash': HASH_NAME,
+                'block': HASH_BLOCK,
+                'files': self.files,
+                'removed': self.removed,
+                'checkpoints': self.checkpoints,
+            }, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+        return True
+
+    def update(self, rel_path, entry):
+        """
+        Apply one scanner entry (mtime, size, ...) or None for a removed file.
+        Returns True if the content changed (or the file is new or gone).
+        """
+        old = self.files.get(rel_path)
+        if entry is None:
+            if old is None:
+                return False
+            del self.files[rel_path]
+            self.removed[rel_path] = time.time()
+            self.dirty = True
+            return True
+
+        mtime, size = entry[0], entry[1]
+        if old is not None and old[0] == size and old[1] == mtime:
+            return False
+        abs_path = os.path.join(self.root, rel_path)
+        try:
+            digest, complete = fast_hash(abs_path, size)
+        except OSError:
+            return False
+        self.dirty = True
+
+        if old is None:
+            # First sighting: the mtime is the best guess at when the content appeared
+            self.files[rel_path] = [size, mtime, digest, digest if complete else None, mtime]
+            self.removed.pop(rel_path, None)
+            return True
+
+        changed = digest != old[2]
+        whole = digest if complete else None
+        if not changed and not complete and old[3] is not None:
+            # Same head and tail, and a full hash to compare against: rule out an edit in the middle
+            try:
+                whole = full_hash(abs_path)
+            except OSError:
+                return False
+            changed = whole != old[3]
+        self.files[rel_path] = [size, mtime, digest, whole, mtime if changed else old[4]]
+        return changed
+
+    def sync(self, entries):
+        """Bring the index in line with a full {rel_path: entry} scan; returns the changed paths"""
+        changed = {rel_path for rel_path, entry in entries.items() if self.update(rel_path, entry)}
+        for rel_path in [path for path in self.files if path not in entries]:
+            self.update(rel_path, None)
+            changed.add(rel_path)
+        return changed
+
+    def changed_at(self, rel_path):
+        """Time of the file's last real content change, or None if unknown"""
+        record = self.files.get(rel_path)
+        return record[4] if record else None
+
+    def full_hash(self, rel_path):
+        """Whole-file hash, computed once per file version"""
+        record = self.files.get(rel_path)
+        if record is None:
+            return None
+        if record[3] is None:
+            abs_path = os.path.join(self.root, rel_path)
+            digest = full_hash(abs_path)
+            st = os.stat(abs_path)
+            if (st.st_size, st.st_mtime) != (record[0], record[1]):
+                # Changed since the last scan: the hash belongs to a version the index has not seen
+                return digest
+            record[3] = digest
+            self.dirty = True
+        return record[3]
+
+    def changes_since(self, since):
+        """({rel_path: changed_at} modified at or after `since`, {rel_path: removed_at} likewise)"""
+        since = self.resolve_since(since)
+        modified = {path: record[4] for path, record in self.files.items() if record[4] >= since}
+        removed = {path: ts for path, ts in self.removed.items() if ts >= since}
+        return modified, removed
+
+    def resolve_since(self, since):
+        """Epoch seconds for a timestamp or a checkpoint name"""
+        if isinstance(since, str):
+            if since not in self.checkpoints:
+                raise KeyError(f"no checkpoint named {since!r}")
+            return self.checkpoints[since]
+        return since
+
+    def checkpoint(self, name, when=None):
+        """Remember `when` (default now) as checkpoint `name` for later windows"""
+        self.checkpoints[name] = time.time() if when is None else when
+        self.dirty = True
+        return self.checkpoints[name]
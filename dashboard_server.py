@@ -0,0 +1,950 @@
+#!/usr/bin/env python3
+"""
+Unified Dashboard Server
+Threaded static file server behind server.py, public_server.py and
+tunnel_server.py. Hot file bodies and their gzip/brotli variants live in a
+size-bounded LRU, large binaries go out with sendfile(), every response
+carries an ETag, conditional and Range requests are honoured, and caching
+headers depend on the kind of asset. With a progress feed attached,
+/events/progress streams agent progress as Server-Sent Events, and
+/metrics exposes request and cache metrics in Prometheus text format.
+/api/progress serves the same live progress document from a short-TTL
+single-flight cache (one computation however many viewers poll, ETag/304
+for unchanged results), and /api/work?page=N&per_page=M pages through the completed_work shards that
+real_agent_tracker writes next to real_progress.json (see work_shards).
+Optional HTTP Basic auth checks every request against an .htpasswd file,
+and .ht* files themselves are never served.
+
+Connections are HTTP/1.1 keep-alive with an idle timeout, and each process
+accepts at most `max_connections` at a time (the rest wait in the kernel's
+listen backlog). With workers > 1 the server pre-forks that many processes,
+each with its own SO_REUSEPORT listening socket, so the kernel spreads
+connections across cores; every worker keeps its own static cache, progress
+feed and metrics.
+
+With graceful_reload, SIGHUP re-runs the program with the listening socket
+inherited (its fd number in DASHBOARD_LISTEN_FD). Once the new process is
+serving, the old one stops accepting, answers its remaining requests with
+`Connection: close` and exits when they finish, so a deploy neither drops
+connections nor changes port. Connections still waiting in the listen
+backlog are accepted by the new process.
+"""
+
+import argparse
+import email.utils
+import functools
+import gzip
+import hashlib
+import http.server
+import mimetypes
+import os
+import re
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+
+import metrics
+from htpasswd_auth import DEFAULT_REALM, BasicAuth
+from progress_events import DEFAULT_TTL, ProgressBroadcaster, ProgressCache, ProgressFeed
+from work_shards import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, WorkShardReader, shard_dir_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Compressible files up to this size keep their bytes (and variants) in memory
+MAX_CACHED_FILE = 4 * 1024 * 1024
+
+# Other files above this size are sent with sendfile() straight from the page cache
+SENDFILE_THRESHOLD = 64 * 1024
+
+# Upper bound on cached bodies across all files (least recently used go first)
+HOT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Smaller bodies are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+
+# Completed work shards (work_shards) are served as-is too
+mimetypes.add_type('application/x-ndjson', '.ndjson')
+
+# Apache-style: never serve .htpasswd/.htaccess
+PROTECTED_NAME = re.compile(r'(^|/)\.ht[^/]*$')
+
+EVENTS_PATH = '/events/progress'
+METRICS_PATH = '/metrics'
+WORK_PATH = '/api/work'
+PROGRESS_PATH = '/api/progress'
+
+# Completed work shards, relative to the served directory
+WORK_SHARD_DIR = shard_dir_for('real_progress.json')
+
+# Seconds between agent progress updates on EVENTS_PATH
+DEFAULT_PROGRESS_INTERVAL = 5.0
+
+# Idle SSE connections get a comment line this often so proxies keep them open
+HEARTBEAT_INTERVAL = 15.0
+
+# Client reconnect delay suggested to EventSource (milliseconds)
+EVENTS_RETRY_MS = 3000
+
+# Idle keep-alive connections (and stalled clients) are dropped after this many seconds
+KEEPALIVE_TIMEOUT = 15.0
+
+# Connections served at once per process; further clients queue in the listen backlog
+MAX_CONNECTIONS = 256
+
+# Pre-forked worker processes (DASHBOARD_WORKERS overrides; 0 means one per core)
+DEFAULT_WORKERS = int(os.environ.get('DASHBOARD_WORKERS', '1'))
+
+# Seconds before a worker that died is started again
+WORKER_RESTART_DELAY = 1.0
+
+# Set by a reloading server for its replacement: inherited listening socket and readiness pipe
+LISTEN_FD_ENV = 'DASHBOARD_LISTEN_FD'
+READY_FD_ENV = 'DASHBOARD_READY_FD'
+
+# Seconds the replacement process gets to start serving before a reload is abandoned
+RELOAD_READY_TIMEOUT = 30.0
+
+# Seconds a replaced process waits for its open connections before exiting anyway
+DRAIN_TIMEOUT = 30.0
+
+# name.<hash>.ext or name-<hash>.ext: safe to cache forever
+HASHED_ASSET = re.compile(r'[.-][0-9a-fA-F]{8,}\.[A-Za-z0-9]+$')
+
+REQUEST_SECONDS = metrics.REGISTRY.histogram('dashboard_http_request_duration_seconds',
+                                             "Time to handle a request (event streams excluded)", ('method', 'code'))
+RESPONSE_BYTES = metrics.REGISTRY.counter('dashboard_http_response_bytes_total', "Response body bytes sent")
+CACHE_LOOKUPS = metrics.REGISTRY.counter('dashboard_static_cache_lookups_total',
+                                         "Static cache lookups by result (hit, miss)", ('result',))
+CACHE_BYTES = metrics.REGISTRY.gauge('dashboard_static_cache_bytes', "File bytes held in the static cache")
+ACTIVE_CONNECTIONS = metrics.REGISTRY.gauge('dashboard_active_connections', "Open client connections")
+AUTH_FAILURES = metrics.REGISTRY.counter('dashboard_auth_failures_total', "Rejected Basic auth attempts",
+                                         ('reason',))
+EVENT_STREAM_CLIENTS = metrics.REGISTRY.gauge('dashboard_event_stream_clients', "Connected /events/progress clients")
+
+CACHE_IMMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_REVALIDATE = 'no-cache'
+CACHE_DEFAULT = 'public, max-age=3600'
+
+
+def cache_control_for(path):
+    """Hashed assets are immutable; HTML and JSON feeds revalidate; everything else is short-lived"""
+    name = os.path.basename(path)
+    if HASHED_ASSET.search(name):
+        return CACHE_IMMUTABLE
+    if name.endswith(('.html', '.htm', '.json')):
+        return CACHE_REVALIDATE
+    return CACHE_DEFAULT
+
+
+class CachedFile:
+    """
+    One file version: metadata always, the body (plus lazily built compressed
+    variants) only when it is worth holding in memory. Entries without a body
+    are served with sendfile().
+    """
+
+    __slots__ = ('signature', 'body', 'size', 'etag', 'content_type', 'last_modified', 'variants', 'lock')
+
+    def __init__(self, signature, body, size, content_type, mtime):
+        self.signature = signature
+        self.body = body
+        self.size = size
+        if body is not None:
+            self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        else:
+            # Not read into memory, so derive the validator from the file version
+            self.etag = f'"{signature[0]:x}-{size:x}"'
+        self.content_type = content_type
+        self.last_modified = email.utils.formatdate(mtime, usegmt=True)
+        self.variants = {}
+        self.lock = threading.Lock()
+
+    def compressible(self):
+        return (self.body is not None and self.size >= MIN_COMPRESS_SIZE
+                and self.content_type.startswith(COMPRESSIBLE_TYPES))
+
+    def variant(self, encoding):
+        """Compressed body for 'br' or 'gzip', or None if it would not help"""
+        with self.lock:
+            if encoding not in self.variants:
+                if encoding == 'br' and brotli is not None:
+                    data = brotli.compress(self.body, quality=11)
+                elif encoding == 'gzip':
+                    data = gzip.compress(self.body, compresslevel=9, mtime=0)
+                else:
+                    data = None
+                self.variants[encoding] = data if data is not None and len(data) < len(self.body) else None
+            return self.variants[encoding]
+
+
+def is_compressible_type(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class StaticCache:
+    """
+    Size-bounded LRU of path -> CachedFile, invalidated when the file's
+    (mtime, size) changes. Only bodies count against max_bytes.
+    """
+
+    def __init__(self, max_bytes=HOT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.files = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, fs_path, st):
+        signature = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            cached = self.files.get(fs_path)
+            if cached is not None and cached.signature == signature:
+                self.files.move_to_end(fs_path)
+                CACHE_LOOKUPS.labels('hit').inc()
+                return cached
+        CACHE_LOOKUPS.labels('miss').inc()
+
+        content_type = mimetypes.guess_type(fs_path)[0] or 'application/octet-stream'
+        keep_body = (st.st_size < SENDFILE_THRESHOLD
+                     or (is_compressible_type(content_type) and st.st_size <= MAX_CACHED_FILE))
+        body = None
+        if keep_body:
+            with open(fs_path, 'rb') as f:
+                body = f.read()
+            # The file may have changed between stat() and read()
+            signature = (signature[0], len(body))
+        cached = CachedFile(signature, body, signature[1], content_type, st.st_mtime)
+
+        with self.lock:
+            old = self.files.pop(fs_path, None)
+            if old is not None and old.body is not None:
+                self.used_bytes -= old.size
+            self.files[fs_path] = cached
+            if body is not None:
+                self.used_bytes += cached.size
+            while self.used_bytes > self.max_bytes and len(self.files) > 1:
+                _path, evicted = self.files.popitem(last=False)
+                if evicted.body is not None:
+                    self.used_bytes -= evicted.size
+            CACHE_BYTES.set(self.used_bytes)
+        return cached
+
+
+def parse_range(header, size):
+    """
+    Single 'bytes=' range -> (start, end) inclusive; None to ignore the header
+    (absent, malformed or multi-range: the full body is sent instead);
+    False when the range cannot be satisfied.
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[6:].strip().partition('-')
+    try:
+        if first == '':
+            suffix = int(last)
+            if suffix <= 0:
+                return False
+            return (max(0, size - suffix), size - 1) if size else False
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start > end:
+        return None
+    if start >= size:
+        return False
+    return start, min(end, size - 1)
+
+
+def accepted_encodings(header):
+    """Parse Accept-Encoding into the set of codings with a non-zero q"""
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding)
+    return accepted
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # Weak comparison is fine for GET/HEAD (RFC 9110 13.1.2)
+    opaque = lambda tag: tag[2:] if tag.startswith('W/') else tag
+    return opaque(etag) in {opaque(tag.strip()) for tag in header.split(',')}
+
+
+class DashboardRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static handler with in-memory caching, compression and conditional GETs"""
+
+    # Persistent connections: every response carries a Content-Length or closes the connection
+    protocol_version = 'HTTP/1.1'
+    # Headers and small bodies go out as separate writes; do not let Nagle hold the second back
+    disable_nagle_algorithm = True
+
+    # Overridden per server by make_server()
+    cors = False
+    root_path = None
+    log_client_ip = False
+    expose_metrics = True
+    auth = None
+    timeout = KEEPALIVE_TIMEOUT
+
+    def handle_one_request(self):
+        start = time.perf_counter()
+        self.status_code = None
+        # A malformed request line (400) or an over-long one (414) never sets path or command
+        self.path = ''
+        super().handle_one_request()
+        if self.status_code is not None and self.path.split('?', 1)[0] != EVENTS_PATH:
+            command = getattr(self, 'command', None) or 'INVALID'
+            REQUEST_SECONDS.labels(command, self.status_code).observe(time.perf_counter() - start)
+
+    def send_response(self, code, message=None):
+        self.status_code = code
+        super().send_response(code, message)
+
+    def do_GET(self):
+        self.dispatch(head_only=False)
+
+    def do_HEAD(self):
+        self.dispatch(head_only=True)
+
+    def dispatch(self, head_only):
+        """Route GET and HEAD alike; HEAD gets the same status and headers without a body"""
+        if not self.authorize():
+            return
+        if self.root_path and self.path == '/':
+            self.path = self.root_path
+        url_path = self.path.split('?', 1)[0]
+        if url_path == EVENTS_PATH and self.server.progress_events is not None:
+            self.send_event_stream(head_only)
+        elif url_path == METRICS_PATH and self.expose_metrics:
+            self.send_metrics(head_only)
+        elif url_path == WORK_PATH:
+            self.send_work_page(head_only)
+        elif url_path == PROGRESS_PATH and self.server.progress_cache is not None:
+            self.send_progress(head_only)
+        elif self.send_cached(head_only=head_only) is NotImplemented:
+            if head_only:
+                super().do_HEAD()
+            else:
+                super().do_GET()
+
+    def authorize(self):
+        """Enforce Basic auth (when configured) and hide .ht* files; False once a response was sent"""
+        # Check the file the request maps to, so percent-encoding (/%2Ehtpasswd) cannot slip past
+        fs_name = os.path.basename(self.translate_path(self.path).rstrip(os.sep))
+        if PROTECTED_NAME.search(fs_name):
+            self.send_error(404)
+            return False
+        if self.auth is None:
+            return True
+        user, retry_after = self.auth.check(self.headers.get('Authorization'), self.client_address[0])
+        if user is not None:
+            return True
+        self.close_connection = True
+        if retry_after:
+            AUTH_FAILURES.labels('throttled').inc()
+            self.send_response(429)
+            self.send_header('Retry-After', str(retry_after))
+        else:
+            AUTH_FAILURES.labels('invalid' if self.headers.get('Authorization') else 'missing').inc()
+            self.send_response(401)
+            self.send_header('WWW-Authenticate', self.auth.challenge())
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+        return False
+
+    def end_headers(self):
+        if self.cors:
+            self.send_header('Access-Control-Allow-Origin', '*')
+        if self.server.draining and not self.close_connection:
+            # Being replaced: finish this response, the client reconnects to the new process
+            self.send_header('Connection', 'close')
+        if not self.close_connection and self.request_version == 'HTTP/1.1':
+            self.send_header('Keep-Alive', f'timeout={int(self.timeout)}')
+        super().end_headers()
+
+    def log_error(self, format, *args):
+        # Idle keep-alive connections timing out are routine, not errors
+        if format.startswith('Request timed out'):
+            return
+        super().log_error(format, *args)
+
+    def log_message(self, format, *args):
+        if self.log_client_ip:
+            print(f"{self.client_address[0]} - {format % args}")
+        else:
+            super().log_message(format, *args)
+
+    def send_cached(self, head_only):
+        """Serve a regular file; NotImplemented defers to the stock handler"""
+        url_path = self.path.split('?', 1)[0].split('#', 1)[0]
+        fs_path = self.translate_path(self.path)
+        if url_path.endswith('/') or os.path.isdir(fs_path):
+            return NotImplemented
+        try:
+            st = os.stat(fs_path)
+            cached = self.server.static_cache.get(fs_path, st)
+        except OSError:
+            return NotImplemented
+
+        # Byte ranges are served from the identity body only
+        byte_range = None
+        if_range = self.headers.get('If-Range')
+        if if_range is None or if_range.strip() in (cached.etag, cached.last_modified):
+            byte_range = parse_range(self.headers.get('Range'), cached.size)
+
+        encoding = None
+        body = cached.body
+        if byte_range is None and cached.compressible():
+            accepted = accepted_encodings(self.headers.get('Accept-Encoding'))
+            for candidate in ('br', 'gzip'):
+                if candidate in accepted:
+                    variant = cached.variant(candidate)
+                    if variant is not None:
+                        encoding, body = candidate, variant
+                        break
+        etag = cached.etag if encoding is None else f'{cached.etag[:-1]}-{encoding}"'
+
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self.send_common_headers(cached, etag, url_path)
+            self.end_headers()
+            return True
+
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{cached.size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return True
+
+        if byte_range is None:
+            start, length = 0, cached.size if body is None else len(body)
+            self.send_response(200)
+        else:
+            start, length = byte_range[0], byte_range[1] - byte_range[0] + 1
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {byte_range[0]}-{byte_range[1]}/{cached.size}')
+        self.send_common_headers(cached, etag, url_path)
+        self.send_header('Content-Type', cached.content_type)
+        self.send_header('Content-Length', str(length))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if head_only or length == 0:
+            return True
+
+        if body is not None:
+            self.wfile.write(memoryview(body)[start:start + length])
+        else:
+            self.send_file_range(fs_path, start, length)
+        RESPONSE_BYTES.inc(length)
+        return True
+
+    def send_file_range(self, fs_path, start, length):
+        """Zero-copy body from disk (socket.sendfile falls back to send() where unsupported)"""
+        with open(fs_path, 'rb') as f:
+            self.wfile.flush()
+            self.connection.sendfile(f, start, length)
+
+    def send_event_stream(self, head_only=False):
+        """SSE: catch-up frames for Last-Event-ID (or a snapshot), then patches as they happen"""
+        events = self.server.progress_events
+        try:
+            last_id = int(self.headers.get('Last-Event-ID', ''))
+        except ValueError:
+            last_id = None
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        if head_only:
+            return
+        self.close_connection = True
+        EVENT_STREAM_CLIENTS.inc()
+        try:
+            self.wfile.write(f"retry: {EVENTS_RETRY_MS}\n\n".encode('ascii'))
+            self.wfile.flush()
+            while not events.closed:
+                frames = events.events_since(last_id)
+                if frames:
+                    payload = b''.join(frames)
+                    self.wfile.write(payload)
+                    RESPONSE_BYTES.inc(len(payload))
+                    last_id = events.version
+                elif not events.wait(last_id, HEARTBEAT_INTERVAL):
+                    self.wfile.write(b': heartbeat\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            EVENT_STREAM_CLIENTS.dec()
+
+    def send_metrics(self, head_only=False):
+        body = metrics.REGISTRY.render()
+        self.send_response(200)
+        self.send_header('Content-Type', metrics.CONTENT_TYPE)
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def send_work_page(self, head_only=False):
+        """One page of completed work, newest first; 304 while the shards are unchanged"""
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        try:
+            page = int(query.get('page', ['1'])[0])
+            per_page = int(query.get('per_page', [str(DEFAULT_PAGE_SIZE)])[0])
+        except ValueError:
+            self.send_error(400, "page and per_page must be integers")
+            return
+        if page < 1 or not 1 <= per_page <= MAX_PAGE_SIZE:
+            self.send_error(400, f"page must be >= 1 and per_page between 1 and {MAX_PAGE_SIZE}")
+            return
+        etag, body = self.server.work_shards.render_page(page, per_page)
+        self.send_json(body, etag, head_only=head_only)
+
+    def send_progress(self, head_only=False):
+        """Live get_agent_progress_data() from the server's single-flight cache"""
+        try:
+            entry = self.server.progress_cache.get()
+        except Exception as e:
+            self.send_error(503, f"Progress unavailable: {e}")
+            return
+        # Weak: the ETag leaves out the simulated quality fields, so bodies under one ETag can differ
+        self.send_json(entry.body, entry.etag, entry.gzipped, head_only, weak=True)
+
+    def send_json(self, body, etag, gzipped=None, head_only=False, weak=False):
+        """JSON response with an ETag: 304 on a matching If-None-Match, gzip when accepted"""
+        encoding = 'gzip' if len(body) >= MIN_COMPRESS_SIZE and 'gzip' in accepted_encodings(
+            self.headers.get('Accept-Encoding')) else None
+        # Each representation gets its own ETag, as in send_cached
+        etag = f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+        if weak:
+            etag = f'W/{etag}'
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', CACHE_REVALIDATE)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+        if encoding:
+            body = gzipped() if gzipped else gzip.compress(body, compresslevel=6, mtime=0)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', CACHE_REVALIDATE)
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if head_only:
+            return
+        self.wfile.write(body)
+        RESPONSE_BYTES.inc(len(body))
+
+    def send_common_headers(self, cached, etag, url_path):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', cached.last_modified)
+        self.send_header('Cache-Control', cache_control_for(url_path))
+        self.send_header('Accept-Ranges', 'bytes')
+        if cached.compressible():
+            self.send_header('Vary', 'Accept-Encoding')
+
+
+class DashboardServer(http.server.ThreadingHTTPServer):
+    """
+    One thread per connection, so a slow client never blocks the rest. At
+    most `max_connections` are open at once: beyond that the accept loop
+    waits for a slot instead of accepting (and spawning threads) without
+    bound. With `listen_fd` the server adopts an already listening socket
+    (inherited from the process it replaces) instead of binding its own.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, address, handler_class, max_connections=MAX_CONNECTIONS, reuse_port=False, listen_fd=None):
+        # Read by server_bind(), so it must be set before the socket is bound
+        self.allow_reuse_port = reuse_port
+        self.max_connections = max_connections
+        self.connection_slots = threading.BoundedSemaphore(max_connections)
+        if listen_fd is None:
+            super().__init__(address, handler_class)
+        else:
+            super().__init__(address, handler_class, bind_and_activate=False)
+            self.socket.close()
+            self.socket = socket.socket(fileno=listen_fd)
+            self.server_address = self.socket.getsockname()[:2]
+        self.static_cache = StaticCache()
+        self.progress_events = None
+        self.progress_cache = None
+        self.work_shards = None
+        self.draining = False
+
+    def get_request(self):
+        self.connection_slots.acquire()
+        try:
+            return super().get_request()
+        except BaseException:
+            self.connection_slots.release()
+            raise
+
+    def process_request(self, request, client_address):
+        try:
+            super().process_request(request, client_address)
+        except BaseException:
+            # The thread never started, so it will not release the slot
+            self.connection_slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        ACTIVE_CONNECTIONS.inc()
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            ACTIVE_CONNECTIONS.dec()
+            self.connection_slots.release()
+
+    def drain(self, timeout=DRAIN_TIMEOUT):
+        """After shutdown(): close keep-alive connections as they finish and wait for them; False on timeout"""
+        self.draining = True
+        if self.progress_events is not None:
+            # Event streams would never finish; EventSource clients reconnect on their own
+            self.progress_events.close()
+        deadline = time.monotonic() + timeout
+        for _slot in range(self.max_connections):
+            if not self.connection_slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                return False
+        return True
+
+
+def make_server(port, directory, bind='0.0.0.0', cors=False, root_path=None, log_client_ip=False,
+                progress_events=None, expose_metrics=True, htpasswd=None, realm=DEFAULT_REALM,
+                keepalive_timeout=KEEPALIVE_TIMEOUT, max_connections=MAX_CONNECTIONS, reuse_port=False,
+                listen_fd=None):
+    """Build (but do not start) a dashboard server for `directory`; `htpasswd` turns on Basic auth"""
+    handler_class = type('BoundDashboardHandler', (DashboardRequestHandler,), {
+        'cors': cors,
+        'root_path': root_path,
+        'log_client_ip': log_client_ip,
+        'expose_metrics': expose_metrics,
+        'auth': BasicAuth(htpasswd, realm) if htpasswd else None,
+        'timeout': keepalive_timeout,
+    })
+    handler = functools.partial(handler_class, directory=directory)
+    httpd = DashboardServer((bind, port), handler, max_connections=max_connections, reuse_port=reuse_port,
+                            listen_fd=listen_fd)
+    httpd.progress_events = progress_events
+    httpd.work_shards = WorkShardReader(os.path.join(directory, WORK_SHARD_DIR))
+    return httpd
+
+
+def reserve_port(bind, port):
+    """
+    Bind (without listening) an SO_REUSEPORT socket to check the port is
+    free for the worker group; it receives no connections and is closed once
+    the workers are listening.
+    """
+    family = socket.AF_INET6 if ':' in bind else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((bind, port))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def run_worker(port, directory, bind, on_worker_start, options):
+    """Body of one pre-forked worker: its own SO_REUSEPORT socket, serving until SIGTERM"""
+    def stop(_signum, _frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    # Ctrl+C reaches the whole process group; the parent turns it into SIGTERM for each worker
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    httpd = make_server(port, directory, bind=bind, reuse_port=True, **options)
+    with httpd:
+        if on_worker_start:
+            on_worker_start(httpd)
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def serve_workers(workers, port, directory, bind, on_worker_start, options, reserved=None):
+    """Fork `workers` processes on `port` and restart any that die until interrupted"""
+    children = {}
+    state = {'stopping': False}
+
+    def spawn(slot):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                if reserved is not None:
+                    reserved.close()
+                run_worker(port, directory, bind, on_worker_start, options)
+            except BaseException as e:
+                print(f"Worker {slot} failed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = slot
+
+    def stop(_signum, _frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    for slot in range(workers):
+        spawn(slot)
+    if reserved is not None:
+        reserved.close()
+    try:
+        while children:
+            pid, status = os.wait()
+            slot = children.pop(pid, None)
+            if slot is None or state['stopping']:
+                continue
+            print(f"Worker {slot} (pid {pid}) exited with status {status}, restarting")
+            time.sleep(WORKER_RESTART_DELAY)
+            spawn(slot)
+    except KeyboardInterrupt:
+        state['stopping'] = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(children):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        print("\nServer stopped")
+
+
+def start_replacement(httpd, timeout=RELOAD_READY_TIMEOUT):
+    """
+    Re-run this program with httpd's listening socket inherited and wait
+    until it reports that it is serving; True once it has. A replacement
+    that exits or does not get ready in time is killed and the reload
+    abandoned.
+    """
+    listen_fd = httpd.socket.fileno()
+    read_fd, write_fd = os.pipe()
+    env = dict(os.environ, **{LISTEN_FD_ENV: str(listen_fd), READY_FD_ENV: str(write_fd)})
+    try:
+        child = subprocess.Popen([sys.executable] + sys.orig_argv[1:], env=env, pass_fds=(listen_fd, write_fd))
+    except OSError as e:
+        print(f"Reload failed: {e}")
+        os.close(read_fd)
+        return False
+    finally:
+        os.close(write_fd)
+    try:
+        readable, _, _ = select.select([read_fd], [], [], timeout)
+        ready = bool(readable) and os.read(read_fd, 1) == b'1'
+    finally:
+        os.close(read_fd)
+    if not ready:
+        print(f"Reload abandoned: replacement (pid {child.pid}) did not start serving")
+        child.kill()
+        child.wait()
+        return False
+    print(f"Replacement (pid {child.pid}) is serving, draining pid {os.getpid()}")
+    return True
+
+
+def install_reload_handler(httpd):
+    """SIGHUP hands the listening socket to a fresh copy of the program, then this one drains"""
+    if not hasattr(signal, 'SIGHUP'):
+        return
+    reloading = threading.Lock()
+
+    def reload():
+        if start_replacement(httpd):
+            httpd.draining = True
+            httpd.shutdown()
+        else:
+            reloading.release()
+
+    def on_hup(_signum, _frame):
+        if not reloading.acquire(blocking=False):
+            print("Reload already in progress")
+            return
+        # serve_forever() runs on this thread and shutdown() waits for it, so hand over elsewhere
+        threading.Thread(target=reload, name='graceful-reload', daemon=True).start()
+
+    signal.signal(signal.SIGHUP, on_hup)
+
+
+def notify_ready():
+    """Tell the process being replaced (if any) that this one is serving"""
+    ready_fd = os.environ.pop(READY_FD_ENV, None)
+    if ready_fd is None:
+        return
+    try:
+        os.write(int(ready_fd), b'1')
+        os.close(int(ready_fd))
+    except OSError:
+        pass
+
+
+def serve_process(httpd, on_start, on_worker_start, graceful_reload):
+    """Serve `httpd` in this process until interrupted, or until replaced and drained"""
+    port = httpd.server_address[1]
+    with httpd:
+        if on_worker_start:
+            on_worker_start(httpd)
+        if graceful_reload:
+            install_reload_handler(httpd)
+        if on_start:
+            on_start(port)
+        notify_ready()
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\nServer stopped")
+            return port
+        if httpd.draining:
+            if httpd.drain():
+                print(f"Drained, pid {os.getpid()} exiting")
+            else:
+                print(f"Drain timed out after {DRAIN_TIMEOUT:g}s, pid {os.getpid()} exiting")
+    return port
+
+
+def serve(ports, directory, bind='0.0.0.0', on_start=None, workers=None, on_worker_start=None,
+          graceful_reload=False, **options):
+    """
+    Start on the first port in `ports` that binds and serve until interrupted.
+    workers > 1 pre-forks that many processes (0: one per core) where
+    SO_REUSEPORT and fork() are available; on_worker_start(httpd) runs in
+    each serving process, e.g. to attach a progress feed. graceful_reload
+    makes SIGHUP replace a single-process server without dropping
+    connections; a process started that way serves the inherited socket.
+    """
+    inherited = os.environ.pop(LISTEN_FD_ENV, None)
+    if inherited is not None:
+        httpd = make_server(0, directory, bind=bind, listen_fd=int(inherited), **options)
+        return serve_process(httpd, on_start, on_worker_start, graceful_reload)
+
+    workers = DEFAULT_WORKERS if workers is None else workers
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers > 1 and not (hasattr(socket, 'SO_REUSEPORT') and hasattr(os, 'fork')):
+        print("Pre-fork workers need SO_REUSEPORT and fork(); serving from one process")
+        workers = 1
+    if workers > 1 and graceful_reload:
+        print("Graceful reload needs a single process; SIGHUP is not handled with workers")
+
+    last_error = None
+    for port in ports:
+        try:
+            if workers > 1:
+                reserved = reserve_port(bind, port)
+            else:
+                httpd = make_server(port, directory, bind=bind, **options)
+        except OSError as e:
+            print(f"Failed to bind to {bind}:{port} - {e}")
+            last_error = e
+            continue
+        if workers > 1:
+            if on_start:
+                on_start(port)
+            print(f"Pre-forking {workers} workers")
+            serve_workers(workers, port, directory, bind, on_worker_start, options, reserved)
+            return port
+        return serve_process(httpd, on_start, on_worker_start, graceful_reload)
+    raise last_error or OSError("no port to bind")
+
+
+def progress_feed(interval=DEFAULT_PROGRESS_INTERVAL, ttl=DEFAULT_TTL):
+    """
+    on_worker_start hook serving live agent progress: PROGRESS_PATH from a
+    `ttl`-second cache and EVENTS_PATH updated every `interval` seconds (0
+    disables either)
+    """
+    def start(httpd):
+        # Threads do not survive fork(), so each serving process runs its own feed and cache
+        if ttl <= 0 and interval <= 0:
+            return
+        from agent_progress_tracker import get_agent_progress_data
+        producer = get_agent_progress_data
+        if ttl > 0:
+            httpd.progress_cache = ProgressCache(get_agent_progress_data, ttl)
+            # The event stream shares the cache's computations
+            producer = lambda: httpd.progress_cache.get().data
+        if interval > 0:
+            httpd.progress_events = ProgressBroadcaster()
+            ProgressFeed(httpd.progress_events, producer, interval).start()
+    return start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Ascent XR dashboards")
+    parser.add_argument('--port', type=int, action='append', help="port to try (repeatable, first free wins)")
+    parser.add_argument('--bind', default='0.0.0.0')
+    parser.add_argument('--directory', default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument('--cors', action='store_true', help="send Access-Control-Allow-Origin: *")
+    parser.add_argument('--root', help="path to serve for '/' (e.g. /index.html)")
+    parser.add_argument('--progress-interval', type=float, default=DEFAULT_PROGRESS_INTERVAL,
+                        help=f"seconds between agent progress updates on {EVENTS_PATH} (0 disables it)")
+    parser.add_argument('--progress-ttl', type=float, default=DEFAULT_TTL,
+                        help=f"seconds {PROGRESS_PATH} reuses a computed document (0 disables it, "
+                             f"default {DEFAULT_TTL:g})")
+    parser.add_argument('--no-metrics', action='store_true', help=f"do not serve {METRICS_PATH}")
+    parser.add_argument('--htpasswd', help="require HTTP Basic auth against this .htpasswd file")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"pre-forked worker processes, 0 for one per core (default {DEFAULT_WORKERS})")
+    parser.add_argument('--max-connections', type=int, default=MAX_CONNECTIONS,
+                        help=f"open connections per process before accepting pauses (default {MAX_CONNECTIONS})")
+    parser.add_argument('--keepalive-timeout', type=float, default=KEEPALIVE_TIMEOUT,
+                        help=f"seconds an idle keep-alive connection stays open (default {KEEPALIVE_TIMEOUT:g})")
+    parser.add_argument('--no-reload', action='store_true',
+                        help="do not hand over to a new process on SIGHUP (single process only)")
+    args = parser.parse_args()
+    metrics.install_profile_signal(name='dashboard_server')
+
+    def on_start(port):
+        print(f"Serving {args.directory} on http://{args.bind}:{port}/ (Ctrl+C to stop)")
+
+    serve(args.port or [8087], args.directory, bind=args.bind, on_start=on_start, workers=args.workers,
+          on_worker_start=progress_feed(args.progress_interval, args.progress_ttl), cors=args.cors, root_path=args.root,
+          expose_metrics=not args.no_metrics, htpasswd=args.htpasswd, keepalive_timeout=args.keepalive_timeout,
+          max_connections=args.max_connections, graceful_reload=not args.no_reload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Rate-based ETA Engine
+Tracks a smoothed progress velocity per agent session (time-weighted EWMA of
+percent-per-second, with an EWMA variance for confidence bounds). Each update
+is O(1) per session, and the state is small enough to persist between runs.
+"""
+
+import json
+import math
+import os
+from datetime import datetime, timezone
+
+STATE_VERSION = 1
+
+# Velocity older than this counts half as much as the latest sample
+DEFAULT_HALF_LIFE = 600.0
+
+# ~95% interval on the smoothed rate
+CONFIDENCE_Z = 1.96
+
+# Sessions not updated for this long are dropped from the state
+STALE_AFTER = 86400.0
+
+
+def parse_start_time(value):
+    """ISO-8601 string or epoch seconds/milliseconds -> epoch seconds (None if unparseable)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000.0 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        text = value.strip()
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            try:
+                return parse_start_time(float(text))
+            except ValueError:
+                return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return None
+
+
+def format_duration(seconds):
+    """Seconds -> the dashboard's '~N hours' style"""
+    if seconds is None:
+        return "N/A"
+    if seconds < 60:
+        return "<1 min"
+    if seconds < 3600:
+        return f"~{int(seconds // 60)} min"
+    if seconds < 86400:
+        hours = seconds / 3600
+        return f"~{int(hours)} hour" if hours < 2 else f"~{int(hours)} hours"
+    return f"~{seconds / 86400:.1f} days"
+
+
+class EtaEngine:
+    """Per-session progress velocity with numeric ETAs and confidence bounds"""
+
+    def __init__(self, half_life=DEFAULT_HALF_LIFE, state_path=None):
+        self.tau = half_life / math.log(2)
+        self.state_path = str(state_path) if state_path else None
+        # key -> [last_ts, last_progress, rate, rate_var, samples]
+        self.state = {}
+        self._load()
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable ETA state: {e}")
+            return
+        if saved.get('version') == STATE_VERSION:
+            self.state = saved.get('sessions', {})
+
+    def save(self, now):
+        """Drop stale sessions and persist (temp file + rename)"""
+        self.state = {key: s for key, s in self.state.items() if now - s[0] < STALE_AFTER}
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': STATE_VERSION, 'sessions': self.state}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.state_path)
+
+    def update(self, key, progress, now, started_at=None):
+        """Fold one observation in and return the current estimate for `key`"""
+        s = self.state.get(key)
+        if s is None:
+            rate = 0.0
+            start = parse_start_time(started_at)
+            if start is not None and now > start and progress > 0:
+                # Seed with the average rate since the session started
+                rate = progress / (now - start)
+            s = [now, progress, rate, 0.0, 1 if rate > 0 else 0]
+            self.state[key] = s
+        else:
+            last_ts, last_progress, rate, rate_var, samples = s
+            dt = now - last_ts
+            if dt > 0:
+                instant = max(0.0, (progress - last_progress) / dt)
+                if samples == 0:
+                    # First measured velocity: nothing to smooth against yet
+                    s[:] = [now, progress, instant, 0.0, 1]
+                    return self.estimate(key, progress)
+                alpha = 1.0 - math.exp(-dt / self.tau)
+                diff = instant - rate
+                rate += alpha * diff
+                rate_var = (1.0 - alpha) * (rate_var + alpha * diff * diff)
+                s[:] = [now, progress, rate, rate_var, samples + 1]
+        return self.estimate(key, progress)
+
+    def estimate(self, key, progress):
+        s = self.state.get(key)
+        remaining = max(0.0, 100.0 - progress)
+        if s is None or s[2] <= 0 or s[4] == 0:
+            return {'eta_seconds': None, 'eta_low_seconds': None, 'eta_high_seconds': None}
+
+        rate, std = s[2], math.sqrt(max(0.0, s[3]))
+        fast = rate + CONFIDENCE_Z * std
+        slow = rate - CONFIDENCE_Z * std
+        return {
+            'eta_seconds': int(remaining / rate),
+            'eta_low_seconds': int(remaining / fast),
+            'eta_high_seconds': int(remaining / slow) if slow > 0 else None
+        }
@@ -1,65 +1,264 @@
 #!/usr/bin/env python3
-import hashlib
+"""
+htpasswd Generator
+Creates or rotates dashboard credentials for a roster of users in one pass.
+Passwords come from `secrets`, hashes use a tunable KDF (scrypt by default,
+see --benchmark), and the result is merged into the existing .htpasswd
+line by line: untouched entries and comments are copied verbatim, and the
+new file replaces the old one atomically.
+
+Roster formats:
+  CSV   username[,password][,action]   (header row optional)
+  JSON  ["jim", {"username": "nick", "action": "rotate"}, ...]
+action is add (default: only if missing), rotate (new password) or remove.
+"""
+
+import argparse
 import base64
+import csv
+import hashlib
+import json
 import os
-import random
+import secrets
 import string
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from htpasswd_auth import DEFAULT_HTPASSWD, PBKDF2_DEFAULT_ROUNDS, SCRYPT_DEFAULTS, hash_password
+
+DEFAULT_ROSTER = ["jim", "nick"]
+PASSWORD_ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*"
+SCHEMES = ["scrypt", "pbkdf2-sha256", "apache-sha"]
+ACTIONS = ["add", "rotate", "remove"]
 
-def generate_password(length=12):
+def generate_password(length=16):
     """Generate a secure random password"""
-    characters = string.ascii_letters + string.digits + "!@#$%^&*"
-    return ''.join(random.choice(characters) for _ in range(length))
-
-def create_htpasswd_entry(username, password):
-    """Create htpasswd entry using SHA encryption"""
-    salt = os.urandom(8).hex()
-    # Format: {SHA}salt+hash
-    sha_hash = hashlib.sha1((password + salt).encode()).hexdigest()
-    return f"{username}:{{SHA}}{salt}${sha_hash}"
-
-# Generate credentials
-credentials = {}
-
-# Jim's credentials
-jim_password = generate_password()
-jim_entry = create_htpasswd_entry("jim", jim_password)
-credentials["jim"] = jim_password
-
-# Nick's credentials  
-nick_password = generate_password()
-nick_entry = create_htpasswd_entry("nick", nick_password)
-credentials["nick"] = nick_password
-
-# Create .htpasswd content
-htpasswd_content = f"""# Ascent XR Dashboard Authentication
-# Generated: {os.path.basename(__file__)}
-{jim_entry}
-{nick_entry}
-"""
+    return ''.join(secrets.choice(PASSWORD_ALPHABET) for _ in range(length))
+
+def create_htpasswd_entry(username, password, scheme="scrypt", cost=None):
+    """Create an htpasswd line for `username`"""
+    if scheme == "apache-sha":
+        # Unsalted SHA-1: only for Apache deployments that cannot read anything better
+        digest = base64.b64encode(hashlib.sha1(password.encode('utf-8')).digest()).decode('ascii')
+        return f"{username}:{{SHA}}{digest}"
+    if scheme == "scrypt":
+        hashed = hash_password(password, "scrypt", **({"ln": cost} if cost else {}))
+    else:
+        hashed = hash_password(password, scheme, **({"rounds": cost} if cost else {}))
+    return f"{username}:{hashed}"
+
+def load_roster(path=None):
+    """[{'username', 'password' (or None), 'action'}] from a CSV/JSON roster (default: jim and nick)"""
+    if path is None:
+        entries = [{"username": name} for name in DEFAULT_ROSTER]
+    elif path.endswith(".json"):
+        with open(path, "r") as f:
+            raw = json.load(f)
+        entries = [{"username": item} if isinstance(item, str) else item for item in raw]
+    else:
+        with open(path, "r", newline="") as f:
+            rows = [row for row in csv.reader(f) if row and not row[0].startswith("#")]
+        if rows and rows[0][0].strip().lower() in ("username", "user"):
+            rows = rows[1:]
+        entries = [{"username": row[0],
+                    "password": row[1] if len(row) > 1 else None,
+                    "action": row[2] if len(row) > 2 else None} for row in rows]
+
+    roster = []
+    for entry in entries:
+        username = (entry.get("username") or "").strip()
+        action = (entry.get("action") or "add").strip().lower()
+        if not username or ":" in username:
+            raise ValueError(f"invalid username: {username!r}")
+        if action not in ACTIONS:
+            raise ValueError(f"{username}: unknown action {action!r}")
+        roster.append({"username": username, "password": entry.get("password") or None, "action": action})
+    return roster
+
+def entry_user(line):
+    """Username of an htpasswd line, or None for comments and blank lines"""
+    if not line.strip() or line.lstrip().startswith("#") or ":" not in line:
+        return None
+    return line.split(":", 1)[0].strip()
+
+def existing_users(htpasswd_path):
+    """Usernames already present in the htpasswd file (streamed, hashes not kept)"""
+    users = set()
+    try:
+        with open(htpasswd_path, "r") as f:
+            for line in f:
+                username = entry_user(line)
+                if username:
+                    users.add(username)
+    except FileNotFoundError:
+        pass
+    return users
+
+def plan_changes(roster, present, rotate_all=False):
+    """Split the roster into users to (re)hash and users to remove"""
+    to_hash, to_remove = [], set()
+    for entry in roster:
+        username = entry["username"]
+        if entry["action"] == "remove":
+            to_remove.add(username)
+        elif entry["action"] == "rotate" or rotate_all or username not in present:
+            to_hash.append(entry)
+    return to_hash, to_remove
+
+def hash_roster(entries, scheme, cost, password_length, workers=None):
+    """{username: (password, line)}; KDFs run on a thread pool (hashlib releases the GIL)"""
+    def build(entry):
+        password = entry["password"] or generate_password(password_length)
+        return entry["username"], (password, create_htpasswd_entry(entry["username"], password, scheme, cost))
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        return dict(pool.map(build, entries))
+
+def merge_htpasswd(htpasswd_path, updates, removals):
+    """
+    Stream the existing file into a temp file: changed users' lines are
+    replaced, removed users dropped, everything else copied as-is; new users
+    are appended. A user listed more than once keeps only the replacement
+    (HtpasswdFile honours the last line, so a stale duplicate would keep the
+    old password working). The temp file then atomically replaces the
+    original. Returns (updated, added, removed) user counts.
+    """
+    directory = os.path.dirname(os.path.abspath(htpasswd_path))
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = os.stat(htpasswd_path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o640
+
+    pending = dict(updates)
+    updated, removed = set(), set()
+    fd, tmp_path = tempfile.mkstemp(prefix=".htpasswd.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as out:
+            try:
+                with open(htpasswd_path, "r") as existing:
+                    for line in existing:
+                        username = entry_user(line)
+                        if username in removals:
+                            removed.add(username)
+                            continue
+                        if username in pending:
+                            out.write(pending.pop(username) + "\n")
+                            updated.add(username)
+                            continue
+                        if username in updated:
+                            continue
+                        out.write(line if line.endswith("\n") else line + "\n")
+            except FileNotFoundError:
+                out.write("# Ascent XR Dashboard Authentication\n")
+            for line in pending.values():
+                out.write(line + "\n")
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, htpasswd_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(updated), len(pending), len(removed)
+
+def benchmark_kdf(scheme, target_ms=250, password="benchmark-password"):
+    """Time each cost level for `scheme` and return the highest one under `target_ms`"""
+    if scheme == "scrypt":
+        levels = range(12, 19)
+    elif scheme == "pbkdf2-sha256":
+        levels = [100000, 200000, 400000, 600000, 1000000, 2000000]
+    else:
+        print("apache-sha has no cost parameter")
+        return None
+
+    best = None
+    print(f"{scheme} cost vs time per hash (target {target_ms} ms):")
+    for cost in levels:
+        start = time.perf_counter()
+        create_htpasswd_entry("bench", password, scheme, cost)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        label = f"ln={cost} (n={2 ** cost})" if scheme == "scrypt" else f"rounds={cost}"
+        print(f"  {label:24} {elapsed_ms:8.1f} ms")
+        if elapsed_ms <= target_ms:
+            best = cost
+        else:
+            break
+    if best is not None:
+        print(f"Suggested: --cost {best}")
+    return best
+
+def write_credentials(path, credentials):
+    """Plaintext credentials for distribution (owner-only permissions)"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["username", "password"])
+        writer.writerows(credentials)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create or rotate Ascent XR dashboard credentials")
+    parser.add_argument("roster", nargs="?", help="CSV or JSON roster (default: jim and nick)")
+    parser.add_argument("--htpasswd", default=DEFAULT_HTPASSWD, help=f"file to merge into (default {DEFAULT_HTPASSWD})")
+    parser.add_argument("--rotate", action="store_true", help="issue new passwords for every roster user")
+    parser.add_argument("--scheme", choices=SCHEMES, default="scrypt")
+    parser.add_argument("--cost", type=int, help=f"scrypt log2(n) (default {SCRYPT_DEFAULTS['ln']}) "
+                                                 f"or PBKDF2 rounds (default {PBKDF2_DEFAULT_ROUNDS})")
+    parser.add_argument("--length", type=int, default=16, help="generated password length")
+    parser.add_argument("--workers", type=int, help="parallel hashing threads (default: CPU count)")
+    parser.add_argument("--credentials-out", help="write username,password CSV here instead of printing")
+    parser.add_argument("--benchmark", action="store_true", help="time KDF cost levels for --scheme and exit")
+    parser.add_argument("--target-ms", type=float, default=250, help="with --benchmark, acceptable time per hash")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark_kdf(args.scheme, args.target_ms)
+        return 0
+
+    try:
+        roster = load_roster(args.roster)
+    except (OSError, ValueError) as e:
+        print(f"Error reading roster: {e}")
+        return 1
+
+    present = existing_users(args.htpasswd)
+    to_hash, to_remove = plan_changes(roster, present, rotate_all=args.rotate)
+
+    start = time.perf_counter()
+    hashed = hash_roster(to_hash, args.scheme, args.cost, args.length, args.workers)
+    updated, added, removed = merge_htpasswd(
+        args.htpasswd, {username: line for username, (_password, line) in hashed.items()}, to_remove)
+    elapsed = time.perf_counter() - start
+
+    credentials = [(username, password) for username, (password, _line) in hashed.items()]
+    print("=" * 60)
+    print("AScent XR Dashboard Authentication Setup")
+    print("=" * 60)
+    print(f"📁 {args.htpasswd}: {added} added, {updated} rotated, {removed} removed, "
+          f"{len(present) - updated - removed} unchanged ({elapsed:.1f}s, {args.scheme})")
+
+    if credentials and args.credentials_out:
+        write_credentials(args.credentials_out, credentials)
+        print(f"🔐 New credentials written to {args.credentials_out} (mode 600)")
+    elif credentials:
+        print("\n🔐 CREDENTIALS:")
+        print("-" * 30)
+        for username, password in credentials:
+            print(f"Username: {username}")
+            print(f"Password: {password}\n")
+
+    print("=" * 60)
+    print("📋 NEXT STEPS:")
+    print("-" * 30)
+    print("1. Python dashboard servers pick up the change automatically (public_server.py,")
+    print("   dashboard_server.py --htpasswd)")
+    print("2. For Apache deployments, upload .htaccess and .htpasswd to /dashboard/")
+    print("   (generate with --scheme apache-sha; Apache cannot read scrypt/PBKDF2)")
+    print("=" * 60)
+    return 0
 
-# Save to file
-with open("/home/jim/openclaw/.htpasswd", "w") as f:
-    f.write(htpasswd_content)
-
-print("=" * 60)
-print("AScent XR Dashboard Authentication Setup")
-print("=" * 60)
-print("\n🔐 CREDENTIALS:")
-print("-" * 30)
-print(f"Username: jim")
-print(f"Password: {jim_password}")
-print(f"\nUsername: nick")
-print(f"Password: {nick_password}")
-print("\n" + "=" * 60)
-print("📁 FILES CREATED:")
-print("-" * 30)
-print("1. .htaccess - Apache authentication configuration")
-print("2. .htpasswd - Password file (upload to dashboard/)")
-print("\n" + "=" * 60)
-print("📋 DEPLOYMENT STEPS:")
-print("-" * 30)
-print("1. Upload dashboard/ folder to /dashboard/")
-print("2. Upload .htaccess and .htpasswd to /dashboard/")
-print("3. Access at: https://ascentxr.com/dashboard/")
-print("4. Enter credentials when prompted")
-print("\n" + "=" * 60)
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
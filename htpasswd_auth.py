@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+htpasswd Basic Authentication
+Verifies HTTP Basic credentials against an .htpasswd file for the Python
+dashboard servers. The file is parsed once and re-read only when it changes
+on disk. Supported entries:
+
+  user:{SHA}<salt hex>$<sha1(password + salt) hex>   (htpasswd-generator.py)
+  user:{SHA}<base64 sha1(password)>                  (Apache htpasswd -s)
+  user:$scrypt$ln=<log2 n>,r=<r>,p=<p>$<salt>$<hash>
+  user:$pbkdf2-sha256$<rounds>$<salt>$<hash>         (passlib layout)
+
+A successful check is remembered for a short time under a keyed digest of
+the credentials, so the KDF runs once per page load rather than once per
+asset. Failed attempts are throttled per client IP with a token bucket
+(a fixed-size record per client, bounded number of clients).
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_HTPASSWD = '/home/jim/openclaw/.htpasswd'
+DEFAULT_REALM = 'Ascent XR Dashboard'
+
+# Verified credentials are trusted for this long without re-running the KDF
+CACHE_TTL = 300.0
+CACHE_SIZE = 256
+
+# Per-IP failure budget: FAILURE_BURST failures, refilled over FAILURE_WINDOW seconds
+FAILURE_BURST = 5
+FAILURE_WINDOW = 300.0
+MAX_TRACKED_CLIENTS = 10000
+
+SCRYPT_DEFAULTS = {'ln': 15, 'r': 8, 'p': 1}
+PBKDF2_DEFAULT_ROUNDS = 600000
+
+# scrypt needs ~128 * r * n bytes; leave headroom over OpenSSL's 32 MB default
+SCRYPT_MAXMEM = 256 * 1024 * 1024
+
+
+def _ab64_encode(data):
+    """passlib's adapted base64: no padding, '.' instead of '+'"""
+    return base64.b64encode(data).decode('ascii').rstrip('=').replace('+', '.')
+
+
+def _ab64_decode(text):
+    text = text.replace('.', '+')
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+def hash_password(password, scheme='scrypt', **params):
+    """New htpasswd hash for `password` ('scrypt' or 'pbkdf2-sha256')"""
+    salt = secrets.token_bytes(16)
+    if scheme == 'scrypt':
+        settings = dict(SCRYPT_DEFAULTS, **params)
+        digest = hashlib.scrypt(password.encode('utf-8'), salt=salt, n=2 ** settings['ln'], r=settings['r'],
+                                p=settings['p'], maxmem=SCRYPT_MAXMEM, dklen=32)
+        return (f"$scrypt$ln={settings['ln']},r={settings['r']},p={settings['p']}"
+                f"${_ab64_encode(salt)}${_ab64_encode(digest)}")
+    if scheme == 'pbkdf2-sha256':
+        rounds = params.get('rounds', PBKDF2_DEFAULT_ROUNDS)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, rounds)
+        return f"$pbkdf2-sha256${rounds}${_ab64_encode(salt)}${_ab64_encode(digest)}"
+    raise ValueError(f"unsupported scheme: {scheme}")
+
+
+def verify_password(password, hashed):
+    """True if `password` matches the stored htpasswd hash (constant-time compare)"""
+    try:
+        if hashed.startswith('{SHA}'):
+            value = hashed[5:]
+            if '$' in value:
+                salt, expected = value.split('$', 1)
+                actual = hashlib.sha1((password + salt).encode('utf-8')).hexdigest()
+                return hmac.compare_digest(actual, expected.lower())
+            actual = base64.b64encode(hashlib.sha1(password.encode('utf-8')).digest()).decode('ascii')
+            return hmac.compare_digest(actual, value)
+
+        if hashed.startswith('$scrypt$'):
+            _empty, _scheme, settings, salt, expected = hashed.split('$')
+            params = dict(item.split('=') for item in settings.split(','))
+            expected = _ab64_decode(expected)
+            actual = hashlib.scrypt(password.encode('utf-8'), salt=_ab64_decode(salt), n=2 ** int(params['ln']),
+                                    r=int(params['r']), p=int(params['p']), maxmem=SCRYPT_MAXMEM,
+                                    dklen=len(expected))
+            return hmac.compare_digest(actual, expected)
+
+        if hashed.startswith('$pbkdf2-sha256$'):
+            _empty, _scheme, rounds, salt, expected = hashed.split('$')
+            expected = _ab64_decode(expected)
+            actual = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), _ab64_decode(salt), int(rounds),
+                                         dklen=len(expected))
+            return hmac.compare_digest(actual, expected)
+    except (ValueError, KeyError, binascii.Error) as e:
+        print(f"Malformed htpasswd hash: {e}")
+    return False
+
+
+def is_supported_hash(hashed):
+    return hashed.startswith(('{SHA}', '$scrypt$', '$pbkdf2-sha256$'))
+
+
+def dummy_hash_like(hashed):
+    """A hash of a random password with the scheme and cost of `hashed`, for unknown users"""
+    password = secrets.token_hex(16)
+    try:
+        if hashed.startswith('$scrypt$'):
+            params = dict(item.split('=') for item in hashed.split('$')[2].split(','))
+            return hash_password(password, 'scrypt', **{key: int(params[key]) for key in SCRYPT_DEFAULTS})
+        if hashed.startswith('$pbkdf2-sha256$'):
+            return hash_password(password, 'pbkdf2-sha256', rounds=int(hashed.split('$')[2]))
+    except (ValueError, KeyError, IndexError):
+        pass
+    if hashed.startswith('{SHA}'):
+        return '{SHA}' + secrets.token_hex(8) + '$' + hashlib.sha1(password.encode('utf-8')).hexdigest()
+    return hash_password(password)
+
+
+class HtpasswdFile:
+    """user -> hash map from an .htpasswd file, re-read when the file changes"""
+
+    def __init__(self, path=DEFAULT_HTPASSWD):
+        self.path = str(path)
+        self.users = {}
+        self._signature = None
+        self._dummy = None
+        self._lock = threading.Lock()
+        self.reload_if_changed()
+
+    def reload_if_changed(self):
+        try:
+            st = os.stat(self.path)
+        except OSError as e:
+            if self._signature is not None:
+                print(f"htpasswd file unavailable, denying all: {e}")
+            self.users, self._signature = {}, None
+            return False
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return False
+        with self._lock:
+            if signature == self._signature:
+                return False
+            users = {}
+            try:
+                with open(self.path, 'r') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line or line.startswith('#') or ':' not in line:
+                            continue
+                        user, hashed = line.split(':', 1)
+                        if is_supported_hash(hashed):
+                            users[user] = hashed
+                        else:
+                            print(f"Skipping {user}: unsupported htpasswd hash format")
+            except OSError as e:
+                print(f"Error reading {self.path}: {e}")
+                return False
+            self.users = users
+            self._dummy = None
+            self._signature = signature
+            return True
+
+    def lookup(self, user):
+        self.reload_if_changed()
+        return self.users.get(user)
+
+    def dummy_hash(self):
+        """Hash to verify unknown users against, costing the same as the file's first entry"""
+        dummy = self._dummy
+        if dummy is None:
+            users = self.users
+            dummy = self._dummy = dummy_hash_like(next(iter(users.values()), ''))
+        return dummy
+
+
+class VerifiedCache:
+    """Bounded, short-TTL set of credential digests that recently verified"""
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Per-process key: cached digests are useless outside this process
+        self._key = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def digest(self, user, password, hashed):
+        # The stored hash is part of the key, so a password change invalidates the entry
+        message = b'\0'.join(part.encode('utf-8') for part in (user, password, hashed))
+        return hashlib.blake2b(message, key=self._key, digest_size=32).digest()
+
+    def __contains__(self, digest):
+        now = time.monotonic()
+        with self._lock:
+            expires = self._entries.get(digest)
+            if expires is None:
+                return False
+            if expires < now:
+                del self._entries[digest]
+                return False
+            self._entries.move_to_end(digest)
+            return True
+
+    def add(self, digest):
+        with self._lock:
+            self._entries[digest] = time.monotonic() + self.ttl
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class FailureThrottle:
+    """Token bucket of failed attempts per client: (tokens, last update) each, LRU-bounded"""
+
+    def __init__(self, burst=FAILURE_BURST, window=FAILURE_WINDOW, max_clients=MAX_TRACKED_CLIENTS):
+        self.burst = burst
+        self.rate = burst / window
+        self.max_clients = max_clients
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tokens(self, client, now):
+        tokens, last = self._clients.get(client, (self.burst, now))
+        return min(self.burst, tokens + (now - last) * self.rate)
+
+    def retry_after(self, client):
+        """Seconds until `client` may try again (0 if it may try now)"""
+        now = time.monotonic()
+        with self._lock:
+            if client not in self._clients:
+                return 0
+            tokens = self._tokens(client, now)
+        return 0 if tokens >= 1 else int((1 - tokens) / self.rate) + 1
+
+    def failure(self, client):
+        now = time.monotonic()
+        with self._lock:
+            self._clients[client] = (max(0.0, self._tokens(client, now) - 1), now)
+            self._clients.move_to_end(client)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+
+    def success(self, client):
+        with self._lock:
+            self._clients.pop(client, None)
+
+
+class BasicAuth:
+    """HTTP Basic authentication against an htpasswd file"""
+
+    def __init__(self, htpasswd_path=DEFAULT_HTPASSWD, realm=DEFAULT_REALM, cache_ttl=CACHE_TTL):
+        self.htpasswd = HtpasswdFile(htpasswd_path)
+        self.realm = realm
+        self.cache = VerifiedCache(ttl=cache_ttl)
+        self.throttle = FailureThrottle()
+
+    def challenge(self):
+        return f'Basic realm="{self.realm}", charset="UTF-8"'
+
+    def check(self, header, client):
+        """
+        (user, retry_after): user is the authenticated name or None;
+        retry_after > 0 means the client is throttled and was not checked.
+        """
+        retry_after = self.throttle.retry_after(client)
+        if retry_after:
+            return None, retry_after
+        if not header or not header[:6].lower() == 'basic ':
+            return None, 0
+        try:
+            user, _, password = base64.b64decode(header[6:].strip(), validate=True).decode('utf-8').partition(':')
+        except (binascii.Error, UnicodeDecodeError):
+            self.throttle.failure(client)
+            return None, 0
+
+        hashed = self.htpasswd.lookup(user)
+        if hashed is None:
+            # Same KDF work as a wrong password, so response time does not reveal which users exist
+            verify_password(password, self.htpasswd.dummy_hash())
+            self.throttle.failure(client)
+            return None, 0
+        digest = self.cache.digest(user, password, hashed)
+        if digest in self.cache:
+            return user, 0
+        if verify_password(password, hashed):
+            self.cache.add(digest)
+            self.throttle.success(client)
+            return user, 0
+        self.throttle.failure(client)
+        return None, 0
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tracker JSON Export
+Writes tracker output atomically (temp file + os.replace) so readers such as
+the Express /api/agents/progress route never see a half-written file. Output
+is compact, uses orjson when available, and is skipped entirely when its
+content hash (ignoring volatile keys like last_updated, and optionally the
+simulated per-agent quality fields) matches the previous export. Alongside `<name>` it can write `<name>.gz` and `<name>.etag`, a
+small JSON file with the content hash and a version counter that consumers
+can check before re-reading the export itself.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+VOLATILE_KEYS = ('last_updated',)
+
+# Simulated per-agent quality metrics: redrawn on every tick, so never a reason to re-export
+VOLATILE_AGENT_FIELDS = ('quality_score', 'tests_passed', 'bugs_found', 'code_quality')
+
+
+def dumps(data):
+    """Compact JSON bytes (orjson if installed, stdlib otherwise)"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def content_hash(data, ignore_keys=VOLATILE_KEYS, ignore_agent_fields=()):
+    """Strong hash of `data` with the volatile top-level keys (and fields of each of its `agents`) left out"""
+    if isinstance(data, dict) and ignore_keys:
+        data = {key: value for key, value in data.items() if key not in ignore_keys}
+    if isinstance(data, dict) and ignore_agent_fields and isinstance(data.get('agents'), list):
+        data = dict(data, agents=[{field: value for field, value in agent.items() if field not in ignore_agent_fields}
+                                  if isinstance(agent, dict) else agent for agent in data['agents']])
+    return hashlib.blake2b(dumps(data), digest_size=16).hexdigest()
+
+
+def sidecar_paths(path):
+    """Every file an export of `path` may create (for scan ignore lists)"""
+    path = str(path)
+    directory, name = os.path.split(path)
+    return [path, f"{path}.gz", f"{path}.etag", os.path.join(directory, f".{name}.*.tmp")]
+
+
+def read_etag(path):
+    """{'etag': ..., 'version': ...} from `<path>.etag`, or None"""
+    try:
+        with open(f"{path}.etag", 'rb') as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def write_atomic(path, payload):
+    """Replace `path` with `payload` bytes; readers see the old or the new file, never a mix"""
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class JsonExporter:
+    """Diff-aware atomic writer for one output file"""
+
+    def __init__(self, path, gzip_sidecar=False, etag_sidecar=True, ignore_keys=VOLATILE_KEYS,
+                 ignore_agent_fields=()):
+        self.path = str(path)
+        self.gzip_sidecar = gzip_sidecar
+        self.etag_sidecar = etag_sidecar
+        self.ignore_keys = ignore_keys
+        self.ignore_agent_fields = tuple(ignore_agent_fields)
+        previous = read_etag(self.path) if os.path.exists(self.path) else None
+        self.etag = previous.get('etag') if previous else None
+        self.version = previous.get('version', 0) if previous else 0
+
+    def export(self, data):
+        """Write `data` unless it matches the last export; True if the file changed"""
+        etag = content_hash(data, self.ignore_keys, self.ignore_agent_fields)
+        if etag == self.etag and os.path.exists(self.path):
+            return False
+        payload = dumps(data)
+        write_atomic(self.path, payload)
+        if self.gzip_sidecar:
+            write_atomic(f"{self.path}.gz", gzip.compress(payload, compresslevel=6, mtime=0))
+        self.etag = etag
+        self.version += 1
+        if self.etag_sidecar:
+            write_atomic(f"{self.path}.etag", dumps({'etag': etag, 'version': self.version}))
+        return True
+
+
+_exporters = {}
+
+
+def export_json(data, path, gzip_sidecar=False, etag_sidecar=True, ignore_agent_fields=()):
+    """Module-level convenience: one JsonExporter per output path"""
+    key = os.path.abspath(str(path))
+    exporter = _exporters.get(key)
+    if (exporter is None or exporter.gzip_sidecar != gzip_sidecar or exporter.etag_sidecar != etag_sidecar
+            or exporter.ignore_agent_fields != tuple(ignore_agent_fields)):
+        exporter = _exporters[key] = JsonExporter(key, gzip_sidecar=gzip_sidecar, etag_sidecar=etag_sidecar,
+                                                  ignore_agent_fields=ignore_agent_fields)
+    return exporter.export(data)
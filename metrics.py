@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Tracker and Dashboard Metrics
+Small stdlib-only counters, gauges and histograms rendered in the Prometheus
+text exposition format, timing spans for tracker stages, a standalone
+/metrics endpoint for the long-running trackers, and an on-signal cProfile
+toggle for digging into where refresh time goes.
+"""
+
+import bisect
+import cProfile
+import http.server
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; covers sub-millisecond cache hits up to slow CLI fetches
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILE_DIR = '/home/jim/openclaw/.tracker_cache'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """One metric family; children are keyed by label values"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.children = {}
+        self.lock = threading.Lock()
+        if not self.label_names:
+            # Unlabelled metrics are exported (as zero) before their first update
+            self.labels()
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.label_names):
+            raise ValueError(f"{self.name}: expected labels {self.label_names}, got {key}")
+        with self.lock:
+            child = self.children.get(key)
+            if child is None:
+                child = self.children[key] = self._new_child()
+            return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            children = list(self.children.items())
+        for key, child in children:
+            lines.extend(self._render_child(key, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ('value', 'lock')
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(child.value)}"]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+
+class _Buckets:
+    __slots__ = ('bounds', 'counts', 'total', 'count', 'lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.total = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            if i < len(self.counts):
+                self.counts[i] += 1
+            self.total += value
+            self.count += 1
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labels)
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _render_child(self, key, child):
+        with child.lock:
+            counts, total, count = list(child.counts), child.total, child.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, [('le', _number(bound))])} {cumulative}")
+        lines.append(f"{self.name}_bucket{_labels(self.label_names, key, [('le', '+Inf')])} {count}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    """Named metric families; get-or-create so modules can declare the same metric independently"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help_text, labels, **kwargs)
+            elif not isinstance(metric, cls) or metric.label_names != tuple(labels):
+                raise ValueError(f"metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def render(self):
+        """The whole registry in Prometheus text format"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram('tracker_stage_duration_seconds', "Time spent in each tracker stage",
+                                   ('tracker', 'stage'))
+STAGE_ERRORS = REGISTRY.counter('tracker_stage_errors_total', "Tracker stages that raised", ('tracker', 'stage'))
+STAGE_LAST = REGISTRY.gauge('tracker_stage_last_duration_seconds', "Duration of the most recent run of each stage",
+                            ('tracker', 'stage'))
+
+
+@contextmanager
+def span(tracker, stage):
+    """Time a tracker stage into tracker_stage_duration_seconds{tracker,stage}"""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.labels(tracker, stage).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(tracker, stage).observe(elapsed)
+        STAGE_LAST.labels(tracker, stage).set(elapsed)
+
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the registry on /metrics and nothing else"""
+
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, bind='0.0.0.0', registry=REGISTRY):
+    """Expose `registry` on http://bind:port/metrics from a daemon thread"""
+    handler = type('BoundMetricsHandler', (MetricsHandler,), {'registry': registry})
+    httpd = http.server.ThreadingHTTPServer((bind, port), handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name='metrics', daemon=True).start()
+    print(f"Metrics on http://{bind}:{port}/metrics")
+    return httpd
+
+
+def install_profile_signal(signum=getattr(signal, 'SIGUSR2', None), directory=PROFILE_DIR, name='tracker'):
+    """
+    First signal starts cProfile, the next one stops it and dumps the stats to
+    <directory>/<name>-<pid>-<timestamp>.prof (load with pstats or snakeviz).
+    Profiles the thread that handles signals, i.e. the main loop.
+    """
+    if signum is None:
+        return False
+    state = {'profiler': None}
+
+    def toggle(_signum, _frame):
+        if state['profiler'] is None:
+            state['profiler'] = cProfile.Profile()
+            state['profiler'].enable()
+            print("Profiling started (send the signal again to dump)")
+            return
+        profiler, state['profiler'] = state['profiler'], None
+        profiler.disable()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{name}-{os.getpid()}-{int(time.time())}.prof")
+            profiler.dump_stats(path)
+            print(f"Profile written to {path}")
+        except OSError as e:
+            print(f"Error writing profile: {e}")
+
+    signal.signal(signum, toggle)
+    return True
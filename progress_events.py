@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Agent Progress Event Stream
+Turns successive get_agent_progress_data() documents into numbered JSON-patch
+deltas for Server-Sent Events. Each change is diffed and encoded once and the
+same bytes go to every viewer, so server work grows with changes, not with
+viewers times poll rate. A short backlog of recent events lets reconnecting
+clients resume from Last-Event-ID instead of fetching a fresh snapshot.
+
+Streamed documents key `agents` by agent id and session key (several
+sessions can share an agent id) so patch paths stay stable when agents come
+and go: {"agents": {"<id>@<session_key>": {...}}, "total_agents": ..., ...}.
+Simulated quality fields change on every tick; a change in those alone does
+not produce an event.
+
+ProgressCache serves the same documents to plain requests (/api/progress):
+one computation per TTL however many viewers ask at once, encoded once,
+with an ETag for conditional requests.
+"""
+
+import gzip
+import json
+import threading
+import time
+from collections import deque
+
+from json_export import VOLATILE_AGENT_FIELDS, content_hash, dumps
+
+# Recent patch events kept for Last-Event-ID resumption
+DEFAULT_BACKLOG = 256
+
+# Top-level keys that change on every tick and never trigger an event by themselves
+VOLATILE_KEYS = ('last_updated',)
+
+# VOLATILE_AGENT_FIELDS (json_export): simulated per-agent fields, sent along when something else changed
+
+# Seconds a computed document is served from ProgressCache before the next request recomputes it
+DEFAULT_TTL = 2.0
+
+
+def agent_key(agent):
+    """Stable key of one agent row; idle registry rows have session key 'None' and unique ids"""
+    return f"{agent.get('id')}@{agent.get('session_key', 'None')}"
+
+
+def keyed_document(data):
+    """Progress document with the agents list re-keyed by agent_key()"""
+    document = {key: value for key, value in data.items() if key != 'agents'}
+    document['agents'] = {agent_key(agent): agent for agent in data.get('agents', [])}
+    return document
+
+
+def same_agent(old, new):
+    """Equal apart from the simulated fields"""
+    if old == new:
+        return True
+    if old.keys() != new.keys():
+        return False
+    return all(old[field] == value for field, value in new.items() if field not in VOLATILE_AGENT_FIELDS)
+
+
+def pointer(*tokens):
+    """JSON Pointer (RFC 6901) for the given path tokens"""
+    return ''.join('/' + str(token).replace('~', '~0').replace('/', '~1') for token in tokens)
+
+
+def diff_documents(old, new):
+    """
+    JSON-patch (RFC 6902) operations turning keyed document `old` into `new`.
+    Agents are compared field by field; other top-level values as a whole.
+    """
+    ops = []
+    old_agents = old.get('agents', {})
+    new_agents = new.get('agents', {})
+    for agent_id in old_agents.keys() - new_agents.keys():
+        ops.append({'op': 'remove', 'path': pointer('agents', agent_id)})
+    for agent_id, agent in new_agents.items():
+        previous = old_agents.get(agent_id)
+        if previous is None:
+            ops.append({'op': 'add', 'path': pointer('agents', agent_id), 'value': agent})
+            continue
+        if same_agent(previous, agent):
+            continue
+        for field in previous.keys() - agent.keys():
+            ops.append({'op': 'remove', 'path': pointer('agents', agent_id, field)})
+        for field, value in agent.items():
+            if field not in previous:
+                ops.append({'op': 'add', 'path': pointer('agents', agent_id, field), 'value': value})
+            elif previous[field] != value:
+                ops.append({'op': 'replace', 'path': pointer('agents', agent_id, field), 'value': value})
+
+    for key in old.keys() - new.keys():
+        ops.append({'op': 'remove', 'path': pointer(key)})
+    for key, value in new.items():
+        if key == 'agents' or key in VOLATILE_KEYS:
+            continue
+        if key not in old:
+            ops.append({'op': 'add', 'path': pointer(key), 'value': value})
+        elif old[key] != value:
+            ops.append({'op': 'replace', 'path': pointer(key), 'value': value})
+    return ops
+
+
+def encode_event(event, data, event_id=None):
+    """One SSE frame as bytes"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, separators=(',', ':')))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class ProgressBroadcaster:
+    """Latest progress document plus a numbered backlog of patch events"""
+
+    def __init__(self, backlog=DEFAULT_BACKLOG):
+        self.document = None
+        self.version = 0
+        self.events = deque(maxlen=backlog)
+        self.closed = False
+        self._snapshot = None
+        self._cond = threading.Condition()
+
+    def publish(self, data):
+        """Fold in a new progress document; returns the new event id, or None if nothing changed"""
+        document = keyed_document(data)
+        with self._cond:
+            if self.document is None:
+                ops = None
+            else:
+                # Agents that only changed simulated fields keep the copy clients already have
+                previous_agents = self.document['agents']
+                for key, agent in document['agents'].items():
+                    previous = previous_agents.get(key)
+                    if previous is not None and same_agent(previous, agent):
+                        document['agents'][key] = previous
+                ops = diff_documents(self.document, document)
+                if not ops:
+                    return None
+                for key in VOLATILE_KEYS:
+                    if key in document and document[key] != self.document.get(key):
+                        ops.append({'op': 'replace', 'path': pointer(key), 'value': document[key]})
+            self.version += 1
+            self.document = document
+            self._snapshot = None
+            if ops is None:
+                # Nothing to patch from: clients resuming from before this point need a snapshot
+                self.events.clear()
+            else:
+                self.events.append((self.version, encode_event('patch', ops, self.version)))
+            self._cond.notify_all()
+            return self.version
+
+    def snapshot_event(self):
+        """Full document as a 'snapshot' frame (encoded once per version)"""
+        with self._cond:
+            if self._snapshot is None:
+                self._snapshot = encode_event('snapshot', self.document, self.version)
+            return self._snapshot
+
+    def events_since(self, last_id):
+        """
+        Frames a client that has seen `last_id` needs to catch up: the missed
+        patches when they are still in the backlog, otherwise a snapshot.
+        Empty if the client is current or there is no document yet.
+        """
+        with self._cond:
+            if self.document is None or last_id == self.version:
+                return []
+            if last_id is not None and self.events and self.events[0][0] <= last_id + 1 <= self.version:
+                return [frame for event_id, frame in self.events if event_id > last_id]
+        return [self.snapshot_event()]
+
+    def wait(self, last_id, timeout):
+        """Block until there is something newer than `last_id` (or timeout/close); True if there is"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.closed or (self.document is not None and self.version != last_id),
+                                       timeout) and not self.closed
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class ProgressFeed:
+    """Background thread publishing `producer()` into a broadcaster every `interval` seconds"""
+
+    def __init__(self, broadcaster, producer, interval=5.0):
+        self.broadcaster = broadcaster
+        self.producer = producer
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='progress-feed', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.broadcaster.publish(self.producer())
+            except Exception as e:
+                print(f"Error updating progress feed: {e}")
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        self.broadcaster.close()
+
+
+class CachedProgress:
+    """One progress document with its JSON encoding, ETag and (lazily) gzip body"""
+
+    __slots__ = ('data', 'body', 'etag', '_gzipped')
+
+    def __init__(self, data):
+        self.data = data
+        self.body = dumps(data)
+        # Volatile keys and simulated agent fields are left out, so a tick that only
+        # moves those still revalidates (as it produces no SSE patch either)
+        self.etag = content_hash(data, VOLATILE_KEYS, VOLATILE_AGENT_FIELDS)
+        self._gzipped = None
+
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+class ProgressCache:
+    """
+    `producer()` behind a short TTL with single-flight refresh: of the
+    requests that find the document expired, one computes it; the others
+    keep getting the previous document meanwhile, or wait for the first one.
+    A failed computation is not retried for `ttl` seconds.
+    """
+
+    def __init__(self, producer, ttl=DEFAULT_TTL):
+        self.producer = producer
+        self.ttl = ttl
+        self.entry = None
+        self.expires = 0.0
+        self.computations = 0
+        self._refreshing = False
+        self._error = None
+        self._retry_at = 0.0
+        self._cond = threading.Condition()
+
+    def get(self):
+        """Current CachedProgress; raises the producer's error if there has never been a document"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self.entry is not None and (now < self.expires or now < self._retry_at):
+                    return self.entry
+                if self.entry is None and self._error is not None and now < self._retry_at:
+                    raise self._error
+                if not self._refreshing:
+                    self._refreshing = True
+                    break
+                if self.entry is not None:
+                    return self.entry
+                self._cond.wait()
+
+        try:
+            self.computations += 1
+            entry = CachedProgress(self.producer())
+        except Exception as e:
+            print(f"Error computing progress: {e}")
+            with self._cond:
+                self._error = e
+                self._retry_at = time.monotonic() + self.ttl
+                self._refreshing = False
+                self._cond.notify_all()
+                if self.entry is None:
+                    raise
+                return self.entry
+
+        with self._cond:
+            self.entry = entry
+            self.expires = time.monotonic() + self.ttl
+            self._error = None
+            self._refreshing = False
+            self._cond.notify_all()
+            return self.entry
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Agent Progress History
+Append-only SQLite (WAL) store of per-agent progress, token usage and status
+per tracker tick. Samples land in 1-minute buckets and are rolled up to
+1-hour and then 1-day buckets as they age, so the file stays small while
+range queries over any window stay fast.
+"""
+
+import os
+import sqlite3
+import time
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+# (resolution, how long buckets of that resolution are kept before rolling up, coarser resolution)
+ROLLUPS = [
+    (MINUTE, 1 * DAY, HOUR),
+    (HOUR, 30 * DAY, DAY),
+]
+
+# Rollups are cheap but pointless every tick
+ROLLUP_INTERVAL = 10 * MINUTE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    resolution   INTEGER NOT NULL,
+    bucket       INTEGER NOT NULL,
+    agent_id     TEXT    NOT NULL,
+    session_key  TEXT    NOT NULL,
+    samples      INTEGER NOT NULL,
+    progress_sum INTEGER NOT NULL,
+    progress_min INTEGER NOT NULL,
+    progress_max INTEGER NOT NULL,
+    progress     INTEGER NOT NULL,
+    tokens_used  INTEGER,
+    status       TEXT,
+    first_ts     REAL    NOT NULL,
+    last_ts      REAL    NOT NULL,
+    PRIMARY KEY (resolution, agent_id, session_key, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_by_session ON samples (session_key, first_ts);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Merging a sample (or a finer bucket) into an existing bucket
+UPSERT = """
+INSERT INTO samples (resolution, bucket, agent_id, session_key, samples, progress_sum, progress_min,
+                     progress_max, progress, tokens_used, status, first_ts, last_ts)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (resolution, agent_id, session_key, bucket) DO UPDATE SET
+    samples = samples + excluded.samples,
+    progress_sum = progress_sum + excluded.progress_sum,
+    progress_min = MIN(progress_min, excluded.progress_min),
+    progress_max = MAX(progress_max, excluded.progress_max),
+    progress = CASE WHEN excluded.last_ts >= last_ts THEN excluded.progress ELSE progress END,
+    tokens_used = CASE WHEN excluded.last_ts >= last_ts THEN excluded.tokens_used ELSE tokens_used END,
+    status = CASE WHEN excluded.last_ts >= last_ts THEN excluded.status ELSE status END,
+    first_ts = MIN(first_ts, excluded.first_ts),
+    last_ts = MAX(last_ts, excluded.last_ts)
+"""
+
+
+def parse_tokens_used(token_usage):
+    """'12k/200k' -> 12000; None if the usage string is not a used/total pair"""
+    if not isinstance(token_usage, str) or '/' not in token_usage:
+        return None
+    used = token_usage.split('/')[0].strip()
+    try:
+        return int(used.replace('k', '000').replace('K', '000'))
+    except ValueError:
+        return None
+
+
+class ProgressHistory:
+    """Per-agent time series of tracker ticks"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record_tick(self, agents, now=None):
+        """Store one sample per live agent session (idle registry rows are skipped)"""
+        now = time.time() if now is None else now
+        bucket = int(now // MINUTE) * MINUTE
+        rows = []
+        for agent in agents:
+            session_key = agent.get('session_key', 'None')
+            if session_key == 'None':
+                continue
+            progress = int(agent.get('progress', 0))
+            rows.append((MINUTE, bucket, agent['id'], session_key, 1, progress, progress, progress, progress,
+                         parse_tokens_used(agent.get('token_usage')), agent.get('status'), now, now))
+        with self.conn:
+            self.conn.executemany(UPSERT, rows)
+        self.maybe_rollup(now)
+        return len(rows)
+
+    def maybe_rollup(self, now=None):
+        now = time.time() if now is None else now
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'last_rollup'").fetchone()
+        if row and now - float(row[0]) < ROLLUP_INTERVAL:
+            return False
+        self.rollup(now)
+        return True
+
+    def rollup(self, now=None):
+        """Fold buckets past their retention into the next coarser resolution"""
+        now = time.time() if now is None else now
+        with self.conn:
+            for resolution, retention, coarser in ROLLUPS:
+                cutoff = int((now - retention) // coarser) * coarser
+                aged = self.conn.execute(
+                    "SELECT (bucket / ?) * ?, agent_id, session_key, samples, progress_sum,"
+                    " progress_min, progress_max, first_ts, last_ts, progress, tokens_used, status"
+                    " FROM samples WHERE resolution = ? AND bucket < ?"
+                    " ORDER BY agent_id, session_key, bucket",
+                    (coarser, coarser, resolution, cutoff)
+                ).fetchall()
+                merged = {}
+                for (bucket, agent_id, session_key, samples, progress_sum, progress_min, progress_max,
+                     first_ts, last_ts, progress, tokens_used, status) in aged:
+                    key = (bucket, agent_id, session_key)
+                    current = merged.get(key)
+                    if current is None:
+                        merged[key] = [samples, progress_sum, progress_min, progress_max,
+                                       progress, tokens_used, status, first_ts, last_ts]
+                    else:
+                        current[0] += samples
+                        current[1] += progress_sum
+                        current[2] = min(current[2], progress_min)
+                        current[3] = max(current[3], progress_max)
+                        if last_ts >= current[8]:
+                            current[4:7] = [progress, tokens_used, status]
+                        current[7] = min(current[7], first_ts)
+                        current[8] = max(current[8], last_ts)
+                self.conn.executemany(UPSERT, [
+                    (coarser, bucket, agent_id, session_key) + tuple(values)
+                    for (bucket, agent_id, session_key), values in merged.items()
+                ])
+                self.conn.execute("DELETE FROM samples WHERE resolution = ? AND bucket < ?", (resolution, cutoff))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_rollup', ?)", (str(now),))
+
+    def query(self, agent_id=None, session_key=None, start=None, end=None):
+        """
+        Samples in [start, end) for one agent and/or session, oldest first.
+        Each period lives at exactly one resolution, so mixing them is safe.
+        """
+        clauses = []
+        params = []
+        if agent_id is not None:
+            clauses.append("agent_id = ?")
+            params.append(agent_id)
+        if session_key is not None:
+            clauses.append("session_key = ?")
+            params.append(session_key)
+        if start is not None:
+            clauses.append("last_ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("first_ts < ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self.conn.execute(
+            "SELECT resolution, bucket, agent_id, session_key, samples, progress_sum, progress_min,"
+            f" progress_max, progress, tokens_used, status, first_ts, last_ts FROM samples {where}"
+            " ORDER BY bucket, resolution", params)
+        return [{
+            'resolution': resolution,
+            'bucket': bucket,
+            'agent_id': row_agent,
+            'session_key': row_session,
+            'samples': samples,
+            'progress_avg': progress_sum / samples,
+            'progress_min': progress_min,
+            'progress_max': progress_max,
+            'progress': progress,
+            'tokens_used': tokens_used,
+            'status': status,
+            'first_ts': first_ts,
+            'last_ts': last_ts
+        } for (resolution, bucket, row_agent, row_session, samples, progress_sum, progress_min,
+               progress_max, progress, tokens_used, status, first_ts, last_ts) in cursor]
+
+    def first_seen(self, session_keys):
+        """{session_key: earliest sample time} for the given sessions"""
+        session_keys = list(session_keys)
+        result = {}
+        # Chunked to stay under SQLite's bound-parameter limit
+        for i in range(0, len(session_keys), 500):
+            chunk = session_keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for session_key, first_ts in self.conn.execute(
+                    f"SELECT session_key, MIN(first_ts) FROM samples WHERE session_key IN ({placeholders})"
+                    " GROUP BY session_key", chunk):
+                result[session_key] = first_ts
+        return result
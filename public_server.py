@@ -1,92 +1,135 @@
 #!/usr/bin/env python3
-import http.server
-import socketserver
-import socket
+"""
+Public Dashboard Server
+Serves the dashboards on port 9090 for access from outside the LAN. The
+server listens straight away: the public IP shown in the banner comes from
+a small cache and is refreshed from httpbin in the background, so a slow or
+missing network only delays (or drops) that line.
+
+To deploy a new version without dropping connections, send the running
+server SIGHUP (kill -HUP <pid>): a new process takes over the listening
+socket and the old one exits once its open requests are answered.
+"""
+
+import json
 import os
+import socket
 import sys
+import threading
+import time
+import urllib.request
+
+from dashboard_server import progress_feed, serve
+
+PORT = 9090
+PUBLIC_IP_URL = 'http://httpbin.org/ip'
+
+# Kept outside the served directory
+PUBLIC_IP_CACHE = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                               'ascent_xr', 'public_ip.json')
+
+# A cached public IP younger than this is used without asking httpbin again
+PUBLIC_IP_TTL = 6 * 3600
+
+def read_cached_ip(cache_path=PUBLIC_IP_CACHE):
+    """(ip, age in seconds) from the cache, or (None, None)"""
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        return cached['ip'], time.time() - cached['resolved_at']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, None
+
+def get_public_ip(timeout=5, cache_path=PUBLIC_IP_CACHE):
+    """Public IP address from httpbin, cached on success; None without network"""
+    try:
+        with urllib.request.urlopen(PUBLIC_IP_URL, timeout=timeout) as response:
+            ip = json.loads(response.read().decode())['origin']
+    except (OSError, ValueError, KeyError):
+        return None
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'ip': ip, 'resolved_at': time.time()}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Error caching public IP: {e}")
+    return ip
 
-class PublicHTTPHandler(http.server.SimpleHTTPRequestHandler):
-    def log_message(self, format, *args):
-        """Custom logging to show external IPs"""
-        client_ip = self.client_address[0]
-        print(f"{client_ip} - {format % args}")
-    
-    def end_headers(self):
-        """Add headers for CORS and cache control"""
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        super().end_headers()
-
-def get_public_ip():
-    """Get public IP address"""
+def resolve_public_ip(on_resolved, cache_path=PUBLIC_IP_CACHE):
+    """
+    The cached public IP (or None) right away; if it is missing or older than
+    PUBLIC_IP_TTL a background thread asks httpbin and calls
+    on_resolved(cached_ip, ip), with ip None when the lookup fails.
+    """
+    cached_ip, age = read_cached_ip(cache_path)
+    if cached_ip is None or age > PUBLIC_IP_TTL:
+        threading.Thread(target=lambda: on_resolved(cached_ip, get_public_ip(cache_path=cache_path)),
+                         name='public-ip', daemon=True).start()
+    return cached_ip
+
+def get_local_ip():
     try:
-        import urllib.request
-        import json
-        response = urllib.request.urlopen('http://httpbin.org/ip', timeout=5)
-        data = json.loads(response.read().decode())
-        return data['origin']
-    except:
-        return "Unknown"
+        return socket.gethostbyname(socket.gethostname())
+    except OSError:
+        return "127.0.0.1"
 
 def main():
-    PORT = 9090
     DIRECTORY = os.path.dirname(os.path.abspath(__file__))
-    
-    # Change to directory
-    os.chdir(DIRECTORY)
-    
-    # Get IP info
-    local_ip = socket.gethostbyname(socket.gethostname())
-    public_ip = get_public_ip()
-    
+    local_ip = get_local_ip()
+
+    def on_public_ip(cached_ip, ip):
+        # Runs on the lookup thread, possibly before resolve_public_ip() has returned
+        if ip is None:
+            if cached_ip is None:
+                print("🌐 Public IP unavailable (no network?) - local URLs still work")
+        elif ip != cached_ip:
+            print(f"🌐 Public: http://{ip}:{PORT}/ (dashboard: http://{ip}:{PORT}/ascent_xr_master_dashboard.html)")
+
+    public_ip = resolve_public_ip(on_public_ip)
+    public_host = public_ip or "<resolving public IP>"
+
     print("=" * 70)
     print("AScent XR PUBLIC DASHBOARD SERVER")
     print("=" * 70)
     print(f"📂 Directory: {DIRECTORY}")
     print(f"🔌 Port: {PORT}")
+    htpasswd = os.path.join(DIRECTORY, '.htpasswd')
+    if os.path.exists(htpasswd):
+        print(f"🔒 Auth: HTTP Basic ({htpasswd})")
+    else:
+        print("⚠️  Auth: none (run htpasswd-generator.py to create .htpasswd)")
+        htpasswd = None
     print("")
     print("🌐 ACCESS URLs:")
     print(f"  Local:     http://localhost:{PORT}/")
     print(f"  Network:   http://{local_ip}:{PORT}/")
-    print(f"  Public:    http://{public_ip}:{PORT}/")
+    print(f"  Public:    http://{public_host}:{PORT}/")
     print("")
     print("📋 Direct Links:")
-    print(f"  Dashboard: http://{public_ip}:{PORT}/ascent_xr_master_dashboard.html")
-    print(f"  Test:      http://{public_ip}:{PORT}/simple_test.html")
+    print(f"  Dashboard: http://{public_host}:{PORT}/ascent_xr_master_dashboard.html")
+    print(f"  Test:      http://{public_host}:{PORT}/simple_test.html")
     print("")
     print("⚠️  If public IP doesn't work:")
-    print("  1. Check firewall: sudo ufw allow 9090/tcp")
+    print(f"  1. Check firewall: sudo ufw allow {PORT}/tcp")
     print("  2. Router may block incoming connections")
     print("  3. Try different port (9080, 9091)")
     print("=" * 70)
-    
-    # Kill any existing server on this port
-    try:
-        import signal
-        import psutil
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-            if proc.info['cmdline'] and f':{PORT}' in ' '.join(proc.info['cmdline']):
-                os.kill(proc.info['pid'], signal.SIGTERM)
-    except:
-        pass
-    
-    # Start server
+
+    def on_start(port):
+        print(f"✅ Server started on port {port} (pid {os.getpid()})")
+        print(f"👂 Listening on 0.0.0.0:{port}")
+        print(f"Reload without downtime: kill -HUP {os.getpid()}")
+        print("Press Ctrl+C to stop")
+
     try:
-        with socketserver.TCPServer(("0.0.0.0", PORT), PublicHTTPHandler) as httpd:
-            print(f"✅ Server started successfully!")
-            print(f"👂 Listening on 0.0.0.0:{PORT}")
-            print("Press Ctrl+C to stop")
-            httpd.serve_forever()
-    except OSError as e:
-        print(f"❌ Failed to start on port {PORT}: {e}")
-        print("Trying port 9091...")
-        PORT = 9091
-        with socketserver.TCPServer(("0.0.0.0", PORT), PublicHTTPHandler) as httpd:
-            print(f"✅ Server started on port {PORT}")
-            print(f"Access: http://{public_ip}:{PORT}/")
-            httpd.serve_forever()
+        serve([PORT], DIRECTORY, on_start=on_start, on_worker_start=progress_feed(), graceful_reload=True,
+              cors=True, log_client_ip=True, expose_metrics=False, htpasswd=htpasswd)
+    except OSError:
+        print(f"Error: port {PORT} is in use. If it is an older public_server.py, "
+              f"reload it with kill -HUP <pid> instead of starting another.")
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
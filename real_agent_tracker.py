@@ -1,110 +1,427 @@
 #!/usr/bin/env python3
+import argparse
 import json
 import os
 import glob
 import datetime
 import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def get_real_agent_data():
-    """Get actual agent progress from OpenClaw session files"""
+from content_index import ContentIndex
+from json_export import export_json, sidecar_paths
+from metrics import install_profile_signal, span, start_metrics_server
+from rules_engine import get_ruleset, rules_signature
+from session_reader import SessionReader
+from tracker_watch import PollingWatcher, create_watcher, watch_loop
+from work_shards import MANIFEST_NAME, newest_first, shard_dir_for, summarize, write_work_shards
+from workspace_scanner import IgnoreRules, WorkspaceScanner
+
+WORKSPACE = Path("/home/jim/openclaw")
+SESSION_DIR = Path("/home/jim/.openclaw/agents/main/sessions")
+SCAN_INDEX = WORKSPACE / ".tracker_cache" / "scan_index.json"
+SESSION_CHECKPOINTS = WORKSPACE / ".tracker_cache" / "session_checkpoints.json"
+
+# Lists the workspaces (and their session directories) for multi-root runs
+WORKSPACES_CONFIG = WORKSPACE / "tracker_workspaces.json"
+
+# Files the trackers write themselves; scanning them would count every
+# export as new work (and make --watch react to its own output). Covers the
+# .gz/.etag sidecars and in-flight temp files of json_export as well, and
+# the completed_work shards next to real_progress.json.
+TRACKER_OUTPUTS = (sidecar_paths("/real_progress.json") + sidecar_paths("/agent_progress_data.json")
+                   + ["/real_progress.d/"])
+
+# Path -> area rules live in classification_rules.json; adding an area there
+# adds its counter to real_progress.json without code changes
+FILE_AREAS = get_ruleset("file_areas")
+PROGRESS_AREAS = FILE_AREAS.areas
+
+def categorize_file(rel_path):
+    """Map a workspace path to its progress area (first match wins)"""
+    return FILE_AREAS.classify(rel_path)
+
+class CompletedWork:
+    """
+    Files whose content changed within the window plus per-area counters,
+    updatable one path at a time. The window starts at midnight today unless
+    `since` (epoch seconds, or a content index checkpoint name) is given.
+    With a ContentIndex a touch or identical rewrite does not count as work;
+    without one the file's mtime is taken at face value.
+    """
+    
+    def __init__(self, today=None, content=None, since=None):
+        self.today = today or datetime.date.today()
+        self.content = content
+        if since is None:
+            self.since = datetime.datetime.combine(self.today, datetime.time()).timestamp()
+        elif content is not None:
+            self.since = content.resolve_since(since)
+        else:
+            self.since = since
+        self.files = {}
+        self.categories = {}
+        self.progress_areas = {area: 0 for area in PROGRESS_AREAS}
+    
+    def update(self, rel_path, entry):
+        """Apply one scanner entry (mtime, size, category), or None for a removed file"""
+        if rel_path in self.files:
+            del self.files[rel_path]
+            category = self.categories.pop(rel_path)
+            if category:
+                self.progress_areas[category] -= 1
+        if self.content is not None:
+            self.content.update(rel_path, entry)
+        if entry is None:
+            return
+        st_mtime, size, category = entry
+        changed_at = st_mtime
+        if self.content is not None:
+            changed_at = self.content.changed_at(rel_path) or st_mtime
+        if changed_at >= self.since:
+            self.files[rel_path] = {
+                "file": rel_path,
+                "modified": datetime.datetime.fromtimestamp(changed_at).isoformat(),
+                "size": size
+            }
+            self.categories[rel_path] = category
+            if category:
+                self.progress_areas[category] += 1
+    
+    def load(self, entries):
+        if self.content is not None:
+            # Also drops paths that disappeared while nothing was watching
+            self.content.sync(entries)
+        for rel_path, entry in entries.items():
+            self.update(rel_path, entry)
+        return self
+    
+    def merge(self, other, prefix=""):
+        """Fold another workspace's work in, with its paths under `prefix`"""
+        for rel_path, info in other.files.items():
+            key = prefix + rel_path
+            self.files[key] = dict(info, file=key)
+            self.categories[key] = other.categories[rel_path]
+        for area, count in other.progress_areas.items():
+            self.progress_areas[area] += count
+        return self
+
+def get_session_info(session_dir=SESSION_DIR, reader=None, checkpoint_path=SESSION_CHECKPOINTS):
+    """
+    Count session transcripts, tail them for turn/token totals, describe the
+    recent ones. Without a `reader`, one checkpointing to `checkpoint_path` is used.
+    """
+    with span('real_progress', 'sessions'):
+        return _get_session_info(Path(session_dir), reader, checkpoint_path)
+
+def _get_session_info(session_dir, reader, checkpoint_path):
+    if not session_dir.exists():
+        return None
+    
+    session_files = []
+    for session_file in session_dir.glob("*.jsonl"):
+        try:
+            session_files.append((session_file, session_file.stat()))
+        except OSError:
+            continue
+    
+    # Only bytes appended since the last checkpoint are parsed
+    if reader is None:
+        reader = SessionReader(session_dir, checkpoint_path=checkpoint_path)
+    transcript_stats = reader.read_all()
+    try:
+        reader.save_checkpoints()
+    except OSError as e:
+        print(f"Error saving session checkpoints: {e}")
+    
+    recent_sessions = []
+    for session_file, st in sorted(session_files, key=lambda x: x[1].st_mtime, reverse=True)[:5]:
+        stats = transcript_stats.get(session_file.name, {})
+        recent_sessions.append({
+            "file": session_file.name,
+            "modified": datetime.datetime.fromtimestamp(st.st_mtime).isoformat(),
+            "size": st.st_size,
+            "turns": stats.get("turns", 0),
+            "input_tokens": stats.get("input_tokens", 0),
+            "output_tokens": stats.get("output_tokens", 0),
+            "total_tokens": stats.get("total_tokens", 0),
+            "model": stats.get("model")
+        })
+    
+    return {
+        "active_sessions": len(session_files),
+        "recent_sessions": recent_sessions,
+        "session_totals": {
+            "turns": sum(s["turns"] for s in transcript_stats.values()),
+            "total_tokens": sum(s["total_tokens"] for s in transcript_stats.values())
+        }
+    }
+
+def build_real_agent_data(work, session_info):
+    """Assemble the real_progress.json document from completed work and session info"""
     data = {
         "agents": [],
         "total_agents": 0,
         "active_agents": 0,
-        "completed_work": [],
+        "completed_work": list(work.files.values()),
         "real_progress": {},
         "last_updated": datetime.datetime.utcnow().isoformat() + "Z",
         "analysis_source": "real_session_files"
     }
     
-    # Check for actual agent directories
-    workspace = Path("/home/jim/openclaw")
-    
-    # Real work completed (files created/modified today)
-    today = datetime.date.today()
-    completed_files = []
-    
-    for file_path in workspace.rglob("*"):
-        if file_path.is_file():
-            # Get modification time
-            mtime = datetime.datetime.fromtimestamp(file_path.stat().st_mtime)
-            if mtime.date() == today:
-                rel_path = str(file_path.relative_to(workspace))
-                completed_files.append({
-                    "file": rel_path,
-                    "modified": mtime.isoformat(),
-                    "size": file_path.stat().st_size
-                })
-    
-    # Count actual work
-    data["completed_work"] = completed_files
-    
-    # Analyze actual progress based on file types
-    progress_areas = {
-        "dashboard": 0,
-        "crm": 0,
-        "linkedin": 0,
-        "marketing": 0,
-        "sales": 0,
-        "deployment": 0,
-        "qa": 0
-    }
-    
-    for file_info in completed_files:
-        file_path = file_info["file"].lower()
-        
-        # Categorize progress
-        if "dashboard" in file_path:
-            progress_areas["dashboard"] += 1
-        elif "crm" in file_path:
-            progress_areas["crm"] += 1
-        elif "linkedin" in file_path:
-            progress_areas["linkedin"] += 1
-        elif "market" in file_path:
-            progress_areas["marketing"] += 1
-        elif "sales" in file_path:
-            progress_areas["sales"] += 1
-        elif "deploy" in file_path or "docker" in file_path:
-            progress_areas["deployment"] += 1
-        elif "qa" in file_path or "test" in file_path:
-            progress_areas["qa"] += 1
-    
     # Calculate percentage progress (based on expected milestones)
     total_expected = 20  # Expected files per area for completion
     
     data["real_progress"] = {
-        "dashboard": min(100, int((progress_areas["dashboard"] / total_expected) * 100)),
-        "crm": min(100, int((progress_areas["crm"] / total_expected) * 100)),
-        "linkedin": min(100, int((progress_areas["linkedin"] / total_expected) * 100)),
-        "marketing": min(100, int((progress_areas["marketing"] / total_expected) * 100)),
-        "sales": min(100, int((progress_areas["sales"] / total_expected) * 100)),
-        "deployment": min(100, int((progress_areas["deployment"] / total_expected) * 100)),
-        "qa": min(100, int((progress_areas["qa"] / total_expected) * 100)),
-        "total_files_created": len(completed_files)
+        area: min(100, int((work.progress_areas[area] / total_expected) * 100))
+        for area in PROGRESS_AREAS
     }
+    data["real_progress"]["total_files_created"] = len(work.files)
     
-    # Get actual session files from OpenClaw
-    session_dir = Path("/home/jim/.openclaw/agents/main/sessions")
-    if session_dir.exists():
-        session_files = list(session_dir.glob("*.jsonl"))
-        data["active_sessions"] = len(session_files)
-        data["recent_sessions"] = []
-        
-        # Get recent session info
-        for session_file in sorted(session_files, key=lambda x: x.stat().st_mtime, reverse=True)[:5]:
-            session_info = {
-                "file": session_file.name,
-                "modified": datetime.datetime.fromtimestamp(session_file.stat().st_mtime).isoformat(),
-                "size": session_file.stat().st_size
-            }
-            data["recent_sessions"].append(session_info)
+    if session_info is not None:
+        data.update(session_info)
     
     return data
 
-def update_dashboard_progress(data):
-    """Update the dashboard with real progress data"""
-    dashboard_path = Path("/home/jim/openclaw/index.html")
+def make_scanner(workspace=WORKSPACE, index_path=SCAN_INDEX):
+    ignore = IgnoreRules.for_workspace(str(workspace), extra=TRACKER_OUTPUTS)
+    return WorkspaceScanner(workspace, index_path=index_path, categorize=categorize_file, ignore=ignore,
+                            categorize_signature=rules_signature())
+
+def content_index_path(index_path):
+    """The content index lives next to the scan index"""
+    return Path(index_path).with_name("content_index.json")
+
+def session_checkpoints_path(index_path):
+    """Session transcript checkpoints live next to the scan index too (none without one)"""
+    return Path(index_path).with_name("session_checkpoints.json") if index_path else None
+
+def scan_root(workspace=WORKSPACE, index_path=SCAN_INDEX, full_scan=False, since=None, checkpoint=None):
+    """
+    CompletedWork for one workspace from an incremental scan. `since` picks
+    the window (see CompletedWork); `checkpoint` names the end of this run
+    so a later run can ask for changes since it.
+    """
+    # Incremental scan: only directories whose mtime changed are re-listed
+    with span('real_progress', 'scan'):
+        scanner = make_scanner(workspace, index_path)
+        entries = scanner.scan(full=full_scan)
+        try:
+            scanner.save_index()
+        except OSError as e:
+            print(f"Error saving scan index: {e}")
+    
+    # Real work completed (content changed within the window); only files
+    # whose stat tuple changed are hashed
+    with span('real_progress', 'classify'):
+        content = ContentIndex(workspace, content_index_path(index_path) if index_path else None)
+        work = CompletedWork(content=content, since=since).load(entries)
+        if checkpoint:
+            content.checkpoint(checkpoint)
+        try:
+            content.save()
+        except OSError as e:
+            print(f"Error saving content index: {e}")
+        return work
+
+def analyze_root(workspace=WORKSPACE, session_dir=SESSION_DIR, index_path=SCAN_INDEX, full_scan=False,
+                 checkpoint_path=None, since=None, checkpoint=None):
+    """
+    (CompletedWork, session info) for one workspace; session_dir=None skips
+    transcripts. checkpoint_path defaults to one next to index_path.
+    """
+    work = scan_root(workspace, index_path, full_scan, since, checkpoint)
+    if session_dir is None:
+        return work, None
+    reader = SessionReader(session_dir, checkpoint_path=checkpoint_path or session_checkpoints_path(index_path))
+    return work, get_session_info(session_dir, reader)
+
+def get_real_agent_data(workspace=WORKSPACE, session_dir=SESSION_DIR, index_path=SCAN_INDEX, full_scan=False,
+                        checkpoint_path=None, since=None, checkpoint=None):
+    """Get actual agent progress from OpenClaw session files"""
+    return build_real_agent_data(*analyze_root(workspace, session_dir, index_path, full_scan, checkpoint_path,
+                                               since, checkpoint))
+
+def load_workspace_roots(config_path=WORKSPACES_CONFIG):
+    """
+    Roots from a JSON config:
+    {"workspaces": [{"name": "main", "workspace": "/path", "session_dir": "/path"}, ...]}
+    Scan index and session checkpoints default to each workspace's .tracker_cache.
+    A session directory shared by several roots is only read for the first.
+    """
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    
+    roots = []
+    seen_session_dirs = set()
+    for i, entry in enumerate(config.get("workspaces", [])):
+        workspace = Path(entry["workspace"])
+        cache_dir = workspace / ".tracker_cache"
+        session_dir = entry.get("session_dir")
+        if session_dir:
+            session_dir = os.path.abspath(session_dir)
+            if session_dir in seen_session_dirs:
+                session_dir = None
+            else:
+                seen_session_dirs.add(session_dir)
+        roots.append({
+            "name": entry.get("name") or workspace.name or f"workspace{i}",
+            "workspace": str(workspace),
+            "session_dir": session_dir,
+            "index_path": entry.get("index_path") or str(cache_dir / "scan_index.json"),
+            "checkpoint_path": entry.get("checkpoint_path") or str(cache_dir / "session_checkpoints.json")
+        })
+    return roots
+
+def _analyze_configured_root(root, full_scan, since=None, checkpoint=None):
+    # Top-level so ProcessPoolExecutor can pickle it
+    return analyze_root(root["workspace"], root["session_dir"], root["index_path"], full_scan,
+                        root["checkpoint_path"], since, checkpoint)
+
+def merge_session_info(named_infos):
+    """Combine per-root session info: totals summed, the five most recent sessions overall"""
+    named_infos = [(name, info) for name, info in named_infos if info is not None]
+    if not named_infos:
+        return None
+    recent_sessions = [dict(session, workspace=name) for name, info in named_infos
+                       for session in info["recent_sessions"]]
+    recent_sessions.sort(key=lambda session: session["modified"], reverse=True)
+    return {
+        "active_sessions": sum(info["active_sessions"] for _name, info in named_infos),
+        "recent_sessions": recent_sessions[:5],
+        "session_totals": {
+            "turns": sum(info["session_totals"]["turns"] for _name, info in named_infos),
+            "total_tokens": sum(info["session_totals"]["total_tokens"] for _name, info in named_infos)
+        }
+    }
+
+def get_multi_root_data(roots, full_scan=False, max_workers=None, since=None, checkpoint=None):
+    """
+    Analyze several workspaces in parallel (one process per root, up to the
+    core count) and merge them into one real_progress.json document.
+    """
+    if len(roots) == 1:
+        results = [_analyze_configured_root(roots[0], full_scan, since, checkpoint)]
+    else:
+        max_workers = max_workers or min(len(roots), os.cpu_count() or 1)
+        n = len(roots)
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_analyze_configured_root, roots, [full_scan] * n, [since] * n,
+                                    [checkpoint] * n))
+    
+    work = CompletedWork()
+    for root, (root_work, _session_info) in zip(roots, results):
+        work.merge(root_work, prefix=f"{root['name']}:" if len(roots) > 1 else "")
+    session_info = merge_session_info(
+        (root["name"], session_info) for root, (_root_work, session_info) in zip(roots, results))
+    
+    data = build_real_agent_data(work, session_info)
+    data["workspaces"] = [{
+        "name": root["name"],
+        "workspace": root["workspace"],
+        "files_created": len(root_work.files),
+        "active_sessions": session_info["active_sessions"] if session_info else 0
+    } for root, (root_work, session_info) in zip(roots, results)]
+    return data
+
+def watch(workspace=WORKSPACE, session_dir=SESSION_DIR, index_path=SCAN_INDEX,
+          output_path=None, debounce=0.25, force_polling=False, full_scan_every=15, metrics_port=None,
+          window_hours=None, gzip_shards=False, checkpoint_path=None):
+    """
+    Long-running mode: keep counters in memory and rewrite output on change.
+    When polling, every `full_scan_every` polls re-lists all directories so
+    in-place edits (which inotify would report directly) are still picked up.
+    With `window_hours` the work window is the last N hours (moved forward at
+    most once a minute, on the next event) instead of today. Session
+    checkpoints default to a file next to index_path.
+    """
+    workspace = os.path.abspath(str(workspace))
+    session_dir = os.path.abspath(str(session_dir))
+    if metrics_port:
+        start_metrics_server(metrics_port)
+    install_profile_signal(name='real_agent_tracker')
+    
+    scanner = make_scanner(workspace, index_path)
+    content = ContentIndex(workspace, content_index_path(index_path))
+    
+    def new_work():
+        since = time.time() - window_hours * 3600 if window_hours else None
+        return CompletedWork(content=content, since=since).load(scanner.files)
+    
+    scanner.scan()
+    work = new_work()
+    reader = SessionReader(session_dir, checkpoint_path=checkpoint_path or session_checkpoints_path(index_path))
+    session_info = get_session_info(session_dir, reader)
+    
+    watcher = create_watcher(force_polling=force_polling)
+    watcher.watch_tree(workspace, scanner.ignore)
+    if os.path.isdir(session_dir):
+        watcher.watch_dir(session_dir)
+    
+    polling = isinstance(watcher, PollingWatcher)
+    state = {"scans": 0}
+    
+    def publish():
+        # The exporter skips the write when nothing but last_updated changed
+        update_dashboard_progress(build_real_agent_data(work, session_info), output_path, gzip_shards)
+        try:
+            scanner.save_index()
+            content.save()
+        except OSError as e:
+            print(f"Error saving scan index: {e}")
+    
+    def on_events(events):
+        nonlocal work, session_info
+        
+        # Day rollover (or a rolling window moving on): older work drops out
+        if window_hours:
+            if time.time() - window_hours * 3600 - work.since >= 60:
+                work = new_work()
+        elif datetime.date.today() != work.today:
+            work = new_work()
+        
+        rescan = False
+        modified = set()
+        sessions_changed = False
+        for path, structural in events:
+            if path is None:
+                rescan = True
+            elif path == session_dir or path.startswith(session_dir + os.sep):
+                sessions_changed = True
+            elif path == workspace or path.startswith(workspace + os.sep):
+                if structural:
+                    rescan = True
+                else:
+                    modified.add(os.path.relpath(path, workspace).replace(os.sep, '/'))
+        
+        if rescan:
+            state["scans"] += 1
+            with span('real_progress', 'scan'):
+                scanner.scan(full=polling and state["scans"] % full_scan_every == 0)
+            for rel_path, entry in scanner.changes.items():
+                work.update(rel_path, entry)
+        if modified:
+            with span('real_progress', 'scan'):
+                changes = scanner.refresh_paths(modified)
+            for rel_path, entry in changes.items():
+                work.update(rel_path, entry)
+        if sessions_changed:
+            session_info = get_session_info(session_dir, reader)
+        
+        publish()
+    
+    publish()
+    print(f"👀 Watching {workspace} and {session_dir} (Ctrl+C to stop)")
+    watch_loop(watcher, on_events, debounce=debounce)
+
+def update_dashboard_progress(data, output_path=None, gzip_shards=False):
+    """
+    Update the dashboard with real progress data: a summary at output_path
+    (newest completed work inline) and the full list in hourly shards
+    """
+    output_path = Path(output_path or WORKSPACE / "real_progress.json")
+    dashboard_path = output_path.parent / "index.html"
     
     if not dashboard_path.exists():
         print("Dashboard file not found")
@@ -117,21 +434,64 @@ def update_dashboard_progress(data):
     # This would require updating the HTML/JS to show real data
     # For now, create a JSON file for the dashboard to fetch
     
-    output_path = Path("/home/jim/openclaw/real_progress.json")
-    with open(output_path, 'w') as f:
-        json.dump(data, f, indent=2)
-    
-    print(f"Real progress data saved to {output_path}")
+    try:
+        with span('real_progress', 'export'):
+            shard_dir = shard_dir_for(output_path)
+            write_work_shards(data["completed_work"], shard_dir, compress=gzip_shards)
+            summary = summarize(data, f"{shard_dir.name}/{MANIFEST_NAME}")
+            written = export_json(summary, output_path, gzip_sidecar=True)
+        if written:
+            print(f"Real progress data saved to {output_path}")
+    except OSError as e:
+        print(f"Error saving real progress data: {e}")
     return data
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze real agent progress from the workspace")
+    parser.add_argument("--full", action="store_true", help="ignore the scan index and re-list every directory")
+    parser.add_argument("--watch", action="store_true", help="keep running and update output on filesystem events")
+    parser.add_argument("--poll", action="store_true", help="with --watch, poll instead of using inotify")
+    parser.add_argument("--metrics-port", type=int, help="with --watch, serve Prometheus metrics on this port")
+    parser.add_argument("--config", help=f"JSON list of workspaces to analyze in parallel (e.g. {WORKSPACES_CONFIG})")
+    parser.add_argument("--hours", type=float, help="count content changes in the last N hours instead of today")
+    parser.add_argument("--since-checkpoint", metavar="NAME", help="count content changes since a named checkpoint")
+    parser.add_argument("--checkpoint", metavar="NAME", help="record this run's end as checkpoint NAME")
+    parser.add_argument("--gzip-shards", action="store_true", help="gzip the completed_work detail shards")
+    args = parser.parse_args()
+    if args.watch and args.config:
+        parser.error("--watch follows a single workspace; run one watcher per root")
+    if args.hours and args.since_checkpoint:
+        parser.error("--hours and --since-checkpoint pick different windows; use one")
+    if args.watch and (args.since_checkpoint or args.checkpoint):
+        parser.error("checkpoints apply to one-shot runs")
+    
+    if args.watch:
+        watch(force_polling=args.poll, metrics_port=args.metrics_port, window_hours=args.hours,
+              gzip_shards=args.gzip_shards)
+        raise SystemExit(0)
+    
     print("🔍 Analyzing REAL agent progress...")
     print("-" * 60)
     
-    real_data = get_real_agent_data()
+    since = time.time() - args.hours * 3600 if args.hours else args.since_checkpoint
+    try:
+        if args.config:
+            real_data = get_multi_root_data(load_workspace_roots(args.config), full_scan=args.full, since=since,
+                                            checkpoint=args.checkpoint)
+        else:
+            real_data = get_real_agent_data(full_scan=args.full, since=since, checkpoint=args.checkpoint)
+    except KeyError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
     
+    if args.hours:
+        window = f"in the last {args.hours:g}h"
+    elif args.since_checkpoint:
+        window = f"since checkpoint {args.since_checkpoint}"
+    else:
+        window = "today"
     print(f"📊 REAL PROGRESS ANALYSIS:")
-    print(f"  Files created today: {len(real_data['completed_work'])}")
+    print(f"  Files changed {window}: {len(real_data['completed_work'])}")
     print(f"  Active sessions: {real_data.get('active_sessions', 0)}")
     print()
     print(f"📈 PROGRESS BY AREA:")
@@ -141,10 +501,10 @@ if __name__ == "__main__":
     
     print()
     print(f"📋 RECENT WORK:")
-    for file_info in real_data["completed_work"][:5]:  # Show first 5
+    for file_info in newest_first(real_data["completed_work"])[:5]:  # Show newest 5
         print(f"  • {file_info['file']}")
     
     print("-" * 60)
     
     # Update dashboard data
-    update_dashboard_progress(real_data)
\ No newline at end of file
+    update_dashboard_progress(real_data, gzip_shards=args.gzip_shards)
\ No newline at end of file
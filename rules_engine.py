@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Classification Rules Engine
+Compiles the declarative rules in classification_rules.json into one
+combined matcher per ruleset. A single regex over every substring the
+rules mention (a prefix trie, see trie_pattern) finds which substrings
+occur in one pass over the input: at each position it reports the longest
+one, and the substrings contained in it follow from a precomputed
+closure. Only the rules those substrings can satisfy are then checked,
+in rule order, so the first rule that matches wins exactly like the
+if/elif chains it replaces, and the work per input grows with what the
+input contains rather than with the number of rules. Results are memoized
+per input string.
+
+A rule matches a lowercased input when it contains every substring in "all"
+and at least one substring in "any" (either list may be omitted).
+"""
+
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'classification_rules.json')
+
+# Distinct inputs remembered per ruleset
+MEMO_SIZE = 65536
+
+
+class RulesError(Exception):
+    """Raised when a rules file cannot be loaded or compiled"""
+
+
+def trie_pattern(words):
+    """
+    Regex matching any of `words`, factored by common prefix so each input
+    position costs one step per character matched rather than one attempt
+    per word; greedy, so the longest word at a position wins.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if '' in node:
+            return f"(?:{body})?" if len(branches) > 1 or len(branches[0]) > 1 else f"{body}?"
+        return body
+
+    return build(trie)
+
+
+class RuleSet:
+    """Ordered substring rules compiled into one first-match-wins matcher"""
+
+    def __init__(self, name, rules, default=None, areas=None, memo_size=MEMO_SIZE):
+        self.name = name
+        self.default = default
+        self.results = []
+        # (required substrings, any-of substrings) per rule, in rule order
+        self.rules = []
+        # substring -> indexes of the rules it can trigger (its 'any' list, or the first of 'all')
+        triggers = {}
+        for i, rule in enumerate(rules):
+            required = frozenset(s.lower() for s in rule.get('all', []))
+            needles = frozenset(s.lower() for s in rule.get('any', []))
+            if not needles and not required:
+                raise RulesError(f"{name}: rule {i} has neither 'all' nor 'any'")
+            self.results.append(rule['result'])
+            self.rules.append((required, needles))
+            for needle in needles or [min(required)]:
+                triggers.setdefault(needle, []).append(i)
+        substrings = {s for required, needles in self.rules for s in required | needles}
+        # Each substring stands for every substring contained in it
+        self.implies = {s: frozenset(t for t in substrings if t in s) for s in substrings}
+        self.triggers = {s: sorted({i for t in self.implies[s] for i in triggers.get(t, ())}) for s in substrings}
+        self.pattern = re.compile(f"(?=({trie_pattern(substrings)}))", re.DOTALL) if substrings else None
+        # Declared outputs first (e.g. every progress area, even ones no rule produces yet)
+        self.areas = list(dict.fromkeys(list(areas or []) + self.results))
+        self.classify = lru_cache(maxsize=memo_size)(self._classify)
+
+    def _classify(self, text):
+        """Result of the first rule matching `text`, or the default"""
+        if self.pattern is None:
+            return self.default
+        found = set(self.pattern.findall(text.lower()))
+        if not found:
+            return self.default
+        if len(found) == 1:
+            substring, = found
+            present, candidates = self.implies[substring], self.triggers[substring]
+        else:
+            present = frozenset().union(*[self.implies[s] for s in found])
+            candidates = sorted(set().union(*[self.triggers[s] for s in found]))
+        for i in candidates:
+            required, needles = self.rules[i]
+            if required <= present and (not needles or not needles.isdisjoint(present)):
+                return self.results[i]
+        return self.default
+
+
+def load_rules(path=DEFAULT_RULES_FILE):
+    """{ruleset name: RuleSet} from a rules file, plus a content signature"""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        spec = json.loads(raw)
+        rulesets = {
+            name: RuleSet(name, rs.get('rules', []), rs.get('default'), rs.get('areas'))
+            for name, rs in spec['rulesets'].items()
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise RulesError(f"{path}: {e}")
+    return rulesets, hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+_loaded = {}
+
+
+def get_ruleset(name, path=DEFAULT_RULES_FILE):
+    """Named ruleset from `path`, compiled once per process"""
+    if path not in _loaded:
+        _loaded[path] = load_rules(path)
+    return _loaded[path][0][name]
+
+
+def rules_signature(path=DEFAULT_RULES_FILE):
+    """Content hash of the rules file, for invalidating cached classifications"""
+    if path not in _loaded:
+        _loaded[path] = load_rules(path)
+    return _loaded[path][1]
@@ -1,15 +1,8 @@
 #!/usr/bin/env python3
-import http.server
-import socketserver
 import socket
 import os
 
-class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        super().end_headers()
+from dashboard_server import progress_feed, serve
 
 def get_ip_address():
     """Get local IP address"""
@@ -28,29 +21,22 @@ def main():
     PORT = 8087
     DIRECTORY = os.path.dirname(os.path.abspath(__file__))
     
-    # Change to directory
-    os.chdir(DIRECTORY)
-    
-    # Create handler
-    handler = MyHTTPRequestHandler
+    def on_start(port):
+        local_ip = get_ip_address()
+        print(f"Serving on:")
+        print(f"  Local: http://localhost:{port}/")
+        print(f"  Network: http://{local_ip}:{port}/")
+        print(f"  All interfaces: http://0.0.0.0:{port}/")
+        print(f"Directory: {DIRECTORY}")
+        print("Press Ctrl+C to stop")
     
     # Try to bind to all interfaces
     for bind_address in ['0.0.0.0', '']:
         try:
-            with socketserver.TCPServer((bind_address, PORT), handler) as httpd:
-                local_ip = get_ip_address()
-                print(f"Serving on:")
-                print(f"  Local: http://localhost:{PORT}/")
-                print(f"  Network: http://{local_ip}:{PORT}/")
-                print(f"  All interfaces: http://0.0.0.0:{PORT}/")
-                print(f"Directory: {DIRECTORY}")
-                print("Press Ctrl+C to stop")
-                
-                httpd.serve_forever()
-                break
-        except OSError as e:
-            print(f"Failed to bind to {bind_address}:{PORT} - {e}")
+            serve([PORT], DIRECTORY, bind=bind_address, on_start=on_start, on_worker_start=progress_feed())
+            break
+        except OSError:
             continue
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Streaming Session Transcript Reader
+Tails OpenClaw *.jsonl session transcripts line by line and keeps a byte-offset
+checkpoint per file, so each run only parses records appended since the last one.
+"""
+
+import json
+import os
+
+CHECKPOINT_VERSION = 1
+
+# Bytes at the start of a file used to notice it was replaced in place
+HEAD_BYTES = 64
+
+
+def new_stats():
+    return {
+        "records": 0,
+        "bad_records": 0,
+        "turns": 0,
+        "assistant_messages": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "total_tokens": 0,
+        "first_timestamp": None,
+        "last_timestamp": None,
+        "model": None
+    }
+
+
+def _first_int(mapping, *keys):
+    for key in keys:
+        value = mapping.get(key)
+        if isinstance(value, (int, float)):
+            return int(value)
+    return 0
+
+
+def apply_record(stats, record):
+    """Fold one transcript record into the running stats"""
+    stats["records"] += 1
+    if not isinstance(record, dict):
+        return
+
+    message = record.get("message") if isinstance(record.get("message"), dict) else record
+    role = message.get("role") or record.get("role")
+    if role == "user":
+        stats["turns"] += 1
+    elif role == "assistant":
+        stats["assistant_messages"] += 1
+
+    model = message.get("model") or record.get("model")
+    if model:
+        stats["model"] = model
+
+    usage = message.get("usage") or record.get("usage")
+    if isinstance(usage, dict):
+        input_tokens = _first_int(usage, "input_tokens", "input", "prompt_tokens")
+        output_tokens = _first_int(usage, "output_tokens", "output", "completion_tokens")
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += output_tokens
+        stats["total_tokens"] += (_first_int(usage, "totalTokens", "total_tokens")
+                                  or input_tokens + output_tokens)
+
+    timestamp = record.get("timestamp") or message.get("timestamp")
+    if timestamp is not None:
+        if stats["first_timestamp"] is None:
+            stats["first_timestamp"] = timestamp
+        stats["last_timestamp"] = timestamp
+
+
+class SessionReader:
+    """Incremental reader over a directory of JSONL session transcripts"""
+
+    def __init__(self, session_dir, checkpoint_path=None):
+        self.session_dir = str(session_dir)
+        self.checkpoint_path = str(checkpoint_path) if checkpoint_path else None
+        self.checkpoints = {}
+        self.dirty = False
+        self._load_checkpoints()
+
+    def _load_checkpoints(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable session checkpoints: {e}")
+            return
+        if saved.get("version") == CHECKPOINT_VERSION:
+            self.checkpoints = saved.get("files", {})
+
+    def save_checkpoints(self):
+        """Persist offsets and stats (temp file + rename) if anything moved"""
+        if not self.checkpoint_path or not self.dirty:
+            return False
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": CHECKPOINT_VERSION, "files": self.checkpoints}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.checkpoint_path)
+        self.dirty = False
+        return True
+
+    def read_session(self, name):
+        """
+        Bring one transcript's stats up to date and return them.
+
+        Only complete lines past the checkpoint are parsed; a trailing partial
+        line is left for the next call. A new inode, a shrinking file or a
+        changed head means the file was rotated/truncated and is re-read.
+        """
+        path = os.path.join(self.session_dir, name)
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return None
+
+        with f:
+            st = os.fstat(f.fileno())
+            head = f.read(HEAD_BYTES).hex()
+            checkpoint = self.checkpoints.get(name)
+
+            if (checkpoint is None
+                    or checkpoint["inode"] != st.st_ino
+                    or checkpoint["offset"] > st.st_size
+                    or not head.startswith(checkpoint["head"])):
+                checkpoint = {"inode": st.st_ino, "offset": 0, "head": "", "stats": new_stats()}
+                self.checkpoints[name] = checkpoint
+                self.dirty = True
+
+            if checkpoint["offset"] == st.st_size:
+                return checkpoint["stats"]
+
+            stats = checkpoint["stats"]
+            offset = checkpoint["offset"]
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    apply_record(stats, json.loads(line))
+                except ValueError:
+                    stats["bad_records"] += 1
+
+            if offset != checkpoint["offset"]:
+                checkpoint["offset"] = offset
+                checkpoint["head"] = head[:min(offset, HEAD_BYTES) * 2]
+                self.dirty = True
+            return stats
+
+    def read_all(self, names=None):
+        """Update every *.jsonl transcript (or just `names`) and drop stale checkpoints"""
+        prune = names is None
+        if prune:
+            try:
+                names = [n for n in os.listdir(self.session_dir) if n.endswith('.jsonl')]
+            except OSError:
+                names = []
+        results = {}
+        for name in names:
+            stats = self.read_session(name)
+            if stats is not None:
+                results[name] = stats
+        for name in list(self.checkpoints):
+            if prune and name not in results:
+                del self.checkpoints[name]
+                self.dirty = True
+        return results
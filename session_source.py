@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Session Sources
+Pluggable ways of getting the OpenClaw session list: straight from
+sessions.json, from the `openclaw sessions --json` CLI, and a TTL cache with
+stale-while-revalidate semantics so a slow CLI never blocks the caller.
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+
+DEFAULT_SESSIONS_FILE = '/home/jim/.openclaw/agents/main/sessions/sessions.json'
+DEFAULT_CLI_COMMAND = ['openclaw', 'sessions', '--json']
+
+
+class SessionSourceError(Exception):
+    """Raised when a source cannot produce a session list"""
+
+
+def session_list(raw):
+    """Coerce the shapes OpenClaw emits into a list of session dicts"""
+    if isinstance(raw, list):
+        return raw
+    if isinstance(raw, dict):
+        if isinstance(raw.get('sessions'), list):
+            return raw['sessions']
+        sessions = []
+        for key, session in raw.items():
+            if isinstance(session, dict):
+                sessions.append(dict(session, key=session.get('key', key)))
+        return sessions
+    raise SessionSourceError(f"unexpected sessions payload: {type(raw).__name__}")
+
+
+def format_age(updated_at_ms, now=None):
+    """Epoch milliseconds -> the CLI's age text ('just now', '5 minutes ago', '10 hours ago')"""
+    minutes = int(max(0.0, (time.time() if now is None else now) - updated_at_ms / 1000) // 60)
+    if minutes < 1:
+        return 'just now'
+    if minutes < 60:
+        return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
+    hours = minutes // 60
+    return f"{hours} hour{'s' if hours != 1 else ''} ago"
+
+
+def format_tokens(count):
+    """150000 -> '150k', the unit the CLI's used/total column uses"""
+    return f"{round(count / 1000)}k" if count >= 1000 else str(count)
+
+
+def cli_fields(session, now=None):
+    """
+    The session with the CLI's `age` and `tokens` columns filled in from
+    sessions.json's updatedAt / totalTokens / contextTokens, so both sources
+    look the same to the tracker. Sessions that already carry them are
+    returned unchanged.
+    """
+    fields = {}
+    if 'age' not in session and isinstance(session.get('updatedAt'), (int, float)):
+        fields['age'] = format_age(session['updatedAt'], now)
+    if ('tokens' not in session and isinstance(session.get('totalTokens'), int)
+            and isinstance(session.get('contextTokens'), int) and session['contextTokens'] > 0):
+        fields['tokens'] = f"{format_tokens(session['totalTokens'])}/{format_tokens(session['contextTokens'])}"
+    return dict(session, **fields) if fields else session
+
+
+def normalize_sessions(raw, now=None):
+    """session_list() in the CLI's schema (see cli_fields)"""
+    now = time.time() if now is None else now
+    return [cli_fields(session, now) if isinstance(session, dict) else session for session in session_list(raw)]
+
+
+class SessionSource:
+    """Base class: fetch() returns a list of session dicts or raises SessionSourceError"""
+
+    name = 'base'
+
+    def fetch(self):
+        raise NotImplementedError
+
+    def fetch_or_empty(self):
+        try:
+            return self.fetch()
+        except SessionSourceError as e:
+            print(f"Error getting sessions: {e}")
+            return []
+
+
+class FileSessionSource(SessionSource):
+    """Reads sessions.json directly; re-parses only when its mtime/size change (ages are recomputed per fetch)"""
+
+    name = 'file'
+
+    def __init__(self, path=DEFAULT_SESSIONS_FILE):
+        self.path = path
+        self._signature = None
+        self._sessions = None
+
+    def fetch(self):
+        try:
+            st = os.stat(self.path)
+        except OSError as e:
+            raise SessionSourceError(f"{self.path}: {e}")
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature != self._signature:
+            try:
+                with open(self.path, 'r') as f:
+                    self._sessions = session_list(json.load(f))
+            except (OSError, ValueError) as e:
+                raise SessionSourceError(f"{self.path}: {e}")
+            self._signature = signature
+        return normalize_sessions(self._sessions)
+
+
+class CliSessionSource(SessionSource):
+    """Runs `openclaw sessions --json` (one fork per fetch)"""
+
+    name = 'cli'
+
+    def __init__(self, command=None, timeout=5):
+        self.command = command or DEFAULT_CLI_COMMAND
+        self.timeout = timeout
+
+    def fetch(self):
+        try:
+            result = subprocess.run(self.command, capture_output=True, text=True, timeout=self.timeout)
+        except (OSError, subprocess.SubprocessError) as e:
+            raise SessionSourceError(f"{' '.join(self.command)}: {e}")
+        if result.returncode != 0:
+            raise SessionSourceError(f"{' '.join(self.command)} exited with {result.returncode}")
+        try:
+            return normalize_sessions(json.loads(result.stdout))
+        except ValueError as e:
+            raise SessionSourceError(f"{' '.join(self.command)}: bad JSON ({e})")
+
+
+class CachedSessionSource(SessionSource):
+    """
+    TTL cache with stale-while-revalidate around another source.
+
+    Within `ttl` the cached list is returned as-is. Up to `ttl + stale_ttl` the
+    stale list is returned immediately while one background thread refreshes
+    it. Past that (or with nothing cached) the fetch is synchronous, unless
+    `blocking=False`, in which case a background refresh is started and
+    SessionSourceError is raised so a fallback source can answer instead.
+    """
+
+    def __init__(self, source, ttl=5.0, stale_ttl=60.0, blocking=True):
+        self.source = source
+        self.name = f"cached:{source.name}"
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.blocking = blocking
+        self._lock = threading.Lock()
+        self._sessions = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+        self._last_error = None
+
+    def _refresh(self):
+        try:
+            sessions = self.source.fetch()
+        except SessionSourceError as e:
+            with self._lock:
+                self._last_error = e
+                self._refreshing = False
+            return
+        with self._lock:
+            self._sessions = sessions
+            self._fetched_at = time.monotonic()
+            self._last_error = None
+            self._refreshing = False
+
+    def _start_refresh(self):
+        # Caller holds self._lock
+        if not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._refresh, name=f"refresh-{self.source.name}", daemon=True).start()
+
+    def fetch(self):
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+            if self._sessions is not None and age < self.ttl:
+                return self._sessions
+            if self._sessions is not None and age < self.ttl + self.stale_ttl:
+                self._start_refresh()
+                return self._sessions
+            if not self.blocking:
+                self._start_refresh()
+                raise SessionSourceError(f"{self.source.name}: no fresh data yet"
+                                         + (f" (last error: {self._last_error})" if self._last_error else ""))
+
+        sessions = self.source.fetch()
+        with self._lock:
+            self._sessions = sessions
+            self._fetched_at = time.monotonic()
+        return sessions
+
+
+class FallbackSessionSource(SessionSource):
+    """Tries each source in order and returns the first successful result"""
+
+    name = 'fallback'
+
+    def __init__(self, sources):
+        self.sources = list(sources)
+
+    def fetch(self):
+        errors = []
+        for source in self.sources:
+            try:
+                return source.fetch()
+            except SessionSourceError as e:
+                errors.append(str(e))
+        raise SessionSourceError("; ".join(errors) or "no session sources configured")
+
+
+class BackgroundSessionSource(SessionSource):
+    """Long-lived worker that refreshes another source every `interval` seconds"""
+
+    def __init__(self, source, interval=10.0):
+        self.source = source
+        self.name = f"background:{source.name}"
+        self.interval = interval
+        self._sessions = None
+        self._last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._sessions = self.source.fetch()
+                self._last_error = None
+            except SessionSourceError as e:
+                self._last_error = e
+            self._stop.wait(self.interval)
+
+    def fetch(self):
+        sessions = self._sessions
+        if sessions is None:
+            raise SessionSourceError(f"{self.name}: no data yet"
+                                     + (f" (last error: {self._last_error})" if self._last_error else ""))
+        return sessions
+
+    def stop(self):
+        self._stop.set()
+
+
+def default_session_source(sessions_file=DEFAULT_SESSIONS_FILE, cli_command=None, cli_ttl=10.0, cli_stale_ttl=300.0,
+                           cli_blocking=False):
+    """
+    sessions.json first; the CLI only as a cached fallback. Long-running
+    callers keep cli_blocking=False so a slow CLI never holds them up; a
+    one-shot run has no later call to benefit from, so it may block once.
+    """
+    return FallbackSessionSource([
+        FileSessionSource(sessions_file),
+        CachedSessionSource(CliSessionSource(cli_command), ttl=cli_ttl, stale_ttl=cli_stale_ttl,
+                            blocking=cli_blocking),
+    ])
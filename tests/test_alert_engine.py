@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+
+from alert_engine import DEFAULT_COOLDOWN, RESOLVED_RETENTION, AlertEngine, check_for_alerts
+
+
+def agent(active_hours=0.5, progress=50, quality_score=90, name='Dev', session_key='agent:dev:subagent:dev-1'):
+    return {'id': 'dev', 'name': name, 'session_key': session_key, 'progress': progress,
+            'active_hours': active_hours, 'quality_score': quality_score}
+
+
+class AlertEngineTest(unittest.TestCase):
+    def test_opens_once_and_resolves_with_hysteresis(self):
+        engine = AlertEngine()
+        alerts = engine.evaluate([agent(active_hours=2.5)], now=1000)
+        self.assertEqual([alert['type'] for alert in alerts], ['stuck'])
+        self.assertEqual(alerts[0]['status'], 'open')
+        # Between the clear and fire thresholds: stays open, not re-raised
+        alerts = engine.evaluate([agent(active_hours=1.8)], now=1100)
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0]['message'], 'Dev has been working for 1.8 hours - may need assistance')
+        self.assertEqual(engine.evaluate([agent(active_hours=1.5)], now=1200), [])
+        self.assertEqual(engine.counts(), {'open': 0, 'acknowledged': 0, 'resolved': 1})
+
+    def test_cooldown_holds_back_reopen_until_it_ends(self):
+        engine = AlertEngine()
+        engine.evaluate([agent(quality_score=60)], now=1000)
+        engine.evaluate([agent(quality_score=80)], now=1100)
+        self.assertEqual(engine.evaluate([agent(quality_score=60)], now=1200), [])
+        # Same inputs once the cooldown has passed
+        alerts = engine.evaluate([agent(quality_score=60)], now=1100 + DEFAULT_COOLDOWN + 1)
+        self.assertEqual([alert['type'] for alert in alerts], ['quality_issue'])
+
+    def test_acknowledge(self):
+        engine = AlertEngine()
+        alert_id = engine.evaluate([agent(quality_score=60)], now=1000)[0]['id']
+        self.assertTrue(engine.acknowledge(alert_id, now=1010))
+        self.assertFalse(engine.acknowledge(alert_id, now=1020))
+        self.assertFalse(engine.acknowledge('missing:alert'))
+        self.assertEqual(engine.evaluate([agent(quality_score=61)], now=1030)[0]['status'], 'acknowledged')
+
+    def test_ended_sessions_resolve(self):
+        engine = AlertEngine()
+        engine.evaluate([agent(quality_score=60)], now=1000)
+        self.assertEqual(engine.evaluate([], now=1100), [])
+        self.assertEqual(engine.counts()['resolved'], 1)
+
+    def test_idle_registry_agents_ignored(self):
+        engine = AlertEngine()
+        self.assertEqual(engine.evaluate([agent(quality_score=0, session_key='None')], now=1000), [])
+
+    def test_state_round_trip_and_retention(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'state', 'alert_state.json')
+            engine = AlertEngine(state_path=path)
+            engine.evaluate([agent(quality_score=60), agent(active_hours=3, session_key='agent:dev:subagent:dev-2')],
+                            now=1000)
+            engine.evaluate([agent(quality_score=60)], now=1100)
+            self.assertTrue(engine.save(now=1100))
+            self.assertFalse(engine.save(now=1100))
+
+            restored = AlertEngine(state_path=path)
+            self.assertEqual([alert['type'] for alert in restored.active_alerts()], ['quality_issue'])
+            self.assertEqual(restored.counts(), engine.counts())
+
+            restored.save(now=1100 + RESOLVED_RETENTION + 1)
+            with open(path) as f:
+                self.assertEqual(len(json.load(f)['alerts']), 1)
+
+
+class CheckForAlertsTest(unittest.TestCase):
+    def test_every_firing_rule(self):
+        alerts = check_for_alerts([agent(active_hours=3, progress=10, quality_score=50),
+                                   agent(session_key='None', quality_score=0)])
+        self.assertEqual([alert['type'] for alert in alerts], ['stuck', 'slow_progress', 'quality_issue'])
+
+
+if __name__ == '__main__':
+    unittest.main()
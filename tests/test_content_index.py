@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+import content_index
+from content_index import HASH_BLOCK, ContentIndex
+
+
+class ContentIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.index_path = os.path.join(self.root, '.cache', 'content_index.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, payload, mtime):
+        path = os.path.join(self.root, name)
+        with open(path, 'wb') as f:
+            f.write(payload)
+        os.utime(path, (mtime, mtime))
+        st = os.stat(path)
+        return (st.st_mtime, st.st_size, None)
+
+    def test_touch_and_identical_rewrite_are_not_changes(self):
+        index = ContentIndex(self.root)
+        self.assertTrue(index.update('a.txt', self.write('a.txt', b'one', 1000)))
+        self.assertEqual(index.changed_at('a.txt'), 1000)
+        self.assertFalse(index.update('a.txt', self.write('a.txt', b'one', 2000)))
+        self.assertEqual(index.changed_at('a.txt'), 1000)
+        self.assertTrue(index.update('a.txt', self.write('a.txt', b'two', 3000)))
+        self.assertEqual(index.changed_at('a.txt'), 3000)
+
+    def test_unchanged_stat_is_not_rehashed(self):
+        index = ContentIndex(self.root)
+        entry = self.write('a.txt', b'one', 1000)
+        index.update('a.txt', entry)
+        os.unlink(os.path.join(self.root, 'a.txt'))
+        # Same stat tuple: the file is not opened again
+        self.assertFalse(index.update('a.txt', entry))
+
+    def test_large_file_middle_edit_needs_full_hash(self):
+        payload = bytearray(b'a' * (3 * HASH_BLOCK))
+        index = ContentIndex(self.root)
+        index.update('big.bin', self.write('big.bin', bytes(payload), 1000))
+        payload[HASH_BLOCK + 10] = ord('b')
+        # Head and tail unchanged and no full hash taken: counted as unchanged
+        self.assertFalse(index.update('big.bin', self.write('big.bin', bytes(payload), 2000)))
+        index.full_hash('big.bin')
+        payload[HASH_BLOCK + 20] = ord('c')
+        self.assertTrue(index.update('big.bin', self.write('big.bin', bytes(payload), 3000)))
+        self.assertEqual(index.changed_at('big.bin'), 3000)
+
+    def test_full_hash_matches_module_function(self):
+        index = ContentIndex(self.root)
+        index.update('a.txt', self.write('a.txt', b'one', 1000))
+        self.assertEqual(index.full_hash('a.txt'), content_index.full_hash(os.path.join(self.root, 'a.txt')))
+        self.assertIsNone(index.full_hash('missing.txt'))
+
+    def test_sync_windows_and_checkpoints(self):
+        index = ContentIndex(self.root, self.index_path)
+        entries = {'a.txt': self.write('a.txt', b'a', 1000), 'b.txt': self.write('b.txt', b'b', 2000)}
+        self.assertEqual(index.sync(entries), {'a.txt', 'b.txt'})
+        index.checkpoint('deploy', when=1500)
+        del entries['a.txt']
+        self.assertEqual(index.sync(entries), {'a.txt'})
+        modified, removed = index.changes_since('deploy')
+        self.assertEqual(modified, {'b.txt': 2000})
+        self.assertEqual(list(removed), ['a.txt'])
+        with self.assertRaises(KeyError):
+            index.changes_since('missing')
+
+        self.assertTrue(index.save())
+        restored = ContentIndex(self.root, self.index_path)
+        self.assertEqual(restored.files, index.files)
+        self.assertEqual(restored.changes_since('deploy'), index.changes_since('deploy'))
+        # A different root does not reuse the index
+        self.assertEqual(ContentIndex(os.path.join(self.root, 'other'), self.index_path).files, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import http.client
+import os
+import tempfile
+import threading
+import unittest
+
+from dashboard_server import etag_matches, make_server
+from progress_events import ProgressCache
+
+
+class EtagMatchesTest(unittest.TestCase):
+    def test_weak_comparison(self):
+        self.assertTrue(etag_matches('"abc"', '"abc"'))
+        self.assertTrue(etag_matches('W/"abc"', '"abc"'))
+        self.assertTrue(etag_matches('"abc"', 'W/"abc"'))
+        self.assertTrue(etag_matches('"x", W/"abc"', 'W/"abc"'))
+        self.assertTrue(etag_matches('*', '"abc"'))
+        self.assertFalse(etag_matches('"abd"', '"abc"'))
+        self.assertFalse(etag_matches(None, '"abc"'))
+
+
+class ProgressEndpointTest(unittest.TestCase):
+    def setUp(self):
+        self.tick = 0
+
+        def producer():
+            self.tick += 1
+            return {'agents': [{'id': 'dev', 'session_key': 'k', 'progress': 50, 'quality_score': 70 + self.tick}],
+                    'last_updated': str(self.tick)}
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.httpd = make_server(0, self.directory.name, bind='127.0.0.1')
+        self.httpd.progress_cache = ProgressCache(producer, ttl=0)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.directory.cleanup()
+
+    def get(self, headers=None):
+        conn = http.client.HTTPConnection('127.0.0.1', self.httpd.server_address[1], timeout=5)
+        conn.request('GET', '/api/progress', headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    def test_weak_etag_across_simulated_noise(self):
+        first, first_body = self.get()
+        self.assertEqual(first.status, 200)
+        etag = first.getheader('ETag')
+        self.assertTrue(etag.startswith('W/"'), etag)
+        second, second_body = self.get()
+        # Same ETag for bodies differing only in simulated fields, hence weak
+        self.assertEqual(second.getheader('ETag'), etag)
+        self.assertNotEqual(first_body, second_body)
+        revalidated, body = self.get({'If-None-Match': etag})
+        self.assertEqual(revalidated.status, 304)
+        self.assertEqual(revalidated.getheader('ETag'), etag)
+        self.assertEqual(body, b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
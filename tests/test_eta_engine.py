@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from eta_engine import STALE_AFTER, EtaEngine, format_duration, parse_start_time
+
+
+class ParseStartTimeTest(unittest.TestCase):
+    def test_formats(self):
+        self.assertEqual(parse_start_time('1970-01-01T00:01:40Z'), 100.0)
+        self.assertEqual(parse_start_time('1970-01-01T00:01:40'), 100.0)
+        self.assertEqual(parse_start_time('1970-01-01T01:01:40+01:00'), 100.0)
+        self.assertEqual(parse_start_time(100), 100.0)
+        self.assertEqual(parse_start_time(1_700_000_000_000), 1_700_000_000.0)
+        self.assertEqual(parse_start_time('100'), 100.0)
+        self.assertIsNone(parse_start_time(''))
+        self.assertIsNone(parse_start_time('yesterday'))
+        self.assertIsNone(parse_start_time([]))
+
+
+class FormatDurationTest(unittest.TestCase):
+    def test_buckets(self):
+        self.assertEqual(format_duration(None), 'N/A')
+        self.assertEqual(format_duration(30), '<1 min')
+        self.assertEqual(format_duration(600), '~10 min')
+        self.assertEqual(format_duration(3600), '~1 hour')
+        self.assertEqual(format_duration(3 * 3600), '~3 hours')
+        self.assertEqual(format_duration(36 * 3600), '~1.5 days')
+
+
+class EtaEngineTest(unittest.TestCase):
+    def test_no_estimate_without_velocity(self):
+        engine = EtaEngine()
+        self.assertIsNone(engine.update('s', 10, now=1000)['eta_seconds'])
+
+    def test_seeded_from_start_time(self):
+        estimate = EtaEngine().update('s', 50, now=1000, started_at=0)
+        # 50% in 1000 s: 1000 s to go, no variance yet
+        self.assertEqual(estimate, {'eta_seconds': 1000, 'eta_low_seconds': 1000, 'eta_high_seconds': 1000})
+
+    def test_constant_rate(self):
+        engine = EtaEngine()
+        engine.update('s', 10, now=0)
+        for step in range(1, 5):
+            estimate = engine.update('s', 10 + step * 10, now=step * 100)
+        # 0.1 %/s with 50% left
+        self.assertEqual(estimate['eta_seconds'], 500)
+        self.assertEqual(estimate['eta_low_seconds'], 500)
+
+    def test_variance_widens_bounds(self):
+        engine = EtaEngine(half_life=100)
+        engine.update('s', 0, now=0)
+        for now, progress in ((100, 20), (200, 22), (300, 40), (400, 42)):
+            estimate = engine.update('s', progress, now=now)
+        self.assertLess(estimate['eta_low_seconds'], estimate['eta_seconds'])
+        if estimate['eta_high_seconds'] is not None:
+            self.assertGreater(estimate['eta_high_seconds'], estimate['eta_seconds'])
+
+    def test_regression_does_not_go_negative(self):
+        engine = EtaEngine()
+        engine.update('s', 50, now=0, started_at=-500)
+        estimate = engine.update('s', 40, now=100)
+        self.assertGreater(estimate['eta_seconds'], 0)
+
+    def test_state_round_trip_drops_stale(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache', 'eta_state.json')
+            engine = EtaEngine(state_path=path)
+            engine.update('old', 10, now=0, started_at=-100)
+            engine.update('new', 10, now=STALE_AFTER, started_at=STALE_AFTER - 100)
+            engine.save(now=STALE_AFTER + 1)
+            restored = EtaEngine(state_path=path)
+            self.assertEqual(set(restored.state), {'new'})
+            self.assertEqual(restored.estimate('new', 10), engine.estimate('new', 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
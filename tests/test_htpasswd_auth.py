@@ -0,0 +1,149 @@
+import base64
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import htpasswd_auth
+from htpasswd_auth import (BasicAuth, FailureThrottle, HtpasswdFile, VerifiedCache, dummy_hash_like,
+                           hash_password, verify_password)
+
+# Cheap parameters keep the KDFs fast under test
+SCRYPT = {'ln': 4, 'r': 8, 'p': 1}
+PBKDF2 = {'rounds': 1000}
+
+
+def basic(user, password):
+    return 'Basic ' + base64.b64encode(f"{user}:{password}".encode('utf-8')).decode('ascii')
+
+
+class HashTest(unittest.TestCase):
+    def test_scrypt_round_trip(self):
+        hashed = hash_password('s3cret', 'scrypt', **SCRYPT)
+        self.assertTrue(hashed.startswith('$scrypt$ln=4,r=8,p=1$'))
+        self.assertTrue(verify_password('s3cret', hashed))
+        self.assertFalse(verify_password('wrong', hashed))
+
+    def test_pbkdf2_round_trip(self):
+        hashed = hash_password('s3cret', 'pbkdf2-sha256', **PBKDF2)
+        self.assertTrue(hashed.startswith('$pbkdf2-sha256$1000$'))
+        self.assertTrue(verify_password('s3cret', hashed))
+        self.assertFalse(verify_password('wrong', hashed))
+
+    def test_sha_formats(self):
+        salted = '{SHA}ab12$' + hashlib.sha1(b's3cretab12').hexdigest()
+        apache = '{SHA}' + base64.b64encode(hashlib.sha1(b's3cret').digest()).decode('ascii')
+        for hashed in (salted, apache):
+            self.assertTrue(verify_password('s3cret', hashed))
+            self.assertFalse(verify_password('wrong', hashed))
+
+    def test_malformed_and_unknown(self):
+        self.assertFalse(verify_password('x', '$scrypt$garbage'))
+        self.assertFalse(verify_password('x', '$apr1$abc$def'))
+        with self.assertRaises(ValueError):
+            hash_password('x', 'md5')
+
+    def test_dummy_hash_matches_scheme_and_cost(self):
+        self.assertTrue(dummy_hash_like(hash_password('x', 'scrypt', **SCRYPT)).startswith('$scrypt$ln=4,r=8,p=1$'))
+        self.assertTrue(dummy_hash_like(hash_password('x', 'pbkdf2-sha256', **PBKDF2)).startswith(
+            '$pbkdf2-sha256$1000$'))
+        self.assertTrue(dummy_hash_like('{SHA}abc').startswith('{SHA}'))
+
+
+class HtpasswdTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, '.htpasswd')
+        self.write({'alice': hash_password('wonderland', 'scrypt', **SCRYPT)})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, users, extra=''):
+        with open(self.path, 'w') as f:
+            f.write(extra + ''.join(f"{user}:{hashed}\n" for user, hashed in users.items()))
+        # Make sure the change is visible even within one mtime tick
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class HtpasswdFileTest(HtpasswdTestCase):
+    def test_reload_on_change(self):
+        htpasswd = HtpasswdFile(self.path)
+        self.assertIsNotNone(htpasswd.lookup('alice'))
+        self.assertIsNone(htpasswd.lookup('bob'))
+        self.write({'bob': hash_password('builder', 'pbkdf2-sha256', **PBKDF2)},
+                   extra='# comment\ncarol:$apr1$unsupported\n')
+        self.assertIsNone(htpasswd.lookup('alice'))
+        self.assertIsNotNone(htpasswd.lookup('bob'))
+        self.assertIsNone(htpasswd.lookup('carol'))
+
+    def test_missing_file_denies_all(self):
+        htpasswd = HtpasswdFile(self.path)
+        os.unlink(self.path)
+        self.assertIsNone(htpasswd.lookup('alice'))
+
+
+class BasicAuthTest(HtpasswdTestCase):
+    def test_valid_and_invalid_credentials(self):
+        auth = BasicAuth(self.path)
+        self.assertEqual(auth.check(basic('alice', 'wonderland'), '10.0.0.1'), ('alice', 0))
+        self.assertEqual(auth.check(basic('alice', 'nope'), '10.0.0.1'), (None, 0))
+        self.assertEqual(auth.check(None, '10.0.0.1'), (None, 0))
+        self.assertEqual(auth.check('Basic !!!', '10.0.0.1'), (None, 0))
+
+    def test_verified_credentials_are_cached(self):
+        auth = BasicAuth(self.path)
+        auth.check(basic('alice', 'wonderland'), '10.0.0.1')
+        with mock.patch.object(htpasswd_auth, 'verify_password') as verify:
+            self.assertEqual(auth.check(basic('alice', 'wonderland'), '10.0.0.1'), ('alice', 0))
+        verify.assert_not_called()
+
+    def test_unknown_user_runs_the_same_kdf(self):
+        auth = BasicAuth(self.path)
+        with mock.patch.object(htpasswd_auth, 'verify_password', return_value=False) as verify:
+            self.assertEqual(auth.check(basic('mallory', 'guess'), '10.0.0.1'), (None, 0))
+        verify.assert_called_once()
+        password, hashed = verify.call_args.args
+        self.assertEqual(password, 'guess')
+        self.assertTrue(hashed.startswith('$scrypt$ln=4,r=8,p=1$'))
+
+    def test_failures_are_throttled(self):
+        auth = BasicAuth(self.path)
+        for _ in range(htpasswd_auth.FAILURE_BURST):
+            self.assertEqual(auth.check(basic('alice', 'nope'), '10.0.0.2'), (None, 0))
+        user, retry_after = auth.check(basic('alice', 'wonderland'), '10.0.0.2')
+        self.assertIsNone(user)
+        self.assertGreater(retry_after, 0)
+        # Other clients are unaffected
+        self.assertEqual(auth.check(basic('alice', 'wonderland'), '10.0.0.3'), ('alice', 0))
+
+
+class ThrottleAndCacheTest(unittest.TestCase):
+    def test_throttle_bounded_and_reset_on_success(self):
+        throttle = FailureThrottle(burst=1, window=100, max_clients=2)
+        throttle.failure('a')
+        self.assertGreater(throttle.retry_after('a'), 0)
+        throttle.success('a')
+        self.assertEqual(throttle.retry_after('a'), 0)
+        for client in ('b', 'c', 'd'):
+            throttle.failure(client)
+        self.assertEqual(throttle.retry_after('b'), 0)
+
+    def test_cache_expiry_and_bound(self):
+        cache = VerifiedCache(ttl=-1)
+        digest = cache.digest('u', 'p', 'h')
+        cache.add(digest)
+        self.assertNotIn(digest, cache)
+        cache = VerifiedCache(max_entries=1)
+        first, second = cache.digest('u', 'p', 'h1'), cache.digest('u', 'p', 'h2')
+        self.assertNotEqual(first, second)
+        cache.add(first)
+        cache.add(second)
+        self.assertNotIn(first, cache)
+        self.assertIn(second, cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+from htpasswd_auth import HtpasswdFile, verify_password
+
+_spec = importlib.util.spec_from_file_location(
+    'htpasswd_generator', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                       'htpasswd-generator.py'))
+generator = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(generator)
+
+
+class MergeHtpasswdTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, '.htpasswd')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def entry(self, username, password):
+        return generator.create_htpasswd_entry(username, password, 'pbkdf2-sha256', 1000)
+
+    def test_duplicate_entries_are_all_replaced(self):
+        with open(self.path, 'w') as f:
+            f.write("# users\n"
+                    + self.entry('jim', 'old-1') + "\n"
+                    + self.entry('nick', 'nick-pw') + "\n"
+                    + self.entry('jim', 'old-2') + "\n"
+                    + self.entry('gone', 'x') + "\n"
+                    + self.entry('gone', 'y') + "\n")
+        counts = generator.merge_htpasswd(self.path, {'jim': self.entry('jim', 'new'),
+                                                      'anna': self.entry('anna', 'a')}, {'gone'})
+        self.assertEqual(counts, (1, 1, 1))
+
+        with open(self.path) as f:
+            users = [generator.entry_user(line) for line in f]
+        self.assertEqual(users, [None, 'jim', 'nick', 'anna'])
+        hashed = HtpasswdFile(self.path).lookup('jim')
+        self.assertTrue(verify_password('new', hashed))
+        self.assertFalse(verify_password('old-2', hashed))
+
+    def test_new_file(self):
+        counts = generator.merge_htpasswd(self.path, {'jim': self.entry('jim', 'pw')}, set())
+        self.assertEqual(counts, (0, 1, 0))
+        self.assertTrue(verify_password('pw', HtpasswdFile(self.path).lookup('jim')))
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+
+    def test_plan_changes(self):
+        roster = [{'username': 'jim', 'password': None, 'action': 'add'},
+                  {'username': 'nick', 'password': None, 'action': 'rotate'},
+                  {'username': 'old', 'password': None, 'action': 'remove'},
+                  {'username': 'new', 'password': None, 'action': 'add'}]
+        to_hash, to_remove = generator.plan_changes(roster, {'jim', 'nick', 'old'})
+        self.assertEqual([entry['username'] for entry in to_hash], ['nick', 'new'])
+        self.assertEqual(to_remove, {'old'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from json_export import VOLATILE_AGENT_FIELDS, JsonExporter, content_hash, read_etag
+
+
+def document(tick, progress=50):
+    return {'agents': [{'id': 'dev', 'progress': progress, 'quality_score': 70 + tick, 'tests_passed': tick,
+                        'bugs_found': tick % 3, 'code_quality': 80 + tick}],
+            'last_updated': f"2026-01-01T00:00:{tick:02d}"}
+
+
+class ContentHashTest(unittest.TestCase):
+    def test_volatile_keys_ignored(self):
+        self.assertEqual(content_hash({'a': 1, 'last_updated': 'x'}), content_hash({'a': 1, 'last_updated': 'y'}))
+        self.assertNotEqual(content_hash({'a': 1}), content_hash({'a': 2}))
+
+    def test_agent_fields_ignored_on_request(self):
+        self.assertNotEqual(content_hash(document(1)), content_hash(document(2)))
+        self.assertEqual(content_hash(document(1), ignore_agent_fields=VOLATILE_AGENT_FIELDS),
+                         content_hash(document(2), ignore_agent_fields=VOLATILE_AGENT_FIELDS))
+        self.assertNotEqual(content_hash(document(1), ignore_agent_fields=VOLATILE_AGENT_FIELDS),
+                            content_hash(document(1, progress=60), ignore_agent_fields=VOLATILE_AGENT_FIELDS))
+
+
+class JsonExporterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'agent_progress_data.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_writes_only_on_change(self):
+        exporter = JsonExporter(self.path, gzip_sidecar=True, ignore_agent_fields=VOLATILE_AGENT_FIELDS)
+        self.assertTrue(exporter.export(document(1)))
+        self.assertFalse(exporter.export(document(2)))
+        self.assertTrue(exporter.export(document(3, progress=60)))
+        with open(self.path, 'rb') as f:
+            payload = f.read()
+        self.assertEqual(json.loads(payload), document(3, progress=60))
+        with open(f"{self.path}.gz", 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), payload)
+        self.assertEqual(read_etag(self.path)['version'], 2)
+
+    def test_version_survives_restart(self):
+        JsonExporter(self.path).export(document(1))
+        exporter = JsonExporter(self.path)
+        self.assertFalse(exporter.export(document(1)))
+        self.assertTrue(exporter.export(document(2)))
+        self.assertEqual(read_etag(self.path)['version'], 2)
+
+    def test_rewrites_missing_file(self):
+        exporter = JsonExporter(self.path)
+        exporter.export(document(1))
+        os.unlink(self.path)
+        self.assertTrue(exporter.export(document(1)))
+        self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import copy
+import json
+import threading
+import time
+import unittest
+
+from progress_events import (CachedProgress, ProgressBroadcaster, ProgressCache, diff_documents, keyed_document,
+                             pointer)
+
+
+def row(agent_id='dev', session_key='agent:dev:subagent:dev-1', progress=50, quality=80):
+    return {'id': agent_id, 'session_key': session_key, 'progress': progress, 'quality_score': quality}
+
+
+def document(agents, **extra):
+    return dict({'agents': agents, 'total_agents': len(agents), 'last_updated': time.time()}, **extra)
+
+
+def apply_patch(doc, ops):
+    """Minimal RFC 6902 add/remove/replace over nested dicts"""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        tokens = [t.replace('~1', '/').replace('~0', '~') for t in op['path'].split('/')[1:]]
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[token]
+        if op['op'] == 'remove':
+            del parent[tokens[-1]]
+        else:
+            parent[tokens[-1]] = op['value']
+    return doc
+
+
+def frames(raw):
+    parsed = []
+    for frame in raw:
+        fields = dict(line.split(': ', 1) for line in frame.decode('utf-8').strip().split('\n'))
+        parsed.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return parsed
+
+
+class DiffTest(unittest.TestCase):
+    def test_pointer_escaping(self):
+        self.assertEqual(pointer('agents', 'a/b~c', 'x'), '/agents/a~1b~0c/x')
+
+    def test_shared_agent_ids_keyed_by_session(self):
+        keyed = keyed_document(document([row(session_key='s1'), row(session_key='s2'), row(session_key='s3')]))
+        self.assertEqual(len(keyed['agents']), 3)
+
+    def test_patch_round_trip(self):
+        old = keyed_document(document([row(), row('qa', 'agent:qa:subagent:qa-1')], alerts=[]))
+        new = keyed_document(document([row(progress=60), row('ops', 'agent:ops:subagent:ops/1')],
+                                      alerts=[{'type': 'stuck'}]))
+        del new['last_updated']
+        del old['last_updated']
+        self.assertEqual(apply_patch(old, diff_documents(old, new)), new)
+
+    def test_simulated_fields_alone_are_not_a_change(self):
+        old = keyed_document(document([row(quality=80)]))
+        new = keyed_document(document([row(quality=95)]))
+        self.assertEqual(diff_documents(old, new), [])
+
+
+class ProgressBroadcasterTest(unittest.TestCase):
+    def test_publish_resume_and_snapshot(self):
+        broadcaster = ProgressBroadcaster(backlog=2)
+        self.assertEqual(broadcaster.events_since(None), [])
+        self.assertEqual(broadcaster.publish(document([row(progress=10)])), 1)
+        self.assertIsNone(broadcaster.publish(document([row(progress=10, quality=99)])))
+        for version, progress in ((2, 20), (3, 30), (4, 40)):
+            self.assertEqual(broadcaster.publish(document([row(progress=progress)])), version)
+
+        self.assertEqual(broadcaster.events_since(4), [])
+        patches = frames(broadcaster.events_since(2))
+        self.assertEqual([(event_id, event) for event_id, event, _ops in patches], [(3, 'patch'), (4, 'patch')])
+        # Older than the backlog: a snapshot of the current document
+        (event_id, event, snapshot), = frames(broadcaster.events_since(1))
+        self.assertEqual((event_id, event), (4, 'snapshot'))
+        self.assertEqual(snapshot['agents'][f"dev@{row()['session_key']}"]['progress'], 40)
+
+        # Patches from a snapshot reproduce the current document
+        (_id, _event, old), = frames(broadcaster.events_since(None))
+        broadcaster.publish(document([row(progress=50)]))
+        (_id, _event, ops), = frames(broadcaster.events_since(4))
+        (_id, _event, current), = frames(broadcaster.events_since(None))
+        self.assertEqual(apply_patch(old, ops), current)
+
+    def test_wait(self):
+        broadcaster = ProgressBroadcaster()
+        self.assertFalse(broadcaster.wait(None, 0.01))
+        threading.Timer(0.05, broadcaster.publish, [document([row()])]).start()
+        self.assertTrue(broadcaster.wait(None, 5))
+        broadcaster.close()
+        self.assertFalse(broadcaster.wait(1, 5))
+
+
+class ProgressCacheTest(unittest.TestCase):
+    def test_etag_ignores_volatile_fields(self):
+        first = CachedProgress(document([row(quality=80)]))
+        self.assertEqual(first.etag, CachedProgress(document([row(quality=90)])).etag)
+        self.assertNotEqual(first.etag, CachedProgress(document([row(progress=51)])).etag)
+
+    def test_single_flight(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def producer():
+            started.set()
+            release.wait(5)
+            return document([row()])
+
+        cache = ProgressCache(producer, ttl=60)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(cache.computations, 1)
+        self.assertEqual(len({id(entry) for entry in results}), 1)
+
+    def test_errors(self):
+        calls = []
+
+        def producer():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("registry unavailable")
+            return document([row()])
+
+        cache = ProgressCache(producer, ttl=0.05)
+        with self.assertRaises(RuntimeError):
+            cache.get()
+        # Not retried within the TTL
+        with self.assertRaises(RuntimeError):
+            cache.get()
+        self.assertEqual(len(calls), 1)
+        time.sleep(0.06)
+        self.assertEqual(len(cache.get().data['agents']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
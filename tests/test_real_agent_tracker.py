@@ -0,0 +1,33 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import real_agent_tracker
+from real_agent_tracker import analyze_root, session_checkpoints_path
+
+
+class SessionCheckpointPathTest(unittest.TestCase):
+    def test_default_matches_global(self):
+        self.assertEqual(session_checkpoints_path(real_agent_tracker.SCAN_INDEX),
+                         real_agent_tracker.SESSION_CHECKPOINTS)
+        self.assertIsNone(session_checkpoints_path(None))
+
+    def test_checkpoints_follow_custom_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            workspace = Path(tmp, 'workspace')
+            sessions = Path(tmp, 'sessions')
+            workspace.mkdir()
+            sessions.mkdir()
+            (workspace / 'notes.md').write_text('hello\n')
+            with open(sessions / 'abc.jsonl', 'w') as f:
+                f.write(json.dumps({'type': 'message', 'message': {'role': 'user', 'content': 'hi'}}) + '\n')
+            index_path = Path(tmp, 'cache', 'scan_index.json')
+            _work, info = analyze_root(workspace, sessions, index_path)
+            self.assertIsNotNone(info)
+            self.assertTrue(os.path.exists(index_path.with_name('session_checkpoints.json')))
+
+
+if __name__ == '__main__':
+    unittest.main()
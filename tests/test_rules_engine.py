@@ -0,0 +1,93 @@
+import json
+import os
+import random
+import re
+import tempfile
+import unittest
+
+from rules_engine import DEFAULT_RULES_FILE, RuleSet, RulesError, load_rules, trie_pattern
+
+
+def reference(rules, default, text):
+    """The if/elif chain the rules describe"""
+    text = text.lower()
+    for rule in rules:
+        required = [s.lower() for s in rule.get('all', [])]
+        needles = [s.lower() for s in rule.get('any', [])]
+        if all(s in text for s in required) and (not needles or any(s in text for s in needles)):
+            return rule['result']
+    return default
+
+
+class TriePatternTest(unittest.TestCase):
+    def test_longest_word_at_each_position(self):
+        pattern = re.compile(f"(?=({trie_pattern(['de', 'deploy', 'dash', 'dashboard', 'a'])}))")
+        self.assertEqual(pattern.findall('dashboard-deploy'), ['dashboard', 'a', 'a', 'deploy'])
+        self.assertEqual(pattern.findall('dashbo'), ['dash', 'a'])
+
+    def test_special_characters_escaped(self):
+        pattern = re.compile(trie_pattern(['a.b', '(x)']))
+        self.assertIsNone(pattern.search('axb'))
+        self.assertIsNotNone(pattern.search('(x)'))
+
+
+class RuleSetTest(unittest.TestCase):
+    RULES = [
+        {'result': 'board', 'all': ['subagent'], 'any': ['dashboard']},
+        {'result': 'dash', 'any': ['dash']},
+        {'result': 'nested', 'all': ['ash', 'board']},
+        {'result': 'deploy', 'any': ['deploy', 'docker']},
+        {'result': 'sub', 'all': ['subagent']},
+    ]
+
+    def test_first_match_wins(self):
+        rules = RuleSet('t', self.RULES, default='none')
+        self.assertEqual(rules.classify('agent:main:subagent:dashboard-1'), 'board')
+        self.assertEqual(rules.classify('src/Dashboard/app.js'), 'dash')
+        self.assertEqual(rules.classify('ashboard'), 'nested')
+        self.assertEqual(rules.classify('agent:main:subagent:docker'), 'deploy')
+        self.assertEqual(rules.classify('agent:main:subagent:x'), 'sub')
+        self.assertEqual(rules.classify('readme.md'), 'none')
+
+    def test_matches_reference_on_random_inputs(self):
+        with open(DEFAULT_RULES_FILE) as f:
+            spec = json.load(f)
+        rulesets = [(rs['rules'], rs.get('default')) for rs in spec['rulesets'].values()]
+        rulesets.append((self.RULES, 'none'))
+        rng = random.Random(13)
+        for rules, default in rulesets:
+            words = sorted({s for rule in rules for s in rule.get('all', []) + rule.get('any', [])})
+            alphabet = words + ['DASH', 'Sub', 'x', '/', ':', '-', 'de', 'oard']
+            compiled = RuleSet('t', rules, default, memo_size=0)
+            for _ in range(3000):
+                text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 6)))
+                self.assertEqual(compiled.classify(text), reference(rules, default, text), text)
+
+    def test_areas_and_errors(self):
+        rules = RuleSet('t', [{'result': 'qa', 'any': ['test']}], areas=['dashboard', 'qa'])
+        self.assertEqual(rules.areas, ['dashboard', 'qa'])
+        self.assertIsNone(RuleSet('empty', []).classify('anything'))
+        with self.assertRaises(RulesError):
+            RuleSet('t', [{'result': 'x'}])
+
+
+class LoadRulesTest(unittest.TestCase):
+    def test_shipped_rules(self):
+        rulesets, signature = load_rules()
+        self.assertEqual(rulesets['file_areas'].classify('deploy/Dockerfile'), 'deployment')
+        self.assertEqual(rulesets['session_agents'].classify('designer'), 'designer')
+        self.assertEqual(len(signature), 16)
+
+    def test_bad_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rules.json')
+            with open(path, 'w') as f:
+                f.write('{"rulesets": {"x": {"rules": [{"result": "a"}]}}}')
+            with self.assertRaises(RulesError):
+                load_rules(path)
+            with self.assertRaises(RulesError):
+                load_rules(os.path.join(tmp, 'missing.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
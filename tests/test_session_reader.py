@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import session_reader
+from session_reader import SessionReader, apply_record, new_stats
+
+
+def line(record):
+    return json.dumps(record) + '\n'
+
+
+USER = {'type': 'message', 'timestamp': 't1', 'message': {'role': 'user', 'content': 'hi'}}
+ASSISTANT = {'type': 'message', 'timestamp': 't2',
+             'message': {'role': 'assistant', 'model': 'm1', 'usage': {'input': 10, 'output': 5}}}
+
+
+class ApplyRecordTest(unittest.TestCase):
+    def test_fields(self):
+        stats = new_stats()
+        apply_record(stats, USER)
+        apply_record(stats, ASSISTANT)
+        apply_record(stats, {'role': 'assistant', 'usage': {'input_tokens': 1, 'output_tokens': 2,
+                                                             'total_tokens': 9}})
+        apply_record(stats, ['not', 'a', 'dict'])
+        self.assertEqual(stats['records'], 4)
+        self.assertEqual((stats['turns'], stats['assistant_messages']), (1, 2))
+        self.assertEqual((stats['input_tokens'], stats['output_tokens'], stats['total_tokens']), (11, 7, 24))
+        self.assertEqual((stats['first_timestamp'], stats['last_timestamp']), ('t1', 't2'))
+        self.assertEqual(stats['model'], 'm1')
+
+
+class SessionReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.sessions = os.path.join(self.directory.name, 'sessions')
+        os.mkdir(self.sessions)
+        self.checkpoints = os.path.join(self.directory.name, 'cache', 'session_checkpoints.json')
+        self.path = os.path.join(self.sessions, 'a.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def append(self, text, name='a.jsonl'):
+        with open(os.path.join(self.sessions, name), 'a') as f:
+            f.write(text)
+
+    def test_only_appended_lines_are_parsed(self):
+        self.append(line(USER) + line(ASSISTANT))
+        reader = SessionReader(self.sessions, self.checkpoints)
+        self.assertEqual(reader.read_session('a.jsonl')['records'], 2)
+        self.assertTrue(reader.save_checkpoints())
+
+        self.append(line(USER))
+        restored = SessionReader(self.sessions, self.checkpoints)
+        with mock.patch.object(session_reader, 'apply_record', wraps=apply_record) as apply:
+            stats = restored.read_session('a.jsonl')
+        self.assertEqual(apply.call_count, 1)
+        self.assertEqual((stats['records'], stats['turns']), (3, 2))
+
+    def test_partial_line_waits(self):
+        self.append(line(USER) + '{"role": "assi')
+        reader = SessionReader(self.sessions)
+        self.assertEqual(reader.read_session('a.jsonl')['records'], 1)
+        self.append('stant"}\n')
+        stats = reader.read_session('a.jsonl')
+        self.assertEqual((stats['records'], stats['assistant_messages'], stats['bad_records']), (2, 1, 0))
+
+    def test_bad_and_blank_lines(self):
+        self.append(line(USER) + '\n' + 'not json\n')
+        stats = SessionReader(self.sessions).read_session('a.jsonl')
+        self.assertEqual((stats['records'], stats['bad_records']), (1, 1))
+
+    def test_rewritten_file_is_reread(self):
+        self.append(line(USER) + line(USER))
+        reader = SessionReader(self.sessions)
+        reader.read_session('a.jsonl')
+        with open(self.path, 'w') as f:
+            f.write(line(ASSISTANT))
+        stats = reader.read_session('a.jsonl')
+        self.assertEqual((stats['records'], stats['turns'], stats['assistant_messages']), (1, 0, 1))
+
+    def test_read_all_prunes_removed_transcripts(self):
+        self.append(line(USER))
+        self.append(line(USER), name='b.jsonl')
+        self.append('ignored\n', name='notes.txt')
+        reader = SessionReader(self.sessions)
+        self.assertEqual(sorted(reader.read_all()), ['a.jsonl', 'b.jsonl'])
+        os.unlink(os.path.join(self.sessions, 'b.jsonl'))
+        self.assertEqual(list(reader.read_all()), ['a.jsonl'])
+        self.assertEqual(list(reader.checkpoints), ['a.jsonl'])
+        self.assertIsNone(reader.read_session('missing.jsonl'))
+
+
+if __name__ == '__main__':
+    unittest.main()
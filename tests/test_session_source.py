@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from agent_progress_tracker import AgentTable
+from session_source import (CliSessionSource, FileSessionSource, SessionSourceError, cli_fields,
+                            normalize_sessions)
+
+# Columns filled from the unseeded quality simulation
+SIMULATED = ('quality_score', 'tests_passed', 'bugs_found', 'code_quality')
+
+
+def table_rows(sessions):
+    rows = AgentTable().load_sessions(sessions, {}).to_records()
+    return [{k: v for k, v in row.items() if k not in SIMULATED} for row in rows]
+
+
+class CliFieldsTest(unittest.TestCase):
+    def test_age_and_tokens_from_sessions_json(self):
+        now = 1_700_000_000.0
+        session = {'key': 'k', 'updatedAt': (now - 10 * 3600 - 30) * 1000,
+                   'totalTokens': 150000, 'contextTokens': 200000}
+        self.assertEqual(cli_fields(session, now)['age'], '10 hours ago')
+        self.assertEqual(cli_fields(session, now)['tokens'], '150k/200k')
+
+    def test_short_ages(self):
+        now = 1_700_000_000.0
+        self.assertEqual(cli_fields({'updatedAt': now * 1000}, now)['age'], 'just now')
+        self.assertEqual(cli_fields({'updatedAt': (now - 60) * 1000}, now)['age'], '1 minute ago')
+        self.assertEqual(cli_fields({'updatedAt': (now - 3600) * 1000}, now)['age'], '1 hour ago')
+
+    def test_cli_columns_are_kept(self):
+        session = {'age': '2 hours ago', 'tokens': '1k/2k', 'updatedAt': 0, 'totalTokens': 5, 'contextTokens': 10}
+        self.assertIs(cli_fields(session), session)
+
+    def test_unexpected_payload(self):
+        with self.assertRaises(SessionSourceError):
+            normalize_sessions('sessions')
+
+
+class SourceParityTest(unittest.TestCase):
+    """The same sessions read from sessions.json and from the CLI give the same agent rows"""
+
+    def test_file_and_cli_sources_agree(self):
+        now = time.time()
+        updated = {'agent:main:main': now - 10 * 3600 - 30,
+                   'agent:ops:subagent:abc': now - 10 * 3600 - 30,
+                   'agent:ops:subagent:def': now - 20 * 60 - 30}
+        tokens = {'agent:main:main': 150000, 'agent:ops:subagent:abc': 40000, 'agent:ops:subagent:def': 12000}
+        sessions_json = {key: {'updatedAt': int(ts * 1000), 'totalTokens': tokens[key], 'contextTokens': 200000,
+                               'model': 'm'} for key, ts in updated.items()}
+        cli_json = [{'key': key, 'age': cli_fields({'updatedAt': ts * 1000}, now)['age'],
+                     'tokens': f"{round(tokens[key] / 1000)}k/200k", 'model': 'm'} for key, ts in updated.items()]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sessions.json')
+            with open(path, 'w') as f:
+                json.dump(sessions_json, f)
+            from_file = FileSessionSource(path).fetch()
+        from_cli = CliSessionSource([sys.executable, '-c', f"print({json.dumps(json.dumps(cli_json))})"]).fetch()
+
+        file_rows = table_rows(from_file)
+        self.assertEqual(file_rows, table_rows(from_cli))
+        # The 10 hour old subagent is dropped; the main session keeps its token progress and age
+        self.assertEqual([row['session_key'] for row in file_rows], ['agent:main:main', 'agent:ops:subagent:def'])
+        self.assertEqual(file_rows[0]['progress'], 75)
+        self.assertEqual(file_rows[0]['active_since'], '10 hours ago')
+        self.assertEqual(file_rows[0]['token_usage'], '150k/200k')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from session_source import SessionSource, SessionSourceError
+from tracker_async import AsyncTracker, SourceResults
+
+
+class FailingSource(SessionSource):
+    name = 'failing'
+
+    def fetch(self):
+        raise SessionSourceError("sessions.json: unreadable")
+
+
+class FetchSourceTest(unittest.TestCase):
+    def fetch(self, tracker, name, fn):
+        results = SourceResults()
+        asyncio.run(tracker.fetch_source(results, name, fn))
+        return results
+
+    def test_session_source_failure_is_degraded(self):
+        tracker = AsyncTracker(session_source=FailingSource())
+        results = self.fetch(tracker, 'sessions', tracker.fetch_sessions)
+        self.assertEqual(results.degraded, ['sessions'])
+        self.assertEqual(results.missing, ['sessions'])
+        self.assertFalse(results.complete(('sessions', 'registry')))
+
+    def test_last_good_value_after_failure(self):
+        tracker = AsyncTracker(session_source=FailingSource())
+        self.fetch(tracker, 'sessions', lambda: [{'key': 'agent:main:main'}])
+        results = self.fetch(tracker, 'sessions', tracker.fetch_sessions)
+        self.assertEqual(results.degraded, ['sessions'])
+        self.assertEqual(results.missing, [])
+        self.assertEqual(results.values['sessions'], [{'key': 'agent:main:main'}])
+
+    def test_timeout(self):
+        tracker = AsyncTracker(timeouts={'registry': 0.05})
+        results = self.fetch(tracker, 'registry', lambda: time.sleep(1))
+        self.assertEqual(results.degraded, ['registry'])
+        # A second refresh does not start another copy while the first is still running
+        results = self.fetch(tracker, 'registry', lambda: {'agents': []})
+        self.assertEqual(results.degraded, ['registry'])
+
+    def test_hung_source_does_not_block_exit(self):
+        script = ("import asyncio, time\n"
+                  "from tracker_async import AsyncTracker, SourceResults\n"
+                  "t = AsyncTracker(timeouts={'registry': 0.05})\n"
+                  "asyncio.run(t.fetch_source(SourceResults(), 'registry', lambda: time.sleep(60)))\n"
+                  "t.close()\n")
+        start = time.monotonic()
+        subprocess.run([sys.executable, '-c', script], check=True, capture_output=True, timeout=30,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertLess(time.monotonic() - start, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import work_shards
+from work_shards import (MANIFEST_NAME, WorkShardReader, WorkShardWriter, read_manifest, shard_dir_for,
+                         summarize)
+
+
+def item(hour, minute, name):
+    return {'file': name, 'modified': f"2026-03-01T{hour:02d}:{minute:02d}:00", 'category': 'docs'}
+
+
+ITEMS = [item(9, 5, 'a.md'), item(10, 1, 'b.md'), item(10, 30, 'c.md'), item(11, 0, 'd.md'), item(11, 0, 'e.md')]
+
+
+class WorkShardsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.shards = shard_dir_for(os.path.join(self.directory.name, 'real_progress.json'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_hourly_shards_newest_first(self):
+        manifest = WorkShardWriter(self.shards).write(ITEMS)
+        self.assertEqual(self.shards.name, 'real_progress.d')
+        self.assertEqual([(shard['bucket'], shard['count']) for shard in manifest['shards']],
+                         [('2026-03-01T11', 2), ('2026-03-01T10', 2), ('2026-03-01T09', 1)])
+        self.assertEqual(manifest['total'], 5)
+        with open(os.path.join(self.shards, 'work-2026030111.ndjson'), 'rb') as f:
+            self.assertEqual([json.loads(line)['file'] for line in f], ['e.md', 'd.md'])
+        self.assertEqual(read_manifest(self.shards), manifest)
+
+    def test_only_changed_shards_are_rewritten(self):
+        WorkShardWriter(self.shards).write(ITEMS)
+        writer = WorkShardWriter(self.shards)
+        with mock.patch.object(work_shards, 'write_atomic', wraps=work_shards.write_atomic) as write:
+            writer.write(ITEMS[:-1] + [item(11, 5, 'e.md')])
+        written = sorted(os.path.basename(call.args[0]) for call in write.call_args_list)
+        self.assertEqual(written, [MANIFEST_NAME, 'work-2026030111.ndjson'])
+        with mock.patch.object(work_shards, 'write_atomic') as write:
+            writer.write(ITEMS[:-1] + [item(11, 5, 'e.md')])
+        write.assert_not_called()
+
+    def test_stale_shards_removed_and_compression(self):
+        WorkShardWriter(self.shards).write(ITEMS)
+        WorkShardWriter(self.shards, compress=True).write(ITEMS[1:])
+        self.assertEqual(sorted(os.listdir(self.shards)),
+                         [MANIFEST_NAME, 'work-2026030110.ndjson.gz', 'work-2026030111.ndjson.gz'])
+        with open(os.path.join(self.shards, 'work-2026030110.ndjson.gz'), 'rb') as f:
+            self.assertEqual(len(gzip.decompress(f.read()).splitlines()), 2)
+
+    def test_pages_across_shards(self):
+        WorkShardWriter(self.shards, compress=True).write(ITEMS)
+        reader = WorkShardReader(self.shards)
+        pages = []
+        for page in (1, 2, 3):
+            _etag, body = reader.render_page(page, per_page=2)
+            pages.append(json.loads(body))
+        self.assertEqual([[entry['file'] for entry in page['items']] for page in pages],
+                         [['e.md', 'd.md'], ['c.md', 'b.md'], ['a.md']])
+        self.assertEqual((pages[0]['pages'], pages[0]['next_page'], pages[2]['next_page']), (3, 2, None))
+        self.assertEqual(json.loads(reader.render_page(4, per_page=2)[1])['items'], [])
+
+    def test_page_etag_follows_content(self):
+        writer = WorkShardWriter(self.shards)
+        writer.write(ITEMS)
+        reader = WorkShardReader(self.shards)
+        etag, _body = reader.render_page(1, 2)
+        self.assertNotEqual(etag, reader.render_page(2, 2)[0])
+        writer.write(ITEMS + [item(12, 0, 'f.md')])
+        self.assertNotEqual(etag, reader.render_page(1, 2)[0])
+
+    def test_before_first_export(self):
+        etag, body = WorkShardReader(self.shards).render_page()
+        self.assertEqual(json.loads(body)['items'], [])
+        self.assertTrue(etag.startswith('empty-'))
+
+    def test_summarize(self):
+        summary = summarize({'completed_work': ITEMS, 'total_files': 5}, 'real_progress.d/manifest.json', recent=2)
+        self.assertEqual([entry['file'] for entry in summary['completed_work']], ['e.md', 'd.md'])
+        self.assertEqual(summary['completed_work_total'], 5)
+        self.assertEqual(summary['total_files'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
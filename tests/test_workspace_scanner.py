@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from workspace_scanner import IgnoreRules, WorkspaceScanner
+
+OLD = 1_600_000_000
+
+
+class IgnoreRulesTest(unittest.TestCase):
+    def test_gitignore_style(self):
+        rules = IgnoreRules(['# comment', '*.log', '!keep.log', 'build/', '/top.txt', 'docs/*.tmp'])
+        self.assertTrue(rules.is_ignored('a/b/debug.log', False))
+        self.assertFalse(rules.is_ignored('a/keep.log', False))
+        self.assertTrue(rules.is_ignored('a/build', True))
+        self.assertFalse(rules.is_ignored('a/build', False))
+        self.assertTrue(rules.is_ignored('top.txt', False))
+        self.assertFalse(rules.is_ignored('a/top.txt', False))
+        self.assertTrue(rules.is_ignored('docs/x.tmp', False))
+        self.assertFalse(rules.is_ignored('a/docs/x.tmp', False))
+
+    def test_workspace_ignore_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, '.trackerignore'), 'w') as f:
+                f.write('secret/\n')
+            rules = IgnoreRules.for_workspace(tmp, extra=['out.json'])
+            self.assertTrue(rules.is_ignored('secret', True))
+            self.assertTrue(rules.is_ignored('node_modules', True))
+            self.assertTrue(rules.is_ignored('out.json', False))
+
+
+class WorkspaceScannerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, 'workspace')
+        self.index = os.path.join(self.directory.name, 'cache', 'scan_index.json')
+        for rel_path in ('notes.md', 'src/app.py', 'src/lib/util.py', 'node_modules/pkg/index.js'):
+            self.write(rel_path, 'x')
+        self.age_dirs()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def age_dirs(self):
+        # Directory mtimes inside the racy window are never trusted; move them out of it
+        for dirpath, _dirnames, _filenames in os.walk(self.root):
+            os.utime(dirpath, (OLD, OLD))
+
+    def scanner(self):
+        return WorkspaceScanner(self.root, index_path=self.index, categorize=lambda p: p.split('/')[0])
+
+    def test_scan_lists_files_with_categories(self):
+        files = self.scanner().scan()
+        self.assertEqual(sorted(files), ['notes.md', 'src/app.py', 'src/lib/util.py'])
+        self.assertEqual(files['src/lib/util.py'][1:], (1, 'src'))
+
+    def test_unchanged_directories_reuse_the_index(self):
+        scanner = self.scanner()
+        scanner.scan()
+        self.assertTrue(scanner.save_index())
+        restored = self.scanner()
+        with mock.patch.object(WorkspaceScanner, '_list_dir', wraps=restored._list_dir) as list_dir:
+            files = restored.scan()
+        list_dir.assert_not_called()
+        self.assertEqual(files, scanner.files)
+        self.assertEqual(restored.changes, {})
+
+    def test_changes_added_and_removed(self):
+        scanner = self.scanner()
+        scanner.scan()
+        self.write('src/new.py', 'y')
+        os.unlink(os.path.join(self.root, 'src/lib/util.py'))
+        scanner.scan()
+        self.assertEqual(set(scanner.changes), {'src/new.py', 'src/lib/util.py'})
+        self.assertIsNone(scanner.changes['src/lib/util.py'])
+
+    def test_in_place_edit_needs_full_scan_or_refresh(self):
+        scanner = self.scanner()
+        scanner.scan()
+        self.write('notes.md', 'longer')
+        self.age_dirs()
+        scanner.scan()
+        self.assertEqual(scanner.changes, {})
+        changes = scanner.refresh_paths(['notes.md', 'src/missing.py'])
+        self.assertEqual(list(changes), ['notes.md'])
+        self.assertEqual(changes['notes.md'][1], 6)
+        self.write('src/app.py', 'edited')
+        self.age_dirs()
+        scanner.scan(full=True)
+        self.assertEqual(list(scanner.changes), ['src/app.py'])
+
+    def test_index_ignored_when_rules_change(self):
+        scanner = self.scanner()
+        scanner.scan()
+        scanner.save_index()
+        other = WorkspaceScanner(self.root, index_path=self.index, categorize_signature='v2')
+        self.assertEqual(other.files, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Async Tracker Core
+Refreshes agent_progress_data.json and real_progress.json in one pass with
+every independent input fetched concurrently: the session list, the agent
+registry, the workspace scan and the session transcripts each run in a
+worker thread under their own timeout. A refresh costs about as long as the
+slowest source rather than the sum of all of them, and a source that fails
+or times out is replaced by its last good value and named in
+`degraded_sources` instead of holding up the rest. A source that has not
+succeeded yet has only an empty placeholder; documents built from one are
+not exported, and a placeholder session list is kept away from the alert
+engine, so a slow first refresh cannot wipe real output or resolve open
+alerts.
+
+Each source call runs in its own daemon thread (at most one per source at a
+time), so a source that hangs past its timeout never keeps the process
+from exiting.
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+import agent_progress_tracker
+import real_agent_tracker
+from metrics import span
+from session_reader import SessionReader
+from session_source import default_session_source
+
+DEFAULT_TIMEOUTS = {
+    'sessions': 6.0,
+    'registry': 2.0,
+    'workspace_scan': 30.0,
+    'session_transcripts': 15.0,
+}
+
+# Sources each output document is built from
+AGENT_SOURCES = ('sessions', 'registry')
+REAL_SOURCES = ('workspace_scan', 'session_transcripts')
+
+
+def submit(name, fn):
+    """Run fn() in a daemon thread; returns its concurrent.futures.Future"""
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    threading.Thread(target=run, name=f"tracker-source-{name}", daemon=True).start()
+    return future
+
+
+class SourceResults:
+    """Values fetched in one refresh plus the names of sources that fell back"""
+
+    def __init__(self):
+        self.values = {}
+        self.degraded = []
+        # Degraded sources with no real value to fall back on (their value is a placeholder)
+        self.missing = []
+        self.timings = {}
+
+    def complete(self, names):
+        """True if none of `names` is a placeholder"""
+        return not any(name in self.missing for name in names)
+
+
+class AsyncTracker:
+    """
+    Both trackers' inputs behind one concurrent refresh. Keeps the last good
+    value of each source so a later timeout degrades to stale data rather
+    than to nothing.
+    """
+
+    def __init__(self, workspace=real_agent_tracker.WORKSPACE, session_dir=real_agent_tracker.SESSION_DIR,
+                 index_path=real_agent_tracker.SCAN_INDEX, checkpoint_path=None,
+                 registry_file=agent_progress_tracker.REGISTRY_FILE, session_source=None, history=None,
+                 eta_engine=None, alert_engine=None, timeouts=None):
+        self.workspace = workspace
+        self.session_dir = session_dir
+        self.index_path = index_path
+        self.checkpoint_path = checkpoint_path or real_agent_tracker.session_checkpoints_path(index_path)
+        self.registry_file = registry_file
+        self.session_source = session_source or default_session_source(agent_progress_tracker.SESSIONS_FILE,
+                                                                        cli_blocking=True)
+        self.history = history
+        self.eta_engine = eta_engine
+        self.alert_engine = alert_engine
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        # Futures of sources that timed out but are still running in a worker thread
+        self.inflight = {}
+        self.last_good = {
+            'sessions': [],
+            'registry': {'agents': []},
+            'workspace_scan': real_agent_tracker.CompletedWork(),
+            'session_transcripts': None,
+        }
+        # Sources that have produced a real value at least once
+        self.fetched = set()
+
+    def sources(self, full_scan=False):
+        """name -> zero-argument callable, one per independent input"""
+        return {
+            'sessions': self.fetch_sessions,
+            'registry': lambda: agent_progress_tracker.get_agent_registry(self.registry_file),
+            'workspace_scan': lambda: real_agent_tracker.scan_root(self.workspace, self.index_path, full_scan),
+            'session_transcripts': self.read_transcripts,
+        }
+
+    def fetch_sessions(self):
+        # fetch() rather than get_openclaw_sessions(): a failure has to raise to mark the source degraded
+        with span('agent_progress', 'session_fetch'):
+            return self.session_source.fetch()
+
+    def read_transcripts(self):
+        reader = SessionReader(self.session_dir, checkpoint_path=self.checkpoint_path)
+        return real_agent_tracker.get_session_info(self.session_dir, reader)
+
+    async def fetch_source(self, results, name, fn):
+        """Run `fn` in a worker thread; on timeout or error use the last good value and mark `name` degraded"""
+        timeout = self.timeouts[name]
+        start = time.perf_counter()
+        try:
+            future = self.inflight.get(name)
+            if future is not None and not future.done():
+                # Never run two copies of a source (e.g. two scans writing the same index)
+                raise RuntimeError("previous call still running")
+            future = self.inflight[name] = submit(name, fn)
+            value = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            print(f"Source {name} timed out after {timeout:.1f}s, using last good value")
+            results.degraded.append(name)
+        except Exception as e:
+            print(f"Source {name} failed ({e}), using last good value")
+            results.degraded.append(name)
+        else:
+            self.last_good[name] = value
+            self.fetched.add(name)
+        if name in results.degraded and name not in self.fetched:
+            results.missing.append(name)
+        results.values[name] = self.last_good[name]
+        results.timings[name] = time.perf_counter() - start
+
+    async def fetch_all(self, full_scan=False):
+        results = SourceResults()
+        await asyncio.gather(*(self.fetch_source(results, name, fn) for name, fn in self.sources(full_scan).items()))
+        return results
+
+    async def refresh(self, full_scan=False):
+        """
+        (agent progress document, real progress document, SourceResults).
+        Check results.complete(AGENT_SOURCES / REAL_SOURCES) before exporting.
+        """
+        results = await self.fetch_all(full_scan)
+        values = results.values
+
+        # An empty placeholder session list would resolve every open alert
+        alert_engine = self.alert_engine if results.complete(('sessions',)) else None
+        agent_data = agent_progress_tracker.get_agent_progress_data(
+            values['sessions'], values['registry'], self.history, self.eta_engine, alert_engine)
+        real_data = real_agent_tracker.build_real_agent_data(values['workspace_scan'], values['session_transcripts'])
+        if results.degraded:
+            agent_data['degraded_sources'] = [n for n in results.degraded if n in AGENT_SOURCES]
+            real_data['degraded_sources'] = [n for n in results.degraded if n in REAL_SOURCES]
+        return agent_data, real_data, results
+
+    def close(self):
+        # Worker threads are daemons: a timed-out source still running is simply abandoned
+        self.inflight.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh both tracker outputs with concurrent source fetching")
+    parser.add_argument('--full', action='store_true', help="ignore the scan index and re-list every directory")
+    for name, default in DEFAULT_TIMEOUTS.items():
+        parser.add_argument(f"--timeout-{name.replace('_', '-')}", type=float, default=default,
+                            help=f"seconds before {name} falls back (default {default})")
+    args = parser.parse_args()
+    timeouts = {name: getattr(args, f"timeout_{name}") for name in DEFAULT_TIMEOUTS}
+
+    history = agent_progress_tracker.open_history()
+    eta_engine = agent_progress_tracker.EtaEngine(state_path=agent_progress_tracker.ETA_STATE_FILE)
+    alert_engine = agent_progress_tracker.AlertEngine(state_path=agent_progress_tracker.ALERT_STATE_FILE)
+    tracker = AsyncTracker(history=history, eta_engine=eta_engine, alert_engine=alert_engine, timeouts=timeouts)
+    start = time.perf_counter()
+    try:
+        agent_data, real_data, results = asyncio.run(tracker.refresh(full_scan=args.full))
+    finally:
+        tracker.close()
+    elapsed = time.perf_counter() - start
+
+    agent_progress_tracker.save_eta_state(eta_engine)
+    agent_progress_tracker.save_alert_state(alert_engine)
+    if results.complete(AGENT_SOURCES):
+        agent_progress_tracker.record_history(history, agent_data)
+        agent_progress_tracker.save_progress_data(agent_data)
+    else:
+        print(f"Not exporting agent progress: no data yet from "
+              f"{', '.join(n for n in results.missing if n in AGENT_SOURCES)}")
+    if results.complete(REAL_SOURCES):
+        real_agent_tracker.update_dashboard_progress(real_data)
+    else:
+        print(f"Not exporting real progress: no data yet from "
+              f"{', '.join(n for n in results.missing if n in REAL_SOURCES)}")
+
+    print(f"Refreshed in {elapsed:.2f}s (sum of sources {sum(results.timings.values()):.2f}s)")
+    for name, seconds in sorted(results.timings.items(), key=lambda item: -item[1]):
+        status = " (fallback)" if name in results.degraded else ""
+        print(f"  {name:20} {seconds:6.2f}s{status}")
+    print(f"{agent_data['total_agents']} agents ({agent_data['active_agents']} active), "
+          f"{len(real_data['completed_work'])} files created today")
+
+
+if __name__ == "__main__":
+    main()
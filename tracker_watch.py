@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Filesystem Watchers for the Trackers
+inotify on Linux (via ctypes, no extra packages) with a polling fallback, plus
+a debounced event loop used by the trackers' --watch mode.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+STRUCTURE_MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+EVENT_HEADER = struct.Struct('iIII')
+
+# An event with path None means "anything may have changed, rescan"
+RESCAN = (None, True)
+
+
+class InotifyWatcher:
+    """Recursive directory watcher backed by Linux inotify"""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+        self.trees = []
+
+    def watch_dir(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.paths[wd] = path
+
+    def watch_tree(self, root, ignore=None):
+        """Watch root and every non-ignored directory below it"""
+        root = os.path.abspath(root)
+        self.trees.append((root, ignore))
+        self._add_tree(root, root, ignore)
+
+    def _add_tree(self, root, path, ignore):
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            try:
+                self.watch_dir(current)
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        rel_path = os.path.relpath(entry.path, root)
+                        if ignore is None or not ignore.is_ignored(rel_path, True):
+                            stack.append(entry.path)
+            except OSError:
+                continue
+
+    def _tree_for(self, path):
+        for root, ignore in self.trees:
+            if path == root or path.startswith(root + os.sep):
+                return root, ignore
+        return None, None
+
+    def read_events(self, timeout=None):
+        """Return [(abs_path, structural)] once events arrive or timeout expires"""
+        poller = select.poll()
+        poller.register(self.fd, select.POLLIN)
+        if not poller.poll(None if timeout is None else int(timeout * 1000)):
+            return []
+
+        events = []
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buf, offset)
+                offset += EVENT_HEADER.size
+                name = buf[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    events.append(RESCAN)
+                    continue
+                if mask & IN_IGNORED:
+                    self.paths.pop(wd, None)
+                    continue
+                directory = self.paths.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                structural = bool(mask & STRUCTURE_MASK)
+                events.append((path, structural))
+
+                # New directories inside a watched tree get their own watches
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    root, ignore = self._tree_for(path)
+                    if root is not None:
+                        rel_path = os.path.relpath(path, root)
+                        if ignore is None or not ignore.is_ignored(rel_path, True):
+                            self._add_tree(root, path, ignore)
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback watcher: re-stats watched directories every interval"""
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self.dirs = {}
+        self.trees = []
+
+    def _snapshot(self, path):
+        snapshot = {}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        snapshot[entry.name] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return snapshot
+
+    def watch_dir(self, path):
+        self.dirs[path] = self._snapshot(path)
+
+    def watch_tree(self, root, ignore=None):
+        # Trees are too large to snapshot; the caller's incremental scan
+        # decides what changed, so every poll just asks for a rescan of root
+        self.trees.append(os.path.abspath(root))
+
+    def read_events(self, timeout=None):
+        full_poll = timeout is None or timeout >= self.interval
+        time.sleep(self.interval if full_poll else timeout)
+        # Debounce re-checks only look at the small directories
+        events = [(root, True) for root in self.trees] if full_poll else []
+        for path, old in self.dirs.items():
+            new = self._snapshot(path)
+            if new != old:
+                self.dirs[path] = new
+                for name in set(old) | set(new):
+                    if old.get(name) != new.get(name):
+                        events.append((os.path.join(path, name), name not in old or name not in new))
+        return events
+
+    def close(self):
+        pass
+
+
+def create_watcher(poll_interval=2.0, force_polling=False):
+    """inotify where available, polling everywhere else"""
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(poll_interval)
+
+
+def watch_loop(watcher, on_events, debounce=0.25, max_delay=1.0, idle_timeout=60.0):
+    """
+    Block on the watcher and hand batched events to on_events.
+
+    Events are collected until the filesystem has been quiet for `debounce`
+    seconds (but never longer than `max_delay`). on_events([]) is called every
+    `idle_timeout` seconds without events so callers can handle day rollover.
+    """
+    try:
+        while True:
+            events = watcher.read_events(timeout=idle_timeout)
+            if events:
+                deadline = time.monotonic() + max_delay
+                while time.monotonic() < deadline:
+                    more = watcher.read_events(timeout=debounce)
+                    if not more:
+                        break
+                    events.extend(more)
+            on_events(events)
+    except KeyboardInterrupt:
+        print("Watch stopped")
+    finally:
+        watcher.close()
@@ -1,14 +1,9 @@
 #!/usr/bin/env python3
-import http.server
-import socketserver
+import os
 import sys
 import socket
 
-class TunnelHandler(http.server.SimpleHTTPRequestHandler):
-    def do_GET(self):
-        if self.path == '/':
-            self.path = '/ascent_xr_master_dashboard.html'
-        return super().do_GET()
+from dashboard_server import progress_feed, serve
 
 def get_network_ip():
     """Get network IP address"""
@@ -41,16 +36,13 @@ def main():
     print("3. Clear browser cache")
     print("=" * 60)
     
-    try:
-        with socketserver.TCPServer(("0.0.0.0", PORT), TunnelHandler) as httpd:
-            httpd.serve_forever()
-    except OSError as e:
-        print(f"Port {PORT} busy, trying 9099...")
-        PORT = 9099
-        with socketserver.TCPServer(("0.0.0.0", PORT), TunnelHandler) as httpd:
-            print(f"Now running on port {PORT}")
-            print(f"Access: http://{network_ip}:{PORT}/")
-            httpd.serve_forever()
+    def on_start(port):
+        if port != PORT:
+            print(f"Port {PORT} busy, now running on port {port}")
+            print(f"Access: http://{network_ip}:{port}/")
+    
+    serve([PORT, 9099], os.getcwd(), on_start=on_start, on_worker_start=progress_feed(),
+          root_path='/ascent_xr_master_dashboard.html')
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
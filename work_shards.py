@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Completed Work Shards
+Splits the completed_work list of real_progress.json into hourly detail
+shards so the summary the dashboard loads stays a few KB however busy the
+day was. Next to `real_progress.json` the tracker keeps `real_progress.d/`:
+
+  manifest.json            shards newest first, with their bucket, item count and hash
+  work-YYYYMMDDHH.ndjson   one compact JSON object per line, newest first
+                           (.ndjson.gz with compress=True)
+
+Only shards whose content changed are rewritten (an edit usually touches
+the current hour's shard alone) and the manifest is replaced last, so a
+reader never sees a manifest naming a shard that has not been written yet.
+The summary keeps the RECENT_WORK newest items in `completed_work` and
+points at the manifest; WorkShardReader serves pages across the shards by
+reading only the ones a page overlaps.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from json_export import dumps, write_atomic
+
+SHARD_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+SHARD_PREFIX = 'work-'
+
+# Items kept inline in the summary document
+RECENT_WORK = 20
+
+# Page size for readers that do not ask for one, and the most they may ask for
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def shard_dir_for(output_path):
+    """real_progress.json -> real_progress.d"""
+    return Path(output_path).with_suffix('.d')
+
+
+def bucket_of(item):
+    """Hour bucket of a work item: the 'YYYY-MM-DDTHH' prefix of its modified time"""
+    return item['modified'][:13]
+
+
+def shard_name(bucket, compress=False):
+    name = f"{SHARD_PREFIX}{bucket.replace('-', '').replace('T', '')}.ndjson"
+    return f"{name}.gz" if compress else name
+
+
+def newest_first(items):
+    return sorted(items, key=lambda item: (item['modified'], item['file']), reverse=True)
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'rb') as f:
+            manifest = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == SHARD_VERSION else None
+
+
+class WorkShardWriter:
+    """Rewrites the shard directory from one completed_work list, touching only changed shards"""
+
+    def __init__(self, directory, compress=False):
+        self.directory = str(directory)
+        self.compress = compress
+        previous = read_manifest(self.directory)
+        self.shards = {shard['bucket']: shard for shard in previous['shards']} if previous else {}
+
+    def write(self, items):
+        """Write shards + manifest for `items`; returns the manifest"""
+        os.makedirs(self.directory, exist_ok=True)
+        buckets = {}
+        for item in newest_first(items):
+            buckets.setdefault(bucket_of(item), []).append(item)
+
+        shards = []
+        for bucket in sorted(buckets, reverse=True):
+            payload = b''.join(dumps(item) + b'\n' for item in buckets[bucket])
+            etag = hashlib.blake2b(payload, digest_size=16).hexdigest()
+            name = shard_name(bucket, self.compress)
+            previous = self.shards.get(bucket)
+            path = os.path.join(self.directory, name)
+            if not previous or previous['etag'] != etag or previous['file'] != name or not os.path.exists(path):
+                write_atomic(path, gzip.compress(payload, compresslevel=6, mtime=0) if self.compress else payload)
+            shards.append({'bucket': bucket, 'file': name, 'count': len(buckets[bucket]), 'etag': etag})
+
+        manifest = {
+            'version': SHARD_VERSION,
+            'etag': hashlib.blake2b(''.join(shard['etag'] for shard in shards).encode('ascii'),
+                                    digest_size=16).hexdigest(),
+            'total': len(items),
+            'shards': shards,
+        }
+        if read_manifest(self.directory) != manifest:
+            write_atomic(os.path.join(self.directory, MANIFEST_NAME), dumps(manifest))
+        self._remove_stale({shard['file'] for shard in shards})
+        self.shards = {shard['bucket']: shard for shard in shards}
+        return manifest
+
+    def _remove_stale(self, keep):
+        for name in os.listdir(self.directory):
+            if name.startswith(SHARD_PREFIX) and name not in keep:
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError as e:
+                    print(f"Error removing old work shard: {e}")
+
+
+_writers = {}
+
+
+def write_work_shards(items, directory, compress=False):
+    """Module-level convenience: one WorkShardWriter per shard directory"""
+    key = os.path.abspath(str(directory))
+    writer = _writers.get(key)
+    if writer is None or writer.compress != compress:
+        writer = _writers[key] = WorkShardWriter(key, compress=compress)
+    return writer.write(items)
+
+
+def summarize(data, manifest_path, recent=RECENT_WORK):
+    """The summary document: `data` with completed_work cut to the newest `recent` items"""
+    items = data['completed_work']
+    summary = dict(data, completed_work=newest_first(items)[:recent])
+    summary['completed_work_total'] = len(items)
+    summary['completed_work_shards'] = manifest_path
+    return summary
+
+
+class WorkShardReader:
+    """Pages of completed work, newest first, from a shard directory (manifest re-read when it changes)"""
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        self._signature = None
+        self._manifest = None
+        self._lock = threading.Lock()
+
+    def manifest(self):
+        try:
+            st = os.stat(os.path.join(self.directory, MANIFEST_NAME))
+        except OSError:
+            return None
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if signature != self._signature:
+                self._manifest = read_manifest(self.directory)
+                self._signature = signature
+            return self._manifest
+
+    def shard_lines(self, shard):
+        path = os.path.join(self.directory, shard['file'])
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+            if shard['file'].endswith('.gz'):
+                payload = gzip.decompress(payload)
+        except (OSError, EOFError, gzip.BadGzipFile) as e:
+            # Replaced between reading the manifest and the shard; the next request sees the new manifest
+            print(f"Error reading work shard {shard['file']}: {e}")
+            return []
+        return payload.splitlines()
+
+    def page(self, page=1, per_page=DEFAULT_PAGE_SIZE):
+        """(manifest, raw JSON lines of the page), or (None, []) before the first export"""
+        manifest = self.manifest()
+        if manifest is None:
+            return None, []
+        offset = (page - 1) * per_page
+        lines = []
+        for shard in manifest['shards']:
+            if offset >= shard['count']:
+                offset -= shard['count']
+                continue
+            needed = per_page - len(lines)
+            lines.extend(self.shard_lines(shard)[offset:offset + needed])
+            offset = 0
+            if len(lines) >= per_page:
+                break
+        return manifest, lines
+
+    def render_page(self, page=1, per_page=DEFAULT_PAGE_SIZE):
+        """(etag, JSON body) for one page; the items are copied from the shards without re-parsing"""
+        manifest, lines = self.page(page, per_page)
+        total = manifest['total'] if manifest else 0
+        pages = max(1, -(-total // per_page))
+        head = dumps({
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': pages,
+            'next_page': page + 1 if page < pages else None,
+        })
+        body = head[:-1] + b',"items":[' + b','.join(lines) + b']}'
+        etag = f"{manifest['etag'] if manifest else 'empty'}-{page}-{per_page}"
+        return etag, body
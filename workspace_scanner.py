@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Incremental Workspace Scanner
+Keeps a persisted index of path -> (mtime, size, category) and only re-lists
+directories whose mtime changed since the last scan.
+"""
+
+import fnmatch
+import json
+import os
+import time
+
+INDEX_VERSION = 1
+
+# Always skipped, on top of whatever the ignore file lists
+DEFAULT_IGNORES = [
+    ".git/",
+    "node_modules/",
+    "archive/",
+    "__pycache__/",
+    ".tracker_cache/",
+]
+
+IGNORE_FILE = ".trackerignore"
+
+# Directory mtimes this close to the scan time are not trusted next run,
+# since a later write in the same timestamp tick would go unnoticed
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+
+class IgnoreRules:
+    """Minimal .gitignore-style matcher (comments, negation, dir-only, anchoring)"""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.rules = []
+        for raw in self.patterns:
+            line = raw.strip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.strip('/') if dir_only else line.lstrip('/')
+            anchored = raw.strip().lstrip('!').startswith('/') or '/' in line
+            self.rules.append((line, negate, dir_only, anchored))
+
+    @classmethod
+    def for_workspace(cls, root, extra=None):
+        """Default ignores plus the workspace's .trackerignore, if any"""
+        patterns = list(DEFAULT_IGNORES)
+        ignore_path = os.path.join(root, IGNORE_FILE)
+        try:
+            with open(ignore_path, 'r') as f:
+                patterns.extend(f.read().splitlines())
+        except OSError:
+            pass
+        if extra:
+            patterns.extend(extra)
+        return cls(patterns)
+
+    def signature(self):
+        return "\n".join(self.patterns)
+
+    def is_ignored(self, rel_path, is_dir):
+        name = rel_path.rsplit('/', 1)[-1]
+        ignored = False
+        for pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            target = rel_path if anchored else name
+            if fnmatch.fnmatchcase(target, pattern):
+                ignored = not negate
+        return ignored
+
+
+class WorkspaceScanner:
+    """Scan a workspace incrementally against a persisted index"""
+
+    def __init__(self, root, index_path=None, categorize=None, ignore=None, categorize_signature=None):
+        self.root = os.path.abspath(str(root))
+        self.index_path = str(index_path) if index_path else None
+        self.categorize = categorize or (lambda rel_path: None)
+        # Changes when the categorize rules do, so cached categories are not reused
+        self.categorize_signature = categorize_signature
+        self.ignore = ignore or IgnoreRules.for_workspace(self.root)
+        self.dirs = {}
+        self.files = {}
+        self.changes = {}
+        self.dirty = False
+        self._load_index()
+
+    def _load_index(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable scan index: {e}")
+            return
+        if (index.get('version') != INDEX_VERSION
+                or index.get('root') != self.root
+                or index.get('ignore') != self.ignore.signature()
+                or index.get('categorize') != self.categorize_signature):
+            return
+        self.dirs = index.get('dirs', {})
+        self.files = {path: tuple(entry) for path, entry in index.get('files', {}).items()}
+
+    def save_index(self):
+        """Persist the index (temp file + rename) if the last scan changed it"""
+        if not self.index_path or not self.dirty:
+            return False
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'root': self.root,
+                'ignore': self.ignore.signature(),
+                'categorize': self.categorize_signature,
+                'dirs': self.dirs,
+                'files': self.files,
+            }, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+        return True
+
+    def _list_dir(self, abs_dir, rel_dir):
+        """Re-list one directory, stat'ing each file once via its DirEntry"""
+        files = {}
+        subdirs = []
+        try:
+            with os.scandir(abs_dir) as it:
+                for entry in it:
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self.ignore.is_ignored(rel_path, True):
+                                subdirs.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            if self.ignore.is_ignored(rel_path, False):
+                                continue
+                            st = entry.stat(follow_symlinks=False)
+                            old = self.files.get(rel_path)
+                            if old and old[0] == st.st_mtime and old[1] == st.st_size:
+                                files[entry.name] = old
+                            else:
+                                files[entry.name] = (st.st_mtime, st.st_size, self.categorize(rel_path))
+                    except OSError:
+                        continue
+        except OSError:
+            return None, None
+        return files, subdirs
+
+    def scan(self, full=False):
+        """
+        Walk the workspace and return {rel_path: (mtime, size, category)}.
+
+        Directories whose mtime is unchanged reuse their cached listing, so an
+        idle workspace costs one stat() per directory. In-place writes that do
+        not touch the parent directory are only seen on a full scan (or via
+        refresh_paths when an event source reports them).
+        Paths added, modified or removed by this scan are left in self.changes
+        as {rel_path: entry or None}.
+        """
+        now_ns = time.time_ns()
+        new_dirs = {}
+        new_files = {}
+        changes = {}
+        stack = ['']
+
+        while stack:
+            rel_dir = stack.pop()
+            abs_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+            try:
+                mtime_ns = os.stat(abs_dir).st_mtime_ns
+            except OSError:
+                continue
+
+            cached = self.dirs.get(rel_dir)
+            prefix = f"{rel_dir}/" if rel_dir else ""
+            if not full and cached and cached['mtime_ns'] == mtime_ns:
+                subdirs = cached['subdirs']
+                for name in cached['files']:
+                    new_files[prefix + name] = self.files[prefix + name]
+                new_dirs[rel_dir] = cached
+            else:
+                files, subdirs = self._list_dir(abs_dir, rel_dir)
+                if files is None:
+                    continue
+                for name, entry in files.items():
+                    new_files[prefix + name] = entry
+                    if self.files.get(prefix + name) != entry:
+                        changes[prefix + name] = entry
+                if cached:
+                    for name in cached['files']:
+                        if name not in files:
+                            changes[prefix + name] = None
+                if now_ns - mtime_ns < RACY_WINDOW_NS:
+                    mtime_ns = -1
+                new_dirs[rel_dir] = {'mtime_ns': mtime_ns, 'files': sorted(files), 'subdirs': subdirs}
+                self.dirty = True
+
+            stack.extend(prefix + name for name in subdirs)
+
+        # Files under directories that vanished (or became ignored)
+        for rel_dir, cached in self.dirs.items():
+            if rel_dir not in new_dirs:
+                prefix = f"{rel_dir}/" if rel_dir else ""
+                for name in cached['files']:
+                    if prefix + name not in new_files:
+                        changes[prefix + name] = None
+                self.dirty = True
+
+        self.dirs = new_dirs
+        self.files = new_files
+        self.changes = changes
+        return new_files
+
+    def refresh_paths(self, rel_paths):
+        """
+        Re-stat specific files (e.g. from filesystem events) without walking.
+        Returns {rel_path: entry or None} for the paths that actually changed.
+        """
+        changes = {}
+        for rel_path in rel_paths:
+            rel_dir, _, name = rel_path.rpartition('/')
+            listing = self.dirs.get(rel_dir)
+            if listing is None or self.ignore.is_ignored(rel_path, False):
+                continue
+            old = self.files.get(rel_path)
+            try:
+                st = os.stat(os.path.join(self.root, rel_path))
+                is_file = os.path.isfile(os.path.join(self.root, rel_path))
+            except OSError:
+                st, is_file = None, False
+
+            if is_file:
+                if old and old[0] == st.st_mtime and old[1] == st.st_size:
+                    continue
+                entry = (st.st_mtime, st.st_size, old[2] if old else self.categorize(rel_path))
+                self.files[rel_path] = entry
+                if name not in listing['files']:
+                    listing['files'] = sorted(listing['files'] + [name])
+                changes[rel_path] = entry
+            elif old is not None:
+                del self.files[rel_path]
+                listing['files'] = [n for n in listing['files'] if n != name]
+                changes[rel_path] = None
+
+        if changes:
+            self.dirty = True
+        self.changes = changes
+        return changes